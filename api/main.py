@@ -1,63 +1,317 @@
-from fastapi import FastAPI, Query
+from contextlib import asynccontextmanager
 import os
+import threading
+import time
+from typing import List, Optional, Union
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
 
-from src.data_ingestion.data_loader import load_data
-from src.feature_engineering.feature_builder import FeatureBuilder
-from src.ml.vectorizer import TextVectorizer
-from src.ml.similarity import SimilarityEngine
 from src.utils.model_persistence import ModelPersistence
-from src.ml.recommender import Recommender
+from src.ml.recommender import STAGE_SECONDS, AmbiguousTitleError, Recommender
+from src.ml.search import normalize_title
+from src.scripts.build_model import build
+from src.utils.artifacts import has_model, load_model, load_version
+from src.utils.metrics import REGISTRY, resident_memory_bytes
+from src.utils.response_cache import ResponseCache
+from src.utils.scoring_executor import ExecutorOverloaded, ExecutorUnavailable, ScoringExecutor
 
 
-app = FastAPI(
-    title="Movie Recommendation API",
-    description="Content-based movie recommender using cosine similarity",
-    version="1.0.0"
+persistence = ModelPersistence(os.getenv("ARTIFACT_DIR", "artifacts"))
+# How artifacts are checked against their manifest before serving:
+# "size" only compares sizes, which catches missing and truncated files
+# without reading them; "checksum" hashes every file, which reads the
+# whole set on each load and reload
+ARTIFACT_VERIFY = os.getenv("ARTIFACT_VERIFY", "size")
+# Seconds between checks of the artifact version on disk, 0 to only
+# reload through POST /admin/reload
+ARTIFACT_WATCH_SECONDS = float(os.getenv("ARTIFACT_WATCH_SECONDS", "0"))
+# Token POST /admin/reload requires; unset disables the endpoint
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Set by the background loader and swapped whole by reloads; requests
+# read it once per call, so in-flight requests finish on the model they got
+recommender = None
+model_status = {"state": "starting", "error": None, "version": None, "reload_error": None}
+# Held while a new model version loads; a second reload is not started
+_reload_lock = threading.Lock()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Request latency per endpoint, serialization included",
+    labels=("endpoint",)
+)
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requests per endpoint and status", labels=("endpoint", "status")
+)
+ERRORS = REGISTRY.counter(
+    "http_request_errors_total", "Requests that failed with a 5xx or an exception", labels=("endpoint",)
+)
+MODEL_LOAD_SECONDS = REGISTRY.gauge("model_load_seconds", "Time taken to load or build the model")
+MODEL_RELOADS = REGISTRY.counter(
+    "model_reloads_total", "Model reload attempts by outcome", labels=("outcome",)
+)
+RESIDENT_MEMORY = REGISTRY.gauge("process_resident_memory_bytes", "Resident memory of the API process")
+CACHE_EVENTS = REGISTRY.counter(
+    "response_cache_events_total", "Response cache hits, misses, evictions and invalidations", labels=("event",)
+)
+CACHE_SIZE = REGISTRY.gauge("response_cache_size", "Response cache size", labels=("unit",))
+EXECUTOR_EVENTS = REGISTRY.counter(
+    "scoring_executor_events_total", "Scoring executor submissions by outcome", labels=("event",)
+)
+EXECUTOR_PENDING = REGISTRY.gauge(
+    "scoring_executor_pending", "Computations queued or running on the scoring executor"
 )
 
-print("🔄 Initializing Movie Recommender backend...")
+# Resolved responses of the loaded model version, keyed on the
+# normalized query; RESPONSE_CACHE_TTL=0 disables expiry
+_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", "10000")),
+    max_bytes=int(float(os.getenv("RESPONSE_CACHE_MB", "32")) * 1024 * 1024),
+    ttl=_ttl or None
+)
 
-persistence = ModelPersistence()
-ARTIFACT_DIR = "artifacts"
-SIM_PATH = os.path.join(ARTIFACT_DIR, "similarity.pkl")
-MOVIES_PATH = os.path.join(ARTIFACT_DIR, "movies.pkl")
 
 # --------------------------------------------------
-# BUILD OR LOAD MODEL (RUNS ONCE AT SERVER START)
+# BUILD OR LOAD MODEL (RUNS IN THE BACKGROUND AT SERVER START)
 # --------------------------------------------------
-if os.path.exists(SIM_PATH) and os.path.exists(MOVIES_PATH):
-    print("⚡ Loading existing artifacts...")
-    processed_df = persistence.load("movies.pkl")
-    similarity = persistence.load("similarity.pkl")
-else:
+def load_recommender(verify=ARTIFACT_VERIFY):
+    """
+    Loads a recommender from the saved artifacts, refusing incomplete
+    or incompatible artifact sets.
+    """
+    artifacts = load_model(persistence, with_vectorizer=True, verify=verify, with_search_index=True)
+    return Recommender(
+        artifacts.movies, artifacts.similarity, artifacts.vectors, artifacts.vectorizer,
+        version=artifacts.version, search_index=artifacts.search_index
+    )
+
+
+def load_worker_recommender():
+    # Scoring worker processes map the files the server already verified.
+    # Whatever is on disk is loaded, so every result carries the version
+    # that scored it and score() rejects a mismatch
+    return load_recommender(verify="none")
+
+
+# CPU-bound scoring runs here, off the event loop; SCORING_EXECUTOR=process
+# scores outside the GIL with one memory-mapped model per worker
+scoring_executor = ScoringExecutor(
+    kind=os.getenv("SCORING_EXECUTOR", "thread"),
+    max_workers=int(os.getenv("SCORING_WORKERS", "0")) or None,
+    max_pending=int(os.getenv("SCORING_MAX_PENDING", "0")) or None,
+    loader=load_worker_recommender
+)
+
+
+def load_or_build_model():
+    """
+    Loads the saved artifacts, building and saving them first if missing.
+    Returns:
+        Recommender: Ready-to-serve recommender
+    """
+    if has_model(persistence):
+        print("⚡ Loading existing artifacts...")
+        return load_recommender()
+
     print("🔨 Artifacts not found. Building model on server...")
+    # Same staged, cached build as build_model.py
+    build(artifact_dir=persistence.artifact_dir)
+    return load_recommender()
+
+
+def initialize_model():
+    model_status["state"] = "loading"
+    start = time.perf_counter()
+    try:
+        loaded = load_or_build_model()
+    except Exception as e:
+        print(f"❌ Model initialization failed: {e}")
+        model_status.update(state="failed", error=str(e))
+        return
+
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+    # Workers load the model now, tagged with its version, rather than
+    # lazily from whatever set is on disk by then
+    scoring_executor.restart_workers(tag=loaded.version)
+    _publish(loaded)
+    print("✅ Model ready.")
+
+
+def _publish(loaded):
+    global recommender
+
+    # Responses of a previous model version are never served
+    response_cache.bind(loaded.version)
+    recommender = loaded
+    model_status.update(state="ready", error=None, version=loaded.version)
+
 
-    # 1. Load raw data
-    movies, credits = load_data()
-    if movies is None or credits is None:
-        raise RuntimeError("Failed to load movie data")
+def reload_model():
+    """
+    Loads the artifact set on disk if its version differs from the one
+    being served, then swaps it in. The old model keeps serving until
+    the new one is fully loaded and verified, and a failed load leaves
+    it in place.
+    Returns:
+        str: "reloaded", "unchanged", "failed" or "busy"
+    """
+    if not _reload_lock.acquire(blocking=False):
+        return "busy"
+    try:
+        current = recommender
+        version = load_version(persistence)
+        if current is not None and version == current.version:
+            return "unchanged"
 
-    # 2. Merge
-    df = movies.merge(credits, left_on="id", right_on="movie_id")
+        print(f"🔄 Loading model version {version}...")
+        start = time.perf_counter()
+        try:
+            loaded = load_recommender()
+        except Exception as e:
+            print(f"❌ Model reload failed, still serving {model_status['version']}: {e}")
+            model_status["reload_error"] = str(e)
+            MODEL_RELOADS.inc(outcome="failed")
+            return "failed"
 
-    # 3. Feature engineering
-    builder = FeatureBuilder()
-    processed_df = builder.build_features(df)
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+        # Process workers hold their own copy of the model. The new ones
+        # have loaded it before requests carry the new version to them,
+        # and requests still holding the old model score on the old ones
+        scoring_executor.restart_workers(tag=loaded.version)
+        _publish(loaded)
+        model_status["reload_error"] = None
+        MODEL_RELOADS.inc(outcome="reloaded")
+        print(f"✅ Now serving model version {loaded.version}.")
+        return "reloaded"
+    finally:
+        _reload_lock.release()
 
-    # 4. Vectorization
-    vectorizer = TextVectorizer()
-    vectors = vectorizer.fit_transform(processed_df["soup"])
 
-    # 5. Similarity
-    similarity_engine = SimilarityEngine()
-    similarity = similarity_engine.compute_similarity(vectors)
+def watch_artifacts(stop, interval):
+    """
+    Reloads whenever the artifact version on disk changes.
+    """
+    while not stop.wait(interval):
+        if model_status["state"] in ("starting", "loading"):
+            continue
+        try:
+            if load_version(persistence) != model_status["version"]:
+                reload_model()
+        except Exception as e:
+            # A set mid-swap may be unreadable; the next check retries
+            print(f"⚠ Artifact check failed: {e}")
 
-    # 6. Save artifacts (for future restarts)
-    persistence.save(processed_df, "movies.pkl")
-    persistence.save(similarity, "similarity.pkl")
 
-print("✅ Model ready. Initializing recommender...")
-recommender = Recommender(processed_df, similarity)
+@asynccontextmanager
+async def lifespan(app):
+    # Load off the event loop so the port binds immediately
+    print("🔄 Initializing Movie Recommender backend...")
+    threading.Thread(target=initialize_model, name="model-loader", daemon=True).start()
+    stop = threading.Event()
+    if ARTIFACT_WATCH_SECONDS > 0:
+        threading.Thread(
+            target=watch_artifacts, args=(stop, ARTIFACT_WATCH_SECONDS),
+            name="artifact-watcher", daemon=True
+        ).start()
+    yield
+    stop.set()
+    scoring_executor.shutdown()
+
+
+class BatchRecommendRequest(BaseModel):
+    movies: List[Union[int, str]] = Field(
+        ..., min_length=1, max_length=100, description="Movie titles or TMDB ids"
+    )
+    top_n: int = Field(5, description="Number of recommendations per movie")
+
+
+class QueryRecommendRequest(BaseModel):
+    text: Optional[str] = Field(
+        None, description="Keywords, cast, director or genres, comma-separated"
+    )
+    movies: List[Union[int, str]] = Field(
+        [], max_length=100, description="Seed movie titles or TMDB ids"
+    )
+    top_n: int = Field(5, description="Number of recommendations")
+
+
+app = FastAPI(
+    title="Movie Recommendation API",
+    description="Content-based movie recommender using cosine similarity",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route templates keep label cardinality bounded
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+        REQUESTS.inc(endpoint=endpoint, status=str(status))
+        if status >= 500:
+            ERRORS.inc(endpoint=endpoint)
+
+
+def get_filters(
+    genre: Optional[List[str]] = Query(None, description="Only movies in any of these genres"),
+    min_year: Optional[int] = Query(None, description="Released in or after this year"),
+    max_year: Optional[int] = Query(None, description="Released in or before this year"),
+    min_vote_count: Optional[int] = Query(None, ge=0, description="At least this many votes"),
+    language: Optional[str] = Query(None, description="Original language, e.g. en"),
+):
+    """
+    Dependency collecting the recommendation filters that were set,
+    as a hashable tuple of (name, value) pairs.
+    """
+    filters = {
+        "genres": tuple(sorted(genre)) if genre else None,
+        "min_year": min_year,
+        "max_year": max_year,
+        "min_vote_count": min_vote_count,
+        "language": language.lower() if language else None,
+    }
+    return tuple((name, value) for name, value in filters.items() if value is not None)
+
+
+def check_top_n(recommender, top_n, filters=()):
+    """
+    Rejects unfiltered requests for more recommendations than the
+    artifact set stores per movie, which would silently be cut short.
+    Filtered requests score the matching movies past the stored ones.
+    """
+    limit = recommender.max_top_n
+    if not filters and limit is not None and top_n > limit:
+        raise HTTPException(
+            status_code=422,
+            detail=f"top_n must be at most {limit}, the neighbors stored per movie; rebuild with a larger --top-k"
+        )
+
+
+async def get_recommender():
+    """
+    Dependency returning the loaded recommender.
+    Fails fast with 503 while the model is still loading.
+    """
+    current = recommender
+    if current is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model is {model_status['state']}, try again shortly",
+            headers={"Retry-After": "5"}
+        )
+    return current
 
 
 # --------------------------------------------------
@@ -68,11 +322,167 @@ def home():
     return {"message": "Movie Recommender API is running"}
 
 
+@app.get("/healthz")
+def healthz():
+    # Liveness only: the process is up and serving HTTP
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    if recommender is None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": model_status["state"], "error": model_status["error"]}
+        )
+    return {
+        "status": "ready",
+        "model_version": recommender.version,
+        "reload_error": model_status["reload_error"]
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    RESIDENT_MEMORY.set(resident_memory_bytes())
+    cache = response_cache.stats()
+    for event in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        CACHE_EVENTS.sync(cache[event], event=event)
+    CACHE_SIZE.set(cache["entries"], unit="entries")
+    CACHE_SIZE.set(cache["bytes"], unit="bytes")
+    executor = scoring_executor.stats()
+    for event in ("submitted", "coalesced", "rejected"):
+        EXECUTOR_EVENTS.sync(executor[event], event=event)
+    EXECUTOR_PENDING.set(executor["pending"])
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/executor/stats")
+def executor_stats():
+    return scoring_executor.stats()
+
+
+@app.post("/admin/reload", status_code=202)
+def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Loads the artifact set on disk in the background and swaps it in
+    once ready; requests keep being served by the current model meanwhile.
+    """
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if _reload_lock.locked():
+        return JSONResponse(
+            status_code=409,
+            content={"status": "busy", "model_version": model_status["version"]}
+        )
+    if recommender is not None and load_version(persistence) == recommender.version:
+        return JSONResponse(
+            status_code=200,
+            content={"status": "unchanged", "model_version": recommender.version}
+        )
+    threading.Thread(target=reload_model, name="model-reloader", daemon=True).start()
+    return {"status": "reloading", "model_version": model_status["version"]}
+
+
+async def score(key, task, recommender, *args):
+    """
+    Runs task(recommender, *args) on the scoring executor, joining an
+    identical request already in flight.
+    Answers 429 instead of queueing once the executor is saturated, and
+    503 while its worker processes are being restarted.
+    """
+    try:
+        version, response, observations = await scoring_executor.run(
+            (recommender.version,) + key, _scored, recommender, task, *args,
+            tag=recommender.version
+        )
+    except ExecutorOverloaded:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests in flight, try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    if scoring_executor.kind == "process":
+        # Recorded in the worker's own registry, which /metrics never sees
+        for value, labels in observations:
+            STAGE_SECONDS.observe(value, **labels)
+
+    if version != recommender.version:
+        # A worker process loaded another artifact set than the one being
+        # served (mid-reload, or built out of band); its answer is neither
+        # returned nor cached under the served version
+        if not _reload_lock.locked():
+            threading.Thread(target=reload_model, name="model-reloader", daemon=True).start()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Scoring workers hold model version {version}, not {recommender.version}",
+            headers={"Retry-After": "1"}
+        )
+    return response
+
+
+def _scored(recommender, task, *args):
+    # Runs in the scoring pool; process workers score their own model
+    # and send back the stage timings it recorded
+    with STAGE_SECONDS.capture() as observations:
+        response = task(recommender, *args)
+    return recommender.version, response, observations
+
+
+async def cached_score(key, task, recommender, *args):
+    # Hot queries are answered on the event loop without a pool hop.
+    # The version is part of the key, so a response scored by the old
+    # model while a reload swaps it in is never served for the new one
+    cache_key = (recommender.version,) + key
+    response = response_cache.get(cache_key)
+    if response is None:
+        response = await score(key, task, recommender, *args)
+        response_cache.put(cache_key, response)
+    return {**response, "model_version": recommender.version}
+
+
+@app.get("/search")
+async def search(
+    q: str = Query(..., description="Partial or misspelled movie name"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    recommender: Recommender = Depends(get_recommender)
+):
+    results = await cached_score(
+        ("search", normalize_title(q), limit), _search_results, recommender, q, limit
+    )
+    return {"query": q, "results": results["results"], "model_version": results["model_version"]}
+
+
+def _search_results(recommender, q, limit):
+    return {"results": recommender.autocomplete(q, limit)}
+
+
 @app.get("/recommend")
-def recommend(
+async def recommend(
     movie: str = Query(..., description="Movie name"),
-    top_n: int = Query(5, description="Number of recommendations")
+    top_n: int = Query(5, description="Number of recommendations"),
+    filters: tuple = Depends(get_filters),
+    recommender: Recommender = Depends(get_recommender)
 ):
+    check_top_n(recommender, top_n, filters)
+    # Responses are cached per normalized title, so only that may appear
+    # in them; a raw spelling would be echoed back to every later request
+    query = normalize_title(movie)
+    return await cached_score(
+        ("recommend", query, top_n, filters),
+        _recommend_response, recommender, query, top_n, filters
+    )
+
+
+def _recommend_response(recommender, movie, top_n, filters=()):
     candidates = recommender.search_movies(movie)
 
     if not candidates:
@@ -82,7 +492,7 @@ def recommend(
         }
 
     exact_match = next(
-        (c for c in candidates if c.lower() == movie.lower()),
+        (c for c in candidates if normalize_title(c) == normalize_title(movie)),
         None
     )
 
@@ -97,9 +507,100 @@ def recommend(
             "suggestions": candidates[:10]
         }
 
-    recommendations = recommender.recommend(target_movie, top_n)
+    try:
+        recommendations = recommender.recommend(target_movie, top_n, dict(filters))
+    except AmbiguousTitleError as e:
+        # Same title, different movies: ask for an id instead of guessing
+        return {
+            "error": "Multiple movies share this title, use /movies/{id}/recommend",
+            "suggestions": [target_movie],
+            "movie_ids": e.movie_ids
+        }
+    except ValueError as e:
+        return {"error": str(e)}
+
+    response = {
+        "input_movie": target_movie,
+        "recommendations": recommendations
+    }
+    if filters:
+        response["filters"] = dict(filters)
+    return response
+
+
+@app.get("/movies/{movie_id}/recommend")
+async def recommend_by_id(
+    movie_id: int,
+    top_n: int = Query(5, description="Number of recommendations"),
+    filters: tuple = Depends(get_filters),
+    recommender: Recommender = Depends(get_recommender)
+):
+    check_top_n(recommender, top_n, filters)
+    return await cached_score(
+        ("recommend_id", movie_id, top_n, filters),
+        _recommend_by_id_response, recommender, movie_id, top_n, filters
+    )
+
+
+def _recommend_by_id_response(recommender, movie_id, top_n, filters=()):
+    try:
+        recommendations = recommender.recommend_by_id(movie_id, top_n, dict(filters))
+    except ValueError as e:
+        return {"error": str(e)}
+
+    response = {
+        "input_movie_id": movie_id,
+        "recommendations": recommendations
+    }
+    if filters:
+        response["filters"] = dict(filters)
+    return response
+
+
+@app.post("/recommend/batch")
+async def recommend_batch(
+    request: BatchRecommendRequest,
+    recommender: Recommender = Depends(get_recommender)
+):
+    check_top_n(recommender, request.top_n)
+    # Unknown or ambiguous movies fail individually, not the whole batch
+    results = await score(
+        ("batch", tuple(request.movies), request.top_n),
+        _recommend_many, recommender, request.movies, request.top_n
+    )
+    return {"results": results, "model_version": recommender.version}
+
+
+def _recommend_many(recommender, movies, top_n):
+    return recommender.recommend_many(movies, top_n)
+
+
+@app.post("/recommend/query")
+async def recommend_query(
+    request: QueryRecommendRequest,
+    recommender: Recommender = Depends(get_recommender)
+):
+    response = await score(
+        ("query", request.text, tuple(request.movies), request.top_n),
+        _query_response, recommender, request.text, request.movies, request.top_n
+    )
+    return {**response, "model_version": recommender.version}
+
+
+def _query_response(recommender, text, movies, top_n):
+    try:
+        recommendations = recommender.recommend_for_query(text, movies, top_n)
+    except AmbiguousTitleError as e:
+        return {
+            "error": "Multiple movies share this title, pass its id instead",
+            "suggestions": [e.movie_name],
+            "movie_ids": e.movie_ids
+        }
+    except ValueError as e:
+        return {"error": str(e)}
 
     return {
-        "input_movie": target_movie,
+        "text": text,
+        "movies": movies,
         "recommendations": recommendations
     }
@@ -1,12 +1,10 @@
-from src.data_ingestion.data_loader import load_data
-from src.feature_engineering.feature_builder import FeatureBuilder
-from src.ml.vectorizer import TextVectorizer
-from src.ml.similarity import SimilarityEngine
+from src.scripts.build_model import build
 from src.utils.model_persistence import ModelPersistence
 from src.ml.recommender import Recommender
+from src.utils.artifacts import load_model
 
-# 🔴 CHANGE THIS FLAG ONLY ONCE
-BUILD_MODEL = False   # True only the first time
+# 🔴 Set to True to build the artifacts before starting
+BUILD_MODEL = False   # True to (re)build; unchanged stages are reused
 
 
 def main():
@@ -14,50 +12,31 @@ def main():
     persistence = ModelPersistence()
 
     if BUILD_MODEL:
-        print("🔨 Building model from scratch...", flush=True)
+        print("🔨 Building model...", flush=True)
 
-        # 1. Load data
-        movies, credits = load_data()
-        if movies is None:
-            print("❌ Error: Could not load data.")
+        # 1-6. Staged build; stages whose inputs and parameters are
+        # unchanged are reused from data/cache
+        try:
+            build(artifact_dir=persistence.artifact_dir)
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
             return
 
-        # 2. Merge
-        df = movies.merge(credits, left_on="id", right_on="movie_id")
-
-        # 3. Feature Engineering
-        print("🧠 Building features...", flush=True)
-        builder = FeatureBuilder()
-        processed_df = builder.build_features(df)
-
-        # 4. Vectorization
-        print("📊 Vectorizing...", flush=True)
-        vectorizer = TextVectorizer()
-        vectors = vectorizer.fit_transform(processed_df['soup'])
-
-        # 5. Similarity
-        print("📐 Computing similarity...", flush=True)
-        similarity_engine = SimilarityEngine()
-        similarity = similarity_engine.compute_similarity(vectors)
-
-        # 6. Save artifacts (ONLY ONCE)
-        persistence.save(processed_df, "movies.pkl")
-        persistence.save(similarity, "similarity.pkl")
-        persistence.save(vectorizer, "vectorizer.pkl")
-
         print("✅ Model built and saved successfully.")
 
-    else:
-        print("⚡ Loading model artifacts...", flush=True)
+    print("⚡ Loading model artifacts...", flush=True)
 
-        processed_df = persistence.load("movies.pkl")
-        similarity = persistence.load("similarity.pkl")
+    artifacts = load_model(persistence)
+    processed_df = artifacts.movies
+    similarity = artifacts.similarity
+    vectors = artifacts.vectors
 
-        print("✅ Model loaded successfully.")
+    print("✅ Model loaded successfully.")
 
     # 7. Initialize recommender
     print("🚀 Initializing recommender...", flush=True)
-    recommender = Recommender(processed_df, similarity)
+    # Vectors let filtered queries rank beyond the stored neighbors
+    recommender = Recommender(processed_df, similarity, vectors)
 
     print("\n🎬 Movie Recommender Ready!")
 
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+MOVIE_HEADER = [
+    "budget", "genres", "homepage", "id", "keywords", "original_language", "original_title",
+    "overview", "popularity", "production_companies", "production_countries", "release_date",
+    "revenue", "runtime", "spoken_languages", "status", "tagline", "title", "vote_average", "vote_count",
+]
+CREDIT_HEADER = ["movie_id", "title", "cast", "crew"]
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family",
+    "Fantasy", "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction",
+    "TV Movie", "Thriller", "War", "Western", "Foreign",
+]
+LANGUAGES = ["en", "fr", "es", "de", "ja", "it", "zh", "ko", "hi", "ru"]
+JOBS = [("Writing", "Screenplay"), ("Production", "Producer"), ("Sound", "Original Music Composer"),
+        ("Camera", "Director of Photography"), ("Editing", "Editor")]
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "sa", "vel", "dun", "ar", "is", "bel", "qu", "zen",
+             "or", "na", "gri", "tal", "mo", "ves", "ry", "an", "cor", "li", "ut", "pha", "dro"]
+
+# Rows generated and written per chunk, to keep 500k-movie catalogs in bounded memory
+CHUNK_ROWS = 10000
+
+
+def _words(rng, count, min_syllables=2, max_syllables=3):
+    # Pronounceable, mostly unique pseudo-words
+    lengths = rng.integers(min_syllables, max_syllables + 1, size=count)
+    picks = rng.integers(0, len(SYLLABLES), size=(count, max_syllables))
+    return ["".join(SYLLABLES[p] for p in row[:n]) for row, n in zip(picks, lengths)]
+
+
+def _zipf_sampler(rng, size):
+    # Popular names and keywords recur far more often than rare ones, as in TMDB
+    weights = 1.0 / (np.arange(size) + 10.0)
+    cumulative = np.cumsum(weights / weights.sum())
+    return lambda count: np.minimum(np.searchsorted(cumulative, rng.random(count)), size - 1)
+
+
+class CatalogGenerator:
+    def __init__(self, n_movies, seed=0):
+        """
+        Generates TMDB-shaped movies and credits CSVs with the same
+        columns and JSON list layout as the Kaggle TMDB 5000 dataset.
+        Vocabulary sizes grow with the catalog, and names, keywords and
+        genres follow a long-tailed popularity distribution.
+        Args:
+            n_movies (int): Number of movies
+            seed (int): Seed of every random draw
+        """
+        self.n_movies = n_movies
+        self.rng = np.random.default_rng(seed)
+
+        first_names = [w.capitalize() for w in _words(self.rng, 400, 1, 2)]
+        last_names = [w.capitalize() for w in _words(self.rng, 2000)]
+        n_people = max(2000, n_movies // 2)
+        self.people = [
+            f"{first_names[i % len(first_names)]} {last_names[(i // len(first_names)) % len(last_names)]}"
+            for i in range(n_people)
+        ]
+        self.directors = self.people[: max(300, n_movies // 10)]
+        keyword_words = _words(self.rng, max(1000, n_movies // 5))
+        self.keywords = [
+            w if i % 3 else f"{w} {keyword_words[(i * 31) % len(keyword_words)]}"
+            for i, w in enumerate(keyword_words)
+        ]
+        self.title_words = [w.capitalize() for w in _words(self.rng, max(500, n_movies // 20))]
+
+        self._person = _zipf_sampler(self.rng, len(self.people))
+        self._director = _zipf_sampler(self.rng, len(self.directors))
+        self._keyword = _zipf_sampler(self.rng, len(self.keywords))
+        self._genre = _zipf_sampler(self.rng, len(GENRES))
+        self._title_word = _zipf_sampler(self.rng, len(self.title_words))
+
+    def write(self, out_dir):
+        """
+        Writes tmdb_5000_movies.csv and tmdb_5000_credits.csv, the file
+        names the loader expects, into out_dir.
+        Returns:
+            tuple: (movies_path, credits_path)
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        movies_path = os.path.join(out_dir, "tmdb_5000_movies.csv")
+        credits_path = os.path.join(out_dir, "tmdb_5000_credits.csv")
+        with open(movies_path, "w", newline="") as movies_file, \
+                open(credits_path, "w", newline="") as credits_file:
+            movies_writer = csv.writer(movies_file)
+            credits_writer = csv.writer(credits_file)
+            movies_writer.writerow(MOVIE_HEADER)
+            credits_writer.writerow(CREDIT_HEADER)
+            titles = []
+            for start in range(0, self.n_movies, CHUNK_ROWS):
+                end = min(start + CHUNK_ROWS, self.n_movies)
+                for movie, credit in self._rows(start, end, titles):
+                    movies_writer.writerow(movie)
+                    credits_writer.writerow(credit)
+        return movies_path, credits_path
+
+    def _rows(self, start, end, titles):
+        rng = self.rng
+        count = end - start
+        n_genres = rng.integers(1, 4, size=count)
+        n_keywords = np.minimum(rng.geometric(0.15, size=count) - 1, 30)
+        n_cast = rng.integers(0, 21, size=count)
+        has_director = rng.random(count) > 0.03
+        n_crew = rng.integers(0, 8, size=count)
+        years = rng.integers(1930, 2017, size=count)
+        vote_counts = np.floor(rng.pareto(1.2, size=count) * 50).astype(np.int64)
+
+        for offset in range(count):
+            movie_id = 10 + (start + offset) * 3
+            # About 1% share the title of an earlier movie (remakes)
+            if titles and rng.random() < 0.01:
+                title = titles[rng.integers(0, len(titles))]
+            else:
+                n_words = rng.integers(1, 5)
+                title = " ".join(self.title_words[w] for w in self._title_word(n_words))
+                if len(titles) < 100000:
+                    titles.append(title)
+
+            genres = [GENRES[g] for g in np.unique(self._genre(n_genres[offset]))]
+            keywords = [self.keywords[k] for k in np.unique(self._keyword(n_keywords[offset]))]
+            cast = [self.people[p] for p in dict.fromkeys(self._person(n_cast[offset]).tolist())]
+            crew = [
+                {"credit_id": f"c{movie_id}-{j}", "department": dept, "gender": 0,
+                 "id": int(p), "job": job, "name": self.people[p]}
+                for j, ((dept, job), p) in enumerate(zip(
+                    [JOBS[rng.integers(0, len(JOBS))] for _ in range(n_crew[offset])],
+                    self._person(n_crew[offset])
+                ))
+            ]
+            if has_director[offset]:
+                director = self.directors[self._director(1)[0]]
+                crew.insert(rng.integers(0, len(crew) + 1), {
+                    "credit_id": f"d{movie_id}", "department": "Directing", "gender": 0,
+                    "id": -1, "job": "Director", "name": director,
+                })
+
+            release = f"{years[offset]}-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}"
+            movie = [
+                int(rng.integers(0, 300)) * 1000000,
+                json.dumps([{"id": GENRES.index(g), "name": g} for g in genres]),
+                "",
+                movie_id,
+                json.dumps([{"id": i, "name": k} for i, k in enumerate(keywords)]),
+                LANGUAGES[min(int(rng.geometric(0.5)) - 1, len(LANGUAGES) - 1)],
+                title,
+                f"A story about {', '.join(keywords[:3]) or 'something'}.",
+                round(float(rng.gamma(1.5, 10.0)), 6),
+                "[]",
+                "[]",
+                release,
+                int(rng.integers(0, 500)) * 1000000,
+                float(rng.integers(70, 180)),
+                "[]",
+                "Released",
+                "",
+                title,
+                round(float(rng.uniform(3.0, 9.0)), 1),
+                int(vote_counts[offset]),
+            ]
+            credit = [
+                movie_id,
+                title,
+                json.dumps([
+                    {"cast_id": i, "character": f"Role {i}", "credit_id": f"a{movie_id}-{i}",
+                     "gender": int(i % 3), "id": i, "name": name, "order": i}
+                    for i, name in enumerate(cast)
+                ]),
+                json.dumps(crew),
+            ]
+            yield movie, credit
+
+
+def generate_catalog(n_movies, out_dir, seed=0):
+    """
+    Writes a synthetic TMDB-shaped catalog of n_movies movies.
+    Returns:
+        tuple: (movies_path, credits_path)
+    """
+    return CatalogGenerator(n_movies, seed).write(out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic TMDB-shaped catalog")
+    parser.add_argument("--movies", type=int, default=5000, help="Number of movies")
+    parser.add_argument("--out", default=None, help="Output directory (default benchmarks/data/<movies>)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join(os.path.dirname(__file__), "data", str(args.movies))
+    paths = generate_catalog(args.movies, out_dir, args.seed)
+    print(f"✅ Wrote {args.movies} movies to {paths[0]} and {paths[1]}")
@@ -0,0 +1,241 @@
+import argparse
+from datetime import datetime, timezone
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Ensure src modules are found
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.generate_catalog import generate_catalog
+from src.ml.recommender import Recommender
+from src.scripts.build_model import build
+from src.utils.artifacts import load_model
+from src.utils.metrics import resident_memory_bytes
+from src.utils.model_persistence import ModelPersistence
+from src.utils.profiler import BuildProfiler
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def latency_stats(latencies):
+    """
+    Summarizes per-call latencies in seconds.
+    Returns:
+        dict: Call count, throughput and mean/p50/p99 latency in ms
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    if latencies.size == 0:
+        return {"calls": 0}
+    total = float(latencies.sum())
+    return {
+        "calls": int(latencies.size),
+        "throughput_per_s": latencies.size / total if total else float("inf"),
+        "mean_ms": 1000 * float(latencies.mean()),
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p99_ms": 1000 * float(np.percentile(latencies, 99)),
+    }
+
+
+def time_calls(fn, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _typo(title, rng):
+    # Swap two neighboring characters, as in a fast-typed query
+    if len(title) < 4:
+        return title
+    i = int(rng.integers(1, len(title) - 2))
+    return title[:i] + title[i + 1] + title[i] + title[i + 2:]
+
+
+def benchmark_queries(recommender, n_queries, rng):
+    titles = recommender.df['title'].tolist()
+    counts = recommender.df['title'].value_counts()
+    unique_titles = [t for t in titles if counts[t] == 1]
+    picks = rng.choice(len(unique_titles), min(n_queries, len(unique_titles)), replace=False)
+    sample = [unique_titles[i] for i in picks]
+    ids = recommender.df['id'].to_numpy()[rng.choice(len(titles), min(n_queries, len(titles)), replace=False)]
+
+    return {
+        "recommend": latency_stats(time_calls(recommender.recommend, [(t, 10) for t in sample])),
+        "recommend_by_id": latency_stats(time_calls(recommender.recommend_by_id, [(int(i), 10) for i in ids])),
+        "search_movies_prefix": latency_stats(time_calls(recommender.search_movies, [(t[:5],) for t in sample])),
+        "search_movies_typo": latency_stats(time_calls(recommender.search_movies, [(_typo(t, rng),) for t in sample])),
+    }
+
+
+def benchmark_api(artifact_dir, ids):
+    """
+    Measures GET /movies/{id}/recommend round trips through the ASGI
+    stack, with the response cache disabled so every call is scored.
+    """
+    from fastapi.testclient import TestClient
+
+    os.environ["ARTIFACT_DIR"] = artifact_dir
+    os.environ["RESPONSE_CACHE_ENTRIES"] = "0"
+    import api.main
+    main = importlib.reload(api.main)
+
+    with TestClient(main.app) as client:
+        deadline = time.time() + 600
+        while client.get("/readyz").status_code != 200:
+            if time.time() > deadline:
+                raise RuntimeError("API never became ready")
+            time.sleep(0.05)
+        latencies = time_calls(
+            lambda movie_id: client.get(f"/movies/{movie_id}/recommend", params={"top_n": 10}),
+            [(int(i),) for i in ids]
+        )
+    return latency_stats(latencies)
+
+
+def run_size(n_movies, args, rng):
+    data_dir = os.path.join(args.data_dir, str(n_movies))
+    if not os.path.exists(os.path.join(data_dir, "tmdb_5000_credits.csv")):
+        print(f"Generating {n_movies} movies...")
+        start = time.perf_counter()
+        generate_catalog(n_movies, data_dir, seed=args.seed)
+        print(f"Generated in {time.perf_counter() - start:.1f}s")
+
+    result = {}
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as artifact_dir:
+        # 1. Build, stage by stage
+        profiler = BuildProfiler(memory_limit_mb=args.memory_limit)
+        build(
+            top_k=args.top_k, use_cache=False, backend=args.backend, n_jobs=args.jobs,
+            profiler=profiler, raw_dir=data_dir, artifact_dir=artifact_dir
+        )
+        result["build"] = profiler.report()
+
+        # 2. Load the artifacts the way the API does
+        rss_before = resident_memory_bytes()
+        start = time.perf_counter()
+        artifacts = load_model(ModelPersistence(artifact_dir), with_vectorizer=True, with_search_index=True)
+        recommender = Recommender(
+            artifacts.movies, artifacts.similarity, artifacts.vectors, artifacts.vectorizer,
+            search_index=artifacts.search_index
+        )
+        result["load"] = {
+            "seconds": time.perf_counter() - start,
+            "rss_growth_bytes": resident_memory_bytes() - rss_before,
+        }
+
+        # 3. Recommender calls
+        result["queries"] = benchmark_queries(recommender, args.queries, rng)
+
+        # 4. API round trips
+        if not args.skip_api:
+            ids = recommender.df['id'].to_numpy()[rng.choice(n_movies, min(args.queries, n_movies), replace=False)]
+            del recommender, artifacts
+            result["api"] = {"movie_recommend": benchmark_api(artifact_dir, ids)}
+
+    result["rss_bytes"] = resident_memory_bytes()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=BENCHMARK_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summary_rows(result):
+    rows = {}
+    for size, size_result in result["sizes"].items():
+        for stage in size_result["build"]["stages"]:
+            rows[f"{size} build {stage['name']} s"] = stage["wall_seconds"]
+        rows[f"{size} build peak MB"] = size_result["build"]["peak_rss_bytes"] / 2**20
+        rows[f"{size} load s"] = size_result["load"]["seconds"]
+        for name, stats in list(size_result["queries"].items()) + list(size_result.get("api", {}).items()):
+            rows[f"{size} {name} p50 ms"] = stats.get("p50_ms")
+            rows[f"{size} {name} p99 ms"] = stats.get("p99_ms")
+            rows[f"{size} {name} per s"] = stats.get("throughput_per_s")
+    return rows
+
+
+def compare(baseline_path, current_path):
+    """
+    Prints every metric of two result files side by side.
+    """
+    with open(baseline_path) as f:
+        baseline = _summary_rows(json.load(f))
+    with open(current_path) as f:
+        current = _summary_rows(json.load(f))
+
+    print(f"{'metric':<44}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(name), current.get(name)
+        change = f"{(new - old) / old:+.0%}" if old and new is not None else ""
+        old_text = f"{old:.3f}" if old is not None else "-"
+        new_text = f"{new:.3f}" if new is not None else "-"
+        print(f"{name:<44}{old_text:>12}{new_text:>12}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the build, recommender and API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000],
+                        help="Catalog sizes to benchmark, e.g. 5000 50000 500000")
+    parser.add_argument("--queries", type=int, default=1000, help="Timed calls per query benchmark")
+    parser.add_argument("--top-k", type=int, default=50, help="Neighbors kept per movie")
+    parser.add_argument("--backend", choices=["exact", "ivf"], default="exact",
+                        help="Neighbor search used by the build (ivf for the largest catalogs)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for feature building")
+    parser.add_argument("--memory-limit", type=int, default=512, help="Memory limit in MB to check builds against")
+    parser.add_argument("--skip-api", action="store_true", help="Skip the API round-trip benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the catalogs and query samples")
+    parser.add_argument("--data-dir", default=os.path.join(BENCHMARK_DIR, "data"),
+                        help="Where generated catalogs are kept and reused")
+    parser.add_argument("--work-dir", default=None, help="Scratch space for benchmark artifacts")
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results"),
+                        help="Directory the result JSON is written to")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    rng = np.random.default_rng(args.seed)
+    result = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output", "data_dir", "work_dir")},
+        "sizes": {},
+    }
+    for n_movies in args.sizes:
+        print(f"📊 Benchmarking {n_movies} movies...")
+        result["sizes"][str(n_movies)] = run_size(n_movies, args, rng)
+
+    os.makedirs(args.output, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(args.output, f"{stamp}-{'-'.join(map(str, args.sizes))}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Results saved to {path}")
+    for name, value in sorted(_summary_rows(result).items()):
+        print(f"{name:<44}{value:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
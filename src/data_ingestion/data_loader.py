@@ -1,37 +1,283 @@
 import pandas as pd
+import hashlib
+import io
+import json
 import os
+import shutil
+import tempfile
 
+from src.utils.model_persistence import ModelPersistence
+from src.utils.profiler import profile_stage
 
-def load_data():
+# Bump when the cached layout or the merge logic changes
+CACHE_VERSION = 1
+
+# Merged frames kept in the cache; older ones are deleted as new ones are written
+DATA_CACHE_KEEP = 3
+
+# Columns read from each raw CSV by default; everything downstream
+# (features, metadata artifacts) only needs these
+MOVIE_CSV_COLUMNS = [
+    'id', 'title', 'genres', 'keywords', 'release_date', 'original_language',
+    'vote_average', 'vote_count', 'popularity',
+]
+CREDIT_CSV_COLUMNS = ['movie_id', 'title', 'cast', 'crew']
+
+DTYPES = {
+    'id': 'int64',
+    'movie_id': 'int64',
+    'budget': 'int64',
+    'revenue': 'int64',
+    'vote_count': 'int64',
+    'vote_average': 'float64',
+    'popularity': 'float64',
+    'runtime': 'float64',
+}
+
+
+def _project_root():
+    # src/data_ingestion/data_loader.py -> src -> project root
+    return os.path.dirname(
+        os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))
+        )
+    )
+
+
+def raw_data_paths(raw_dir=None):
+    """
+    Returns the paths of the raw movies and credits CSVs.
+    """
+    if raw_dir is None:
+        raw_dir = os.path.join(_project_root(), "data", "raw")
+    return (
+        os.path.join(raw_dir, "tmdb_5000_movies.csv"),
+        os.path.join(raw_dir, "tmdb_5000_credits.csv"),
+    )
+
+
+def load_data(movie_columns=None, credit_columns=None, raw_dir=None):
     """
     Loads the movie and credits datasets using project-relative paths.
     Works both locally and on cloud platforms like Render.
-    
+
+    Args:
+        movie_columns (list or None): Movie CSV columns to read, None for all
+        credit_columns (list or None): Credits CSV columns to read, None for all
+        raw_dir (str or None): Directory of the raw CSVs, defaults to data/raw
+
     Returns:
         movies (pd.DataFrame)
         credits (pd.DataFrame)
     """
     try:
-        # Absolute path to the project root
-        # src/data_ingestion/data_loader.py -> src -> project root
-        base_dir = os.path.dirname(
-            os.path.dirname(
-                os.path.dirname(os.path.abspath(__file__))
-            )
-        )
-
-        movies_path = os.path.join(
-            base_dir, "data", "raw", "tmdb_5000_movies.csv"
-        )
-        credits_path = os.path.join(
-            base_dir, "data", "raw", "tmdb_5000_credits.csv"
-        )
+        movies_path, credits_path = raw_data_paths(raw_dir)
 
-        movies = pd.read_csv(movies_path)
-        credits = pd.read_csv(credits_path)
+        movies = pd.read_csv(movies_path, usecols=movie_columns, dtype=csv_dtypes(movie_columns))
+        credits = pd.read_csv(credits_path, usecols=credit_columns, dtype=csv_dtypes(credit_columns))
 
         return movies, credits
 
     except Exception as e:
         print(f"❌ Error loading data: {e}")
         return None, None
+
+
+def iter_data_chunks(path, columns, chunk_bytes):
+    """
+    Reads a raw CSV in chunks sized to fit a memory allowance.
+    Args:
+        path (str): CSV file
+        columns (list or None): Columns to read, None for all
+        chunk_bytes (int): Approximate in-memory size of one chunk
+    Returns:
+        Iterator of pd.DataFrame chunks
+    """
+    chunk_rows = max(1, chunk_bytes // _estimate_row_bytes(path))
+    return pd.read_csv(path, usecols=columns, dtype=csv_dtypes(columns), chunksize=chunk_rows)
+
+
+def _estimate_row_bytes(path, sample_bytes=1 << 20):
+    # Parse the head of the file to measure the average row size on disk.
+    # Parsed rows take several times that in memory, mostly as Python
+    # strings; 4x is a conservative factor for these CSVs
+    with open(path, "rb") as f:
+        head = f.read(sample_bytes)
+    try:
+        rows = len(pd.read_csv(io.BytesIO(head)))
+    except (ValueError, pd.errors.ParserError):
+        # The sample ended inside a quoted field; drop the partial row
+        head = head[:head.rfind(b"\n")]
+        try:
+            rows = len(pd.read_csv(io.BytesIO(head)))
+        except (ValueError, pd.errors.ParserError):
+            rows = 0
+    if rows <= 0:
+        return sample_bytes
+    return max(1, len(head) * 4 // rows)
+
+
+def csv_dtypes(columns):
+    """
+    Returns the read_csv dtypes of the typed columns among columns.
+    """
+    if columns is None:
+        return None
+    return {c: DTYPES[c] for c in columns if c in DTYPES}
+
+
+def load_merged_data(movie_columns=MOVIE_CSV_COLUMNS, credit_columns=CREDIT_CSV_COLUMNS,
+                     use_cache=True, cache_dir=None, raw_dir=None, profiler=None,
+                     cache_keep=DATA_CACHE_KEEP):
+    """
+    Loads both datasets merged on the movie id, the way every build
+    entry point uses them.
+    The merged frame is cached column by column in data/cache, keyed on
+    the raw files' size, mtime and content hash plus the selected
+    columns, so repeated runs skip CSV parsing and the merge. Only the
+    cache_keep most recently used frames are kept.
+
+    Args:
+        movie_columns (list or None): Movie CSV columns to keep, None for all
+        credit_columns (list or None): Credits CSV columns to keep, None for all
+        use_cache (bool): Read and write the cache
+        cache_dir (str or None): Cache location, defaults to data/cache
+        raw_dir (str or None): Directory of the raw CSVs, defaults to data/raw
+        profiler (BuildProfiler or None): Records the load and merge stages
+        cache_keep (int): Most recently used merged frames kept in the cache
+
+    Returns:
+        pd.DataFrame: Merged frame, or None if the raw data can't be read
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(_project_root(), "data", "cache")
+
+    key = None
+    if use_cache:
+        try:
+            key = _cache_key(cache_dir, raw_dir, movie_columns, credit_columns)
+        except OSError as e:
+            print(f"❌ Error loading data: {e}")
+            return None
+
+        entry_dir = os.path.join(cache_dir, key)
+        if os.path.exists(os.path.join(entry_dir, "frame", "schema.json")):
+            # Marks the entry as recently used for _prune_cache
+            os.utime(entry_dir)
+            with profile_stage(profiler, "load", cache="hit"):
+                return ModelPersistence(entry_dir).load_frame("frame")
+
+    with profile_stage(profiler, "load", cache="miss" if use_cache else "off"):
+        movies, credits = load_data(movie_columns, credit_columns, raw_dir)
+    if movies is None or credits is None:
+        return None
+
+    with profile_stage(profiler, "merge"):
+        df = movies.merge(credits, left_on="id", right_on="movie_id")
+
+    if use_cache:
+        _write_cache(cache_dir, key, df)
+        _prune_cache(cache_dir, cache_keep, current=key)
+    return df
+
+
+def merged_data_key(movie_columns=MOVIE_CSV_COLUMNS, credit_columns=CREDIT_CSV_COLUMNS,
+                    cache_dir=None, raw_dir=None):
+    """
+    Content address of the merged frame load_merged_data returns, from
+    the raw files' hashes and the columns read.
+    Raises:
+        OSError: If a raw file can't be read
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(_project_root(), "data", "cache")
+    return _cache_key(cache_dir, raw_dir, movie_columns, credit_columns)
+
+
+def _cache_key(cache_dir, raw_dir, movie_columns, credit_columns):
+    # mtime only guards the remembered hash; touching a file without
+    # changing it keeps the same key
+    fingerprints = [
+        {"size": f["size"], "sha1": f["sha1"]}
+        for f in (_fingerprint(path, cache_dir) for path in raw_data_paths(raw_dir))
+    ]
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "files": fingerprints,
+        "movie_columns": movie_columns,
+        "credit_columns": credit_columns,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _fingerprint(path, cache_dir):
+    """
+    Size, mtime and SHA-1 of a raw file. The hash is remembered per
+    size/mtime, so an untouched file is not re-read on every load.
+    """
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, "fingerprints.json")
+    index = {}
+    if os.path.exists(index_path):
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except ValueError:
+            # Unreadable index: hashes are recomputed and it is rewritten
+            index = {}
+
+    entry = index.get(path)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry
+
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1.hexdigest()}
+    # Files that are gone are dropped rather than remembered forever
+    index = {p: e for p, e in index.items() if os.path.exists(p)}
+    index[path] = entry
+
+    # Written to a temporary file and renamed, so a concurrent or
+    # interrupted build never leaves a truncated index behind
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        print(f"⚠ Could not write fingerprint index: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return entry
+
+
+def _write_cache(cache_dir, key, df):
+    # Written to a temporary directory and renamed, so an interrupted
+    # run never leaves a half-written entry behind
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    try:
+        ModelPersistence(tmp_dir).save_frame(df, "frame")
+        os.replace(tmp_dir, os.path.join(cache_dir, key))
+    except OSError as e:
+        print(f"⚠ Could not write data cache: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _prune_cache(cache_dir, keep, current=None):
+    # Deletes all but the keep most recently used merged frames, never
+    # the current one; the stage cache and fingerprints stay
+    try:
+        keys = [
+            key for key in os.listdir(cache_dir)
+            if not key.startswith(".") and os.path.exists(os.path.join(cache_dir, key, "frame", "schema.json"))
+        ]
+        keys.sort(key=lambda key: (key == current, os.path.getmtime(os.path.join(cache_dir, key))), reverse=True)
+    except OSError:
+        return
+    for key in keys[max(int(keep), 1):]:
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
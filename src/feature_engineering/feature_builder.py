@@ -1,78 +1,128 @@
 import pandas as pd
 import ast
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = " \t\n\r,"
+
+
+def iter_json_list(obj):
+    """
+    Yields the elements of a JSON array string one at a time.
+    Each element is decoded by the C JSON scanner, and the rest of the
+    string is never parsed if the caller stops early.
+    Raises ValueError (or TypeError/IndexError) if obj is not JSON.
+    """
+    if not isinstance(obj, str):
+        raise TypeError("Expected a JSON string")
+    pos = len(obj) - len(obj.lstrip())
+    if obj[pos] != "[":
+        raise ValueError("Not a JSON list")
+    pos += 1
+    end = len(obj)
+    while True:
+        while pos < end and obj[pos] in _SEPARATORS:
+            pos += 1
+        if obj[pos] == "]":
+            return
+        item, pos = _decoder.raw_decode(obj, pos)
+        yield item
+
 
 class FeatureBuilder:
     def __init__(self):
         pass
 
-    def convert(self, obj):
-        """Extracts names from JSON list string."""
+    def _parse(self, obj, extract):
+        """
+        Runs extract over the parsed list, trying the fast JSON parser
+        first and falling back to ast.literal_eval for non-JSON input.
+        extract appends to the list it is given, so a malformed element
+        keeps the names found before it, exactly like the original loops.
+        """
         L = []
         try:
-            for i in ast.literal_eval(obj):
-                L.append(i['name'])
+            extract(iter_json_list(obj), L)
+            return L
+        except (ValueError, TypeError, IndexError):
+            L = []
+        try:
+            extract(ast.literal_eval(obj), L)
         except (ValueError, TypeError):
             pass
         return L
 
+    def convert(self, obj):
+        """Extracts names from JSON list string."""
+        def names(items, L):
+            for i in items:
+                L.append(i['name'])
+        return self._parse(obj, names)
+
     def convert3(self, obj):
         """Extracts top 3 names from JSON list string."""
-        L = []
-        try:
-            counter = 0
-            for i in ast.literal_eval(obj):
-                if counter != 3:
-                    L.append(i['name'])
-                    counter += 1
-                else:
+        def first3(items, L):
+            for i in items:
+                if len(L) == 3:
                     break
-        except (ValueError, TypeError):
-            pass
-        return L
+                L.append(i['name'])
+        return self._parse(obj, first3)
 
     def fetch_director(self, obj):
         """Extracts director name from crew JSON list string."""
-        L = []
-        try:
-            for i in ast.literal_eval(obj):
+        def director(items, L):
+            # Stops decoding the (often huge) crew list at the director
+            for i in items:
                 if i['job'] == 'Director':
                     L.append(i['name'])
                     break
-        except (ValueError, TypeError):
-            pass
-        return L
+        return self._parse(obj, director)
 
     def collapse(self, L):
         """Removes spaces from list of strings."""
-        L1 = []
-        for i in L:
-            L1.append(i.replace(" ", ""))
-        return L1
+        return [i.replace(" ", "") for i in L]
 
     def create_soup(self, x):
         """Combines keywords, cast, director, and genres into a single string."""
         return ' '.join(x['keywords']) + ' ' + ' '.join(x['cast']) + ' ' + ' '.join(x['director']) + ' ' + ' '.join(x['genres'])
 
-    def build_features(self, df):
+    def build_features(self, df, n_jobs=1):
         """
         Builds features from the raw dataframe.
         Args:
             df (pd.DataFrame): The raw dataframe containing movies and credits.
+            n_jobs (int): Worker processes to split the rows across, -1 for all cores.
         Returns:
             pd.DataFrame: The processed dataframe with new features.
         """
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(df))
+        if n_jobs <= 1:
+            return self._build_chunk(df)
+
+        # Rows are independent, so each worker builds a contiguous slice
+        bounds = [len(df) * i // n_jobs for i in range(n_jobs + 1)]
+        chunks = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(self._build_chunk, chunks))
+        return pd.concat(parts)
+
+    def _build_chunk(self, df):
         # Create a copy to avoid SettingWithCopyWarning
         df = df.copy()
 
         # Parse JSON columns
         if 'genres' in df.columns:
-            df['genres'] = df['genres'].apply(self.convert)
+            df['genres'] = [self.convert(v) for v in df['genres']]
         if 'keywords' in df.columns:
-            df['keywords'] = df['keywords'].apply(self.convert)
+            df['keywords'] = [self.convert(v) for v in df['keywords']]
         if 'cast' in df.columns:
-            df['cast'] = df['cast'].apply(self.convert3)
+            df['cast'] = [self.convert3(v) for v in df['cast']]
         if 'crew' in df.columns:
-            df['crew'] = df['crew'].apply(self.fetch_director)
+            df['crew'] = [self.fetch_director(v) for v in df['crew']]
             
         # Rename crew to director for clarity since we extracted director
         # But commonly we just keep the extracted list in a 'director' column
@@ -83,7 +133,7 @@ class FeatureBuilder:
         
         # Collapse spaces
         for feature in features:
-            df[feature] = df[feature].apply(self.collapse)
+            df[feature] = [self.collapse(v) for v in df[feature]]
 
         # Rename columns from merge
         if 'title_x' in df.columns:
@@ -94,8 +144,11 @@ class FeatureBuilder:
         # Create soup
         # Ensure we don't have NaNs that break join
         for feature in features:
-             df[feature] = df[feature].apply(lambda x: x if isinstance(x, list) else [])
+            df[feature] = [x if isinstance(x, list) else [] for x in df[feature]]
 
-        df['soup'] = df.apply(self.create_soup, axis=1)
+        df['soup'] = [
+            ' '.join(k) + ' ' + ' '.join(c) + ' ' + ' '.join(d) + ' ' + ' '.join(g)
+            for k, c, d, g in zip(df['keywords'], df['cast'], df['director'], df['genres'])
+        ]
         
         return df
@@ -0,0 +1,293 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from src.ml.neighbors import NeighborIndex, top_k, top_k_rows
+
+
+def _unit(vectors):
+    # Unit rows turn the dot product into cosine similarity
+    vectors = normalize(vectors.astype('float32'))
+    return sp.csr_matrix(vectors) if sp.issparse(vectors) else np.ascontiguousarray(vectors)
+
+
+def _dense(block):
+    return block.toarray() if sp.issparse(block) else np.asarray(block)
+
+
+class ExactIndex:
+    def __init__(self, block_size=256):
+        """
+        Brute-force cosine index: every query is scored against every
+        movie. The reference the approximate backends are measured against.
+        Args:
+            block_size (int): Queries scored per block
+        """
+        self.block_size = block_size
+        self.unit_vectors = None
+
+    def fit(self, vectors):
+        """
+        Indexes the movie vectors.
+        Args:
+            vectors (np.ndarray or scipy.sparse matrix): Movie vectors
+        Returns:
+            ExactIndex: self
+        """
+        self.unit_vectors = _unit(vectors)
+        self._unit_t = self.unit_vectors.T.tocsc() if sp.issparse(self.unit_vectors) else self.unit_vectors.T
+        return self
+
+    def __len__(self):
+        return self.unit_vectors.shape[0]
+
+    def query(self, queries, k, exclude=None):
+        """
+        Finds the k most similar movies of each query vector.
+        Args:
+            queries (np.ndarray or scipy.sparse matrix): (Q, F) query vectors
+            k (int): Neighbors per query
+            exclude (array-like or None): Row to leave out per query, -1 for none
+        Returns:
+            tuple: (indices, scores) arrays of shape (Q, k)
+        """
+        queries = _unit(queries)
+        k = max(min(k, len(self) - (exclude is not None)), 0)
+        indices, scores = [], []
+        for start in range(0, queries.shape[0], self.block_size):
+            block = _dense(queries[start:start + self.block_size] @ self._unit_t)
+            if exclude is not None:
+                rows = np.asarray(exclude[start:start + self.block_size])
+                hit = rows >= 0
+                block[np.flatnonzero(hit), rows[hit]] = -np.inf
+            best_indices, best_scores = top_k_rows(block, np.arange(len(self)), k)
+            indices.append(best_indices)
+            scores.append(best_scores)
+        if not indices:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+        return np.vstack(indices), np.vstack(scores)
+
+    def neighbors(self, row, top_n):
+        """
+        Returns the top_n neighbors of an indexed movie, itself excluded.
+        """
+        indices, scores = self.query(self.unit_vectors[row:row + 1], top_n, exclude=[row])
+        return indices[0], scores[0]
+
+
+class IVFIndex:
+    def __init__(self, n_lists=None, n_probe=8, n_iter=10, seed=0):
+        """
+        Inverted-file index: movies are clustered with spherical k-means
+        and a query only scores the movies of its n_probe closest
+        clusters. With n_lists ~ sqrt(N) a query costs O(sqrt(N))
+        centroid scores plus about n_probe / n_lists of the catalog.
+        Args:
+            n_lists (int or None): Clusters, defaults to sqrt(N)
+            n_probe (int): Clusters scanned per query; higher is slower
+                but closer to exact
+            n_iter (int): k-means iterations
+            seed (int): Seed of the centroid initialization
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.unit_vectors = None
+
+    def fit(self, vectors, block_size=4096):
+        """
+        Clusters the movie vectors into inverted lists.
+        Args:
+            vectors (np.ndarray or scipy.sparse matrix): Movie vectors
+            block_size (int): Rows assigned per block
+        Returns:
+            IVFIndex: self
+        """
+        self.unit_vectors = _unit(vectors)
+        n = self.unit_vectors.shape[0]
+        n_lists = self.n_lists or int(np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+
+        # 1. Start from randomly chosen movies
+        rng = np.random.default_rng(self.seed)
+        centroids = _dense(self.unit_vectors[np.sort(rng.choice(n, n_lists, replace=False))])
+        centroids = centroids.astype(np.float32)
+
+        # 2. Spherical k-means: assign to the closest centroid, re-center
+        assign = np.zeros(n, dtype=np.int64)
+        for _ in range(self.n_iter):
+            assign = self._assign(centroids, block_size)
+            members = sp.csr_matrix(
+                (np.ones(n, dtype=np.float32), (assign, np.arange(n))), shape=(n_lists, n)
+            )
+            sums = _dense(members @ self.unit_vectors).astype(np.float32)
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty clusters keep their previous centroid
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+        if self.n_iter:
+            assign = self._assign(centroids, block_size)
+
+        # 3. Inverted lists: rows grouped by cluster, ascending within one
+        self.centroids = centroids
+        self.list_rows = np.argsort(assign, kind='stable').astype(np.int32)
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=self.list_offsets[1:])
+        return self
+
+    def to_arrays(self):
+        """
+        Returns:
+            dict: The fitted clusters and inverted lists as arrays, for
+                ModelPersistence.save_arrays; the vectors are saved apart
+        """
+        return {
+            "centroids": self.centroids,
+            "list_rows": self.list_rows,
+            "list_offsets": self.list_offsets,
+            "n_probe": np.asarray([self.n_probe], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, unit_vectors, n_probe=None):
+        """
+        Restores an index saved with to_arrays, without clustering again.
+        Args:
+            arrays (dict): Arrays returned by to_arrays
+            unit_vectors (np.ndarray or scipy.sparse matrix): The unit rows
+                the index was fitted on, used as given so memory-mapped
+                rows are not copied
+            n_probe (int or None): Overrides the saved n_probe
+        Returns:
+            IVFIndex: Index ready to query
+        """
+        index = cls(
+            n_lists=len(arrays["centroids"]),
+            n_probe=int(arrays["n_probe"][0]) if n_probe is None else n_probe
+        )
+        index.unit_vectors = unit_vectors
+        index.centroids = np.asarray(arrays["centroids"], dtype=np.float32)
+        index.list_rows = np.asarray(arrays["list_rows"])
+        index.list_offsets = np.asarray(arrays["list_offsets"])
+        return index
+
+    def _assign(self, centroids, block_size):
+        n = self.unit_vectors.shape[0]
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, block_size):
+            scores = _dense(self.unit_vectors[start:start + block_size] @ centroids.T)
+            assign[start:start + block_size] = scores.argmax(axis=1)
+        return assign
+
+    def __len__(self):
+        return self.unit_vectors.shape[0]
+
+    def query(self, queries, k, exclude=None):
+        """
+        Finds approximately the k most similar movies of each query.
+        Clusters are probed closest first; beyond n_probe, more are
+        probed only until there are k candidates.
+        Args:
+            queries (np.ndarray or scipy.sparse matrix): (Q, F) query vectors
+            k (int): Neighbors per query
+            exclude (array-like or None): Row to leave out per query, -1 for none
+        Returns:
+            tuple: (indices, scores) arrays of shape (Q, k)
+        """
+        queries = _unit(queries)
+        n_queries = queries.shape[0]
+        k = max(min(k, len(self) - (exclude is not None)), 0)
+        indices = np.zeros((n_queries, k), dtype=np.int64)
+        scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+
+        centroid_scores = _dense(queries @ self.centroids.T)
+        sizes = np.diff(self.list_offsets)
+        for q in range(n_queries):
+            skip = -1 if exclude is None else int(exclude[q])
+            order = np.argsort(-centroid_scores[q], kind='stable')
+            needed = k + (skip >= 0)
+            # Probe n_probe lists, then keep going until there are k candidates
+            enough = np.searchsorted(np.cumsum(sizes[order]), needed) + 1
+            probed = order[:max(self.n_probe, enough)]
+            candidates = np.sort(np.concatenate([
+                self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probed
+            ]))
+            if skip >= 0:
+                candidates = candidates[candidates != skip]
+
+            candidate_scores = _dense(self.unit_vectors[candidates] @ queries[q].T).ravel()
+            best = top_k(candidate_scores, k)
+            indices[q] = candidates[best]
+            scores[q] = candidate_scores[best]
+        return indices, scores
+
+    def neighbors(self, row, top_n):
+        """
+        Returns approximately the top_n neighbors of an indexed movie,
+        itself excluded.
+        """
+        indices, scores = self.query(self.unit_vectors[row:row + 1], top_n, exclude=[row])
+        return indices[0], scores[0]
+
+
+def build_neighbor_index(index, k=50, block_size=256):
+    """
+    Queries a fitted index with every indexed movie to build the top-K
+    neighbor index artifact.
+    Args:
+        index (ExactIndex or IVFIndex): Fitted backend
+        k (int): Neighbors kept per movie
+        block_size (int): Movies queried per batch
+    Returns:
+        NeighborIndex: int32 neighbor rows and float32 scores
+    """
+    n = len(index)
+    k = max(min(k, n - 1), 0)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        rows = np.arange(start, end)
+        indices[start:end], scores[start:end] = index.query(index.unit_vectors[start:end], k, exclude=rows)
+    return NeighborIndex(indices, scores)
+
+
+def recall_report(index, k=10, sample=1000, seed=0):
+    """
+    Measures an approximate index against exact search.
+    Args:
+        index (IVFIndex): Fitted backend to evaluate
+        k (int): Neighbors compared per query
+        sample (int): Movies used as queries
+        seed (int): Seed of the query sample
+    Returns:
+        dict: recall@k and mean per-query latency of both engines
+    """
+    n = len(index)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(n, min(sample, n), replace=False))
+    queries = index.unit_vectors[rows]
+    exact = ExactIndex().fit(index.unit_vectors)
+
+    start = time.perf_counter()
+    exact_indices, exact_scores = exact.query(queries, k, exclude=rows)
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx_indices, approx_scores = index.query(queries, k, exclude=rows)
+    approx_seconds = time.perf_counter() - start
+
+    # A neighbor tied with the exact K-th score counts as found
+    found = (approx_scores >= exact_scores[:, -1:] - 1e-6).sum() if k else 0
+    total = exact_indices.size
+
+    return {
+        "k": k,
+        "queries": len(rows),
+        "recall": float(found / total) if total else 1.0,
+        "exact_ms_per_query": 1000 * exact_seconds / max(len(rows), 1),
+        "approx_ms_per_query": 1000 * approx_seconds / max(len(rows), 1),
+    }
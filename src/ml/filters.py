@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Filter names accepted by MovieFilters.mask
+FILTER_NAMES = ("genres", "min_year", "max_year", "min_vote_count", "language")
+
+# Distinct filter combinations whose combined mask is kept
+MASK_CACHE_SIZE = 256
+
+
+def _genre_key(genre):
+    # "Science Fiction", "science fiction" and "ScienceFiction" are one genre
+    return "".join(str(genre).split()).lower()
+
+
+class MovieFilters:
+    def __init__(self, df):
+        """
+        Boolean masks over the catalog rows, built once at load time from
+        the processed movie frame, so a filter costs a few vectorized ANDs
+        instead of a pass over the metadata.
+        Args:
+            df (pd.DataFrame): Processed movie frame, one row per movie
+        """
+        self.n = len(df)
+
+        self._genre_masks = {}
+        if 'genres' in df.columns:
+            for row, genres in enumerate(df['genres']):
+                for genre in genres if isinstance(genres, (list, tuple, np.ndarray)) else []:
+                    mask = self._genre_masks.get(_genre_key(genre))
+                    if mask is None:
+                        mask = self._genre_masks[_genre_key(genre)] = np.zeros(self.n, dtype=bool)
+                    mask[row] = True
+
+        # Movies without a release year fail every year filter
+        self._years = np.full(self.n, -1, dtype=np.int32)
+        if 'release_date' in df.columns:
+            years = pd.to_numeric(df['release_date'].astype(str).str[:4], errors='coerce')
+            self._years = years.fillna(-1).to_numpy(dtype=np.int32)
+        self._has_year = self._years >= 0
+
+        self._vote_counts = (
+            df['vote_count'].fillna(0).to_numpy(dtype=np.int64) if 'vote_count' in df.columns
+            else np.zeros(self.n, dtype=np.int64)
+        )
+
+        self._language_masks = {}
+        if 'original_language' in df.columns:
+            languages = df['original_language'].fillna('').astype(str).str.lower().to_numpy()
+            for language in np.unique(languages):
+                self._language_masks[language] = languages == language
+
+        # Shared by the scoring threads
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    @property
+    def genres(self):
+        """Normalized genre names that have a mask."""
+        return sorted(self._genre_masks)
+
+    def mask(self, genres=None, min_year=None, max_year=None, min_vote_count=None, language=None):
+        """
+        Rows passing every given filter; None leaves a filter out.
+        Unknown genres or languages match nothing rather than failing.
+        Args:
+            genres (str, list or None): Movies in any of these genres
+            min_year (int or None): Released in or after this year
+            max_year (int or None): Released in or before this year
+            min_vote_count (int or None): At least this many votes
+            language (str or None): ISO 639-1 original language, e.g. "en"
+        Returns:
+            np.ndarray or None: Read-only (N,) bool mask, None if no
+                filter is set
+        """
+        if isinstance(genres, str):
+            genres = [genres]
+        genre_keys = tuple(sorted({_genre_key(g) for g in genres})) if genres else ()
+        language = language.strip().lower() if language else None
+        key = (genre_keys, min_year, max_year, min_vote_count, language)
+        if key == ((), None, None, None, None):
+            return None
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        mask = np.ones(self.n, dtype=bool)
+        if genre_keys:
+            any_genre = np.zeros(self.n, dtype=bool)
+            for genre in genre_keys:
+                genre_mask = self._genre_masks.get(genre)
+                if genre_mask is not None:
+                    any_genre |= genre_mask
+            mask &= any_genre
+        if min_year is not None:
+            mask &= self._has_year & (self._years >= min_year)
+        if max_year is not None:
+            mask &= self._has_year & (self._years <= max_year)
+        if min_vote_count is not None:
+            mask &= self._vote_counts >= min_vote_count
+        if language is not None:
+            language_mask = self._language_masks.get(language)
+            mask &= language_mask if language_mask is not None else False
+
+        mask.flags.writeable = False
+        with self._cache_lock:
+            if key not in self._cache and len(self._cache) >= MASK_CACHE_SIZE:
+                # Oldest combination out; dicts keep insertion order
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = mask
+        return mask
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from src.feature_engineering.feature_builder import FeatureBuilder
+from src.ml.neighbors import NeighborIndex, top_k
+
+
+def update_model(artifacts, new_df, builder=None):
+    """
+    Adds or replaces movies without refitting or rescoring the catalog.
+    New rows are vectorized with the persisted vocabulary and scored
+    against the catalog; only the neighbor lists they can enter, and the
+    lists that pointed at a replaced movie, are patched.
+    Args:
+        artifacts (ModelArtifacts): Current model, with vectors and vectorizer
+        new_df (pd.DataFrame): Merged raw rows (movies + credits) to ingest
+        builder (FeatureBuilder or None): Feature builder to use
+    Returns:
+        tuple: (movies, neighbors, vectors, stats) of the updated model
+    """
+    if artifacts.vectors is None or artifacts.vectorizer is None:
+        raise ValueError("Incremental updates need the saved vectors and vectorizer.")
+    if not isinstance(artifacts.similarity, NeighborIndex):
+        raise ValueError("Incremental updates need a neighbor index artifact.")
+
+    builder = builder or FeatureBuilder()
+    processed_df = builder.build_features(new_df).reset_index(drop=True)
+    # Last occurrence wins if the same movie is listed twice
+    processed_df = processed_df.drop_duplicates(subset='id', keep='last').reset_index(drop=True)
+
+    movies = artifacts.movies.reset_index(drop=True)
+    n_old = len(movies)
+    row_of_id = {int(movie_id): row for row, movie_id in enumerate(movies['id'])}
+
+    # 1. Place every incoming movie: replace its row or append a new one
+    replaced_rows = []
+    new_rows = []
+    appended = 0
+    for movie_id in processed_df['id']:
+        row = row_of_id.get(int(movie_id))
+        if row is None:
+            row = n_old + appended
+            appended += 1
+        else:
+            replaced_rows.append(row)
+        new_rows.append(row)
+    new_rows = np.asarray(new_rows, dtype=np.int64)
+    replaced_rows = np.asarray(replaced_rows, dtype=np.int64)
+    n = n_old + appended
+
+    # 2. Vectors: the fitted vocabulary is reused, unknown terms are dropped
+    # (a hashing vectorizer has no vocabulary and keeps every term)
+    new_vectors = sp.csr_matrix(artifacts.vectorizer.transform(processed_df['soup']))
+    order = np.concatenate([np.arange(n_old), np.zeros(appended, dtype=np.int64)])
+    order[new_rows] = n_old + np.arange(len(new_rows))
+    stacked = sp.vstack([artifacts.vectors, new_vectors.astype(artifacts.vectors.dtype)], format='csr')
+    vectors = stacked[order]
+
+    # 3. Score only the changed rows against the whole catalog
+    unit = normalize(vectors.astype('float32'))
+    changed_scores = (unit[new_rows] @ unit.T).toarray()
+    changed_scores[np.arange(len(new_rows)), new_rows] = -np.inf
+
+    old = artifacts.similarity
+    k = old.k
+    indices = np.zeros((n, k), dtype=np.int32)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+    indices[:n_old] = old.indices
+    scores[:n_old] = old.scores
+
+    # 4. Rows that listed a replaced movie hold a stale score; rescore them
+    is_replaced = np.zeros(n, dtype=bool)
+    is_replaced[replaced_rows] = True
+    stale = np.flatnonzero(is_replaced[:n_old][old.indices].any(axis=1)) if n_old else []
+    is_changed = np.zeros(n, dtype=bool)
+    is_changed[new_rows] = True
+    stale = [row for row in stale if not is_changed[row]]
+    for row in stale:
+        row_scores = (unit[row] @ unit.T).toarray().ravel()
+        row_scores[row] = -np.inf
+        best = top_k(row_scores, k)
+        indices[row], scores[row] = best, row_scores[best]
+
+    # 5. Changed rows get fresh lists
+    for offset, row in enumerate(new_rows):
+        best = top_k(changed_scores[offset], k)
+        indices[row], scores[row] = best, changed_scores[offset][best]
+
+    # 6. Other rows only change where a changed movie beats their K-th score
+    kth = scores[:, -1] if k else np.zeros(n, dtype=np.float32)
+    beats = changed_scores.T >= kth[:, None]
+    beats[is_changed] = False
+    beats[stale] = False
+    patched = np.flatnonzero(beats.any(axis=1))
+    for row in patched:
+        candidates = np.concatenate([indices[row], new_rows]).astype(np.int64)
+        candidate_scores = np.concatenate([scores[row], changed_scores[:, row]])
+        # A changed movie may already be listed with its new score
+        candidates, first = np.unique(candidates, return_index=True)
+        candidate_scores = candidate_scores[first]
+        best = _rank(candidates, candidate_scores, k)
+        indices[row], scores[row] = candidates[best], candidate_scores[best]
+
+    # 7. Metadata: replace rows in place, append the rest
+    data = {}
+    for column in movies.columns:
+        values = movies[column].tolist() + [None] * appended
+        if column in processed_df.columns:
+            for offset, row in enumerate(new_rows):
+                values[row] = processed_df[column].iloc[offset]
+        data[column] = values
+    updated = pd.DataFrame(data)
+
+    stats = {
+        "added": appended,
+        "replaced": len(replaced_rows),
+        "rescored_rows": len(stale),
+        "patched_rows": len(patched),
+        "movies": n,
+    }
+    return updated, NeighborIndex(indices, scores), vectors, stats
+
+
+def _rank(candidates, candidate_scores, k):
+    # Same ordering as top_k: best score first, lower row on ties
+    order = np.lexsort((candidates, -candidate_scores))
+    return order[:k]
@@ -0,0 +1,90 @@
+import numpy as np
+
+
+def top_k(scores, k):
+    """
+    Selects the k highest scores of a 1-D array in O(N).
+    Ties are broken by the lower row index so results are deterministic.
+    Args:
+        scores (np.ndarray): Scores for every candidate
+        k (int): Number of candidates to keep
+    Returns:
+        np.ndarray: Candidate indices, best first
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        # k-th largest value; everything at or above it is a candidate
+        threshold = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def top_k_rows(scores, indices, k):
+    """
+    Row-wise top_k over a 2-D block, with the same ordering: highest
+    score first, lower index on ties.
+    Each (score, index) pair is packed into one int64 sort key, so the
+    whole block is selected with a single argpartition.
+    Args:
+        scores (np.ndarray): (B, C) float32 scores
+        indices (np.ndarray): (B, C) or (C,) candidate indices
+        k (int): Candidates to keep per row
+    Returns:
+        tuple: (indices, scores) arrays of shape (B, min(k, C))
+    """
+    scores = np.asarray(scores, dtype=np.float32) + np.float32(0.0)  # -0.0 -> 0.0
+    indices = np.broadcast_to(indices, scores.shape)
+    k = min(k, scores.shape[1])
+
+    # Order-preserving map from float32 bits to int32
+    bits = scores.view(np.int32).astype(np.int64)
+    bits = np.where(bits < 0, bits ^ 0x7FFFFFFF, bits)
+    keys = (bits << 32) | (0xFFFFFFFF - indices.astype(np.int64))
+
+    if k < scores.shape[1]:
+        keep = np.argpartition(keys, scores.shape[1] - k, axis=1)[:, scores.shape[1] - k:]
+        keys = np.take_along_axis(keys, keep, axis=1)
+    else:
+        keep = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    order = np.argsort(-keys, axis=1)
+    keep = np.take_along_axis(keep, order, axis=1)
+    return np.take_along_axis(indices, keep, axis=1), np.take_along_axis(scores, keep, axis=1)
+
+
+class NeighborIndex:
+    def __init__(self, indices, scores):
+        """
+        Top-K nearest neighbors of every movie.
+        Args:
+            indices (np.ndarray): (N, K) neighbor rows, best first
+            scores (np.ndarray): (N, K) cosine similarity of each neighbor
+        """
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    def neighbors(self, row, top_n):
+        """
+        Returns the stored neighbors of a movie.
+        Args:
+            row (int): Movie row
+            top_n (int): Number of neighbors, capped at K
+        Returns:
+            tuple: (indices, scores) arrays
+        """
+        return self.indices[row, :top_n], self.scores[row, :top_n]
@@ -1,66 +1,468 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from src.ml.ann import ExactIndex, IVFIndex
+from src.ml.filters import FILTER_NAMES, MovieFilters
+from src.ml.neighbors import NeighborIndex, top_k, top_k_rows
+from src.ml.search import EXACT, FUZZY, TitleSearchIndex, normalize_title
+from src.utils.metrics import REGISTRY
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "recommender_stage_seconds",
+    "Time spent in each stage of a recommender call",
+    labels=("stage",)
+)
+
+
+class AmbiguousTitleError(ValueError):
+    """Raised when several movies share the requested title."""
+
+    def __init__(self, movie_name, movie_ids):
+        self.movie_name = movie_name
+        self.movie_ids = movie_ids
+        super().__init__(
+            f"Movie '{movie_name}' is ambiguous, matching ids: {movie_ids}. "
+            "Use recommend_by_id instead."
+        )
+
+
+def query_soup(text):
+    """
+    Turns free text into soup terms. Comma-separated phrases are
+    collapsed the way names and keywords are in the soup
+    ("Christopher Nolan" -> "ChristopherNolan"); their words are kept too.
+    """
+    terms = []
+    for phrase in text.split(","):
+        words = phrase.split()
+        if len(words) > 1:
+            terms.append("".join(words))
+        terms.extend(words)
+    return " ".join(terms)
+
+
 class Recommender:
-    def __init__(self, df, similarity_matrix):
+    def __init__(self, df, similarity_matrix, vectors=None, vectorizer=None, version=None,
+                 search_index=None):
         """
         Args:
             df (pd.DataFrame): DataFrame with movie titles and indices
-            similarity_matrix (np.ndarray): Cosine similarity matrix
+            similarity_matrix (NeighborIndex, ExactIndex, IVFIndex, np.ndarray
+                or scipy.sparse matrix): Top-K neighbor index, a fitted
+                search backend, or a legacy full similarity matrix
+            vectors (scipy.sparse matrix or None): Movie vectors, needed
+                for free-text and multi-seed queries
+            vectorizer (TextVectorizer or None): Fitted vectorizer, needed
+                for free-text queries
+            version (str or None): Artifact version the model was loaded from
+            search_index (ExactIndex, IVFIndex or None): Index fitted on
+                vectors that free-text and multi-seed queries probe instead
+                of scoring the whole catalog
         """
         self.df = df.reset_index(drop=True)
+        self.version = version
         self.similarity = similarity_matrix
+        self.vectors = vectors
+        self.vectorizer = vectorizer
+        self.search_index = search_index
+        self._unit_vectors = None
+        # Titles as an array so results are gathered with one fancy index
+        self._titles = self.df['title'].to_numpy()
+        self._build_lookup()
+        self._search_index = TitleSearchIndex(self._titles)
+        self.filters = MovieFilters(self.df)
+
+    @property
+    def max_top_n(self):
+        """
+        Most recommendations an unfiltered single-movie request can
+        return: the K stored neighbors per movie, or None when every
+        movie is scored.
+        """
+        return self.similarity.k if isinstance(self.similarity, NeighborIndex) else None
 
-    def recommend(self, movie_name, top_n=5):
+    def _build_lookup(self):
+        """
+        Builds O(1) lookups from normalized title and TMDB id to row.
+        A title maps to every row carrying it so duplicates stay visible.
+        """
+        self._title_rows = {}
+        for row, title in enumerate(self._titles):
+            self._title_rows.setdefault(normalize_title(title), []).append(row)
+
+        self._id_rows = {}
+        self._ids = None
+        if 'id' in self.df.columns:
+            self._ids = self.df['id'].to_numpy()
+            self._id_rows = {int(movie_id): row for row, movie_id in enumerate(self._ids)}
+
+    def find_movie(self, movie_name):
+        """
+        Resolves a title to its row.
+        Args:
+            movie_name (str): Name of the movie
+        Returns:
+            int: Row of the movie
+        Raises:
+            ValueError: If the title is unknown
+            AmbiguousTitleError: If several movies share the title
+        """
+        rows = self._title_rows.get(normalize_title(movie_name))
+        if not rows:
+            raise ValueError(f"Movie '{movie_name}' not found in dataset.")
+        if len(rows) > 1:
+            movie_ids = [int(self._ids[row]) for row in rows] if self._ids is not None else rows
+            raise AmbiguousTitleError(movie_name, movie_ids)
+        return rows[0]
+
+    def find_movie_by_id(self, movie_id):
+        """
+        Resolves a TMDB id to its row.
+        Args:
+            movie_id (int): TMDB movie id
+        Returns:
+            int: Row of the movie
+        """
+        row = self._id_rows.get(int(movie_id))
+        if row is None:
+            raise ValueError(f"Movie id {movie_id} not found in dataset.")
+        return row
+
+    def recommend(self, movie_name, top_n=5, filters=None):
         """
         Recommends similar movies based on cosine similarity.
         Args:
             movie_name (str): Name of the movie
             top_n (int): Number of recommendations
+            filters (dict or None): Only recommend movies matching these,
+                keyed on genres, min_year, max_year, min_vote_count or language
         Returns:
             list: Recommended movie titles
         """
-        # Find movie index
-        if movie_name not in self.df['title'].values:
-            # Fallback or strict error? 
-            # Trying to handle potential case sensitivity or extra spaces might be good, 
-            # but for now strict matching as per user code.
-            raise ValueError(f"Movie '{movie_name}' not found in dataset.")
+        with STAGE_SECONDS.time(stage="resolve"):
+            movie_index = self.find_movie(movie_name)
+            mask = self._filter_mask(filters)
+        with STAGE_SECONDS.time(stage="score"):
+            indices = self._rank(movie_index, top_n, mask)
+        with STAGE_SECONDS.time(stage="materialize"):
+            return self._titles[indices].tolist()
+
+    def recommend_by_id(self, movie_id, top_n=5, filters=None):
+        """
+        Recommends similar movies for a TMDB id.
+        Unlike titles, ids are unique, so this is never ambiguous.
+        Args:
+            movie_id (int): TMDB movie id
+            top_n (int): Number of recommendations
+            filters (dict or None): Same as in recommend
+        Returns:
+            list: Recommended movie titles
+        """
+        with STAGE_SECONDS.time(stage="resolve"):
+            movie_index = self.find_movie_by_id(movie_id)
+            mask = self._filter_mask(filters)
+        with STAGE_SECONDS.time(stage="score"):
+            indices = self._rank(movie_index, top_n, mask)
+        with STAGE_SECONDS.time(stage="materialize"):
+            return self._titles[indices].tolist()
+
+    def recommend_many(self, queries, top_n=5):
+        """
+        Recommends similar movies for several movies at once.
+        All queries are resolved first and the resolved rows are ranked
+        together in one block, instead of one lookup and sort per movie.
+        Args:
+            queries (list): Movie titles (str) or TMDB ids (int)
+            top_n (int): Number of recommendations per movie
+        Returns:
+            list: One dict per query, in order, with either
+                "recommendations" or an "error" (plus "movie_ids" when
+                the title is ambiguous)
+        """
+        results = [None] * len(queries)
+        positions = []
+        rows = []
+        with STAGE_SECONDS.time(stage="resolve"):
+            for position, query in enumerate(queries):
+                try:
+                    if isinstance(query, (int, np.integer)):
+                        row = self.find_movie_by_id(query)
+                    else:
+                        row = self.find_movie(query)
+                except AmbiguousTitleError as e:
+                    results[position] = {"query": query, "error": str(e), "movie_ids": e.movie_ids}
+                    continue
+                except ValueError as e:
+                    results[position] = {"query": query, "error": str(e)}
+                    continue
+                positions.append(position)
+                rows.append(row)
+
+        if rows:
+            with STAGE_SECONDS.time(stage="score"):
+                ranked, _ = self._rank_many(np.asarray(rows, dtype=np.int64), top_n)
+            with STAGE_SECONDS.time(stage="materialize"):
+                for position, titles in zip(positions, self._titles[ranked]):
+                    results[position] = {"query": queries[position], "recommendations": titles.tolist()}
+        return results
+
+    def recommend_for_query(self, text=None, seeds=None, top_n=5):
+        """
+        Recommends movies for free text and/or a set of seed movies.
+        Both are folded into one query vector (the vectorized text plus
+        the centroid of the seeds' vectors), scored against the catalog
+        with a single sparse product.
+        Args:
+            text (str or None): Keywords, cast, director or genres,
+                comma-separated phrases
+            seeds (list or None): Seed movie titles (str) or TMDB ids (int)
+            top_n (int): Number of recommendations
+        Returns:
+            list: Recommended movie titles, seeds excluded
+        Raises:
+            ValueError: If a seed is unknown, the query is empty or
+                matches no known terms, or the vectors aren't loaded
+            AmbiguousTitleError: If a seed title is shared by several movies
+        """
+        if self.vectors is None:
+            raise ValueError("Query recommendations need the saved movie vectors.")
+
+        with STAGE_SECONDS.time(stage="resolve"):
+            seed_rows = [
+                self.find_movie_by_id(seed) if isinstance(seed, (int, np.integer)) else self.find_movie(seed)
+                for seed in seeds or []
+            ]
+
+        with STAGE_SECONDS.time(stage="vectorize"):
+            parts = []
+            if text and text.strip():
+                if self.vectorizer is None:
+                    raise ValueError("Free-text queries need the saved vectorizer.")
+                parts.append(normalize(sp.csr_matrix(self.vectorizer.transform([query_soup(text)]), dtype=np.float32)))
+            if seed_rows:
+                centroid = sp.csr_matrix(self._unit()[seed_rows].sum(axis=0))
+                parts.append(normalize(centroid))
+            if not parts:
+                raise ValueError("Query needs text or seed movies.")
 
-        movie_index = self.df[self.df['title'] == movie_name].index[0]
+            query = parts[0] if len(parts) == 1 else parts[0] + parts[1]
+            if query.nnz == 0:
+                raise ValueError("Query matches no known keywords, cast, director or genres.")
 
-        # Fetch similarity scores
+        with STAGE_SECONDS.time(stage="score"):
+            indices = self._rank_vector(query, top_n, np.unique(np.asarray(seed_rows, dtype=np.int64)))
+        with STAGE_SECONDS.time(stage="materialize"):
+            return self._titles[indices].tolist()
+
+    def _filter_mask(self, filters):
+        """
+        Resolves a filters dict to its precomputed row mask.
+        Raises:
+            ValueError: If a filter name is unknown
+        """
+        if not filters:
+            return None
+        unknown = sorted(set(filters) - set(FILTER_NAMES))
+        if unknown:
+            raise ValueError(f"Unknown filters {unknown}, use {list(FILTER_NAMES)}.")
+        return self.filters.mask(**filters)
+
+    def _unit(self):
+        # Normalized once, on the first query; a search index already holds them
+        if self._unit_vectors is None:
+            if self.search_index is not None and sp.issparse(self.search_index.unit_vectors):
+                self._unit_vectors = self.search_index.unit_vectors
+            else:
+                self._unit_vectors = sp.csr_matrix(normalize(sp.csr_matrix(self.vectors, dtype=np.float32)))
+        return self._unit_vectors
+
+    def _rank_vector(self, query, top_n, exclude_rows):
+        """
+        Selects the top_n movies most similar to a query vector.
+        Args:
+            query (scipy.sparse matrix): (1, F) unit query vector
+            top_n (int): Number of recommendations
+            exclude_rows (np.ndarray): Rows never recommended
+        Returns:
+            np.ndarray: Recommended movie rows
+        """
+        top_n = max(int(top_n), 0)
+
+        index = self.search_index if self.search_index is not None else self.similarity
+        if isinstance(index, (ExactIndex, IVFIndex)):
+            # The excluded rows may rank among the best hits; over-fetch by
+            # their count so top_n remain once they are dropped
+            indices, _ = index.query(query, top_n + len(exclude_rows))
+            indices = indices[0][~np.isin(indices[0], exclude_rows)]
+            return indices[:top_n]
+
+        scores = (self._unit() @ query.T).toarray().ravel()
+        scores[exclude_rows] = -np.inf
+        return top_k(scores, min(top_n, len(scores) - len(exclude_rows)))
+
+    def _rank(self, movie_index, top_n, mask=None):
+        """
+        Selects the rows of the top_n most similar movies, best first.
+        Args:
+            movie_index (int): Row of the query movie
+            top_n (int): Number of recommendations
+            mask (np.ndarray or None): Rows allowed in the result
+        Returns:
+            np.ndarray: Recommended movie rows
+        """
+        top_n = max(int(top_n), 0)
+        if mask is not None:
+            return self._rank_filtered(movie_index, top_n, mask)
+
+        # Neighbor index already holds the ranked top-K; search
+        # backends only score the candidates they select
+        if isinstance(self.similarity, (NeighborIndex, ExactIndex, IVFIndex)):
+            indices, _ = self.similarity.neighbors(movie_index, top_n)
+            return indices
+
+        # Fetch similarity scores (copied, the row is modified below)
         distances = self.similarity[movie_index]
+        if sp.issparse(distances):
+            distances = distances.toarray().ravel()
+        distances = np.array(distances, dtype=np.float32).ravel()
 
-        # Sort movies by similarity score
-        movie_list = sorted(
-            list(enumerate(distances)),
-            reverse=True,
-            key=lambda x: x[1]
-        )
+        # Exclude the movie itself wherever it would rank
+        distances[movie_index] = -np.inf
+
+        # O(N) partial selection instead of sorting the whole catalog
+        return top_k(distances, min(top_n, len(distances) - 1))
+
+    def _rank_filtered(self, movie_index, top_n, mask):
+        """
+        _rank restricted to the rows of a filter mask.
+        The stored neighbors are checked first: if top_n of them pass,
+        they are exactly the filtered top_n, for the cost of an
+        unfiltered query. Only rare filters fall back to scoring the
+        allowed rows directly.
+        Raises:
+            ValueError: If the fallback is needed but no vectors are loaded
+        """
+        top_n = min(top_n, np.count_nonzero(mask) - int(mask[movie_index]))
+        if top_n <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        if isinstance(self.similarity, (NeighborIndex, ExactIndex, IVFIndex)):
+            n_candidates = self.similarity.k if isinstance(self.similarity, NeighborIndex) else max(4 * top_n, 50)
+            candidates, _ = self.similarity.neighbors(movie_index, n_candidates)
+            candidates = np.asarray(candidates)
+            passing = candidates[mask[candidates]]
+            # Candidates covering the whole catalog hold every allowed row
+            if len(passing) >= top_n or len(candidates) >= len(self._titles) - 1:
+                return passing[:top_n]
 
-        # Exclude the movie itself and return top N
-        recommendations = [
-            self.df.iloc[i[0]].title
-            for i in movie_list[1: top_n + 1]
-        ]
+            unit = self._unit() if self.vectors is not None else getattr(self.similarity, "unit_vectors", None)
+            if unit is None:
+                raise ValueError(
+                    f"Only {len(passing)} of the stored neighbors pass the filters; "
+                    "ranking the other matching movies needs the saved movie vectors."
+                )
 
-        return recommendations
+            rows = np.flatnonzero(mask)
+            rows = rows[rows != movie_index]
+            scores = unit[rows] @ unit[movie_index].T
+            scores = scores.toarray().ravel() if sp.issparse(scores) else np.asarray(scores).ravel()
+            return rows[top_k(scores, top_n)]
 
-    def search_movies(self, query):
+        # Full rows: rejected movies simply never rank
+        distances = self.similarity[movie_index]
+        if sp.issparse(distances):
+            distances = distances.toarray().ravel()
+        distances = np.array(distances, dtype=np.float32).ravel()
+        distances[~mask] = -np.inf
+        distances[movie_index] = -np.inf
+        return top_k(distances, top_n)
+
+    def top_neighbors(self, rows, top_n):
+        """
+        Most similar movies of a block of catalog rows, with their
+        scores; the bulk counterpart of recommend_by_id.
+        Args:
+            rows (np.ndarray): Catalog rows of the query movies
+            top_n (int): Neighbors per movie
+        Returns:
+            tuple: (indices, scores) arrays of shape (len(rows), n),
+                best first
+        """
+        with STAGE_SECONDS.time(stage="score"):
+            return self._rank_many(np.asarray(rows, dtype=np.int64), top_n)
+
+    def _rank_many(self, movie_indices, top_n):
         """
-        Searches for movies matching the query (case-insensitive substring).
+        Row-wise _rank over several query movies in one block.
+        Args:
+            movie_indices (np.ndarray): Rows of the query movies
+            top_n (int): Number of recommendations
+        Returns:
+            tuple: (indices, scores) arrays of shape
+                (len(movie_indices), n), best first
+        """
+        top_n = max(int(top_n), 0)
+
+        if isinstance(self.similarity, NeighborIndex):
+            return (
+                np.asarray(self.similarity.indices[movie_indices, :top_n]),
+                np.asarray(self.similarity.scores[movie_indices, :top_n])
+            )
+        if isinstance(self.similarity, (ExactIndex, IVFIndex)):
+            queries = self.similarity.unit_vectors[movie_indices]
+            return self.similarity.query(queries, top_n, exclude=movie_indices)
+
+        # One gather for all query rows (copied, modified below)
+        distances = self.similarity[movie_indices]
+        if sp.issparse(distances):
+            distances = distances.toarray()
+        distances = np.array(distances, dtype=np.float32)
+        distances[np.arange(len(movie_indices)), movie_indices] = -np.inf
+
+        n = distances.shape[1]
+        return top_k_rows(distances, np.arange(n), min(top_n, n - 1))
+
+    def search_movies(self, query, limit=None):
+        """
+        Searches for movies matching the query.
+        Exact (case-insensitive) matches win; otherwise prefix and
+        substring matches are returned, and only when there are none,
+        titles within a few typos of the query.
         Args:
             query (str): Search query
+            limit (int or None): Maximum number of titles, None for all
         Returns:
-            list: List of matching movie titles
+            list: List of matching movie titles, best first
         """
-        query = query.lower().strip()
-        titles = self.df['title'].tolist()
-        
+        with STAGE_SECONDS.time(stage="search"):
+            hits = self._search_index.search(query, limit=limit)
+
         # 1. Exact match (case-insensitive)
-        exact_matches = [t for t in titles if t.lower() == query]
+        exact_matches = [h for h in hits if h.match == EXACT]
         if exact_matches:
-            return exact_matches
-            
-        # 2. Substring match
-        partial_matches = [t for t in titles if query in t.lower()]
-        
-        return partial_matches
+            return self._titles[[h.row for h in exact_matches]].tolist()
+
+        # 2. Prefix / substring match, falling back to typo tolerance
+        partial_matches = [h for h in hits if h.match != FUZZY] or hits
+        return self._titles[[h.row for h in partial_matches]].tolist()
+
+    def autocomplete(self, query, limit=10):
+        """
+        Ranked title suggestions for a partial or misspelled query.
+        Args:
+            query (str): Search query
+            limit (int): Maximum number of suggestions
+        Returns:
+            list: Dicts with title, id and match kind, best first
+        """
+        with STAGE_SECONDS.time(stage="search"):
+            hits = self._search_index.search(query, limit=limit)
+
+        suggestions = []
+        for hit in hits:
+            suggestion = {"title": self._titles[hit.row], "match": hit.match}
+            if self._ids is not None:
+                suggestion["id"] = int(self._ids[hit.row])
+            suggestions.append(suggestion)
+        return suggestions
@@ -0,0 +1,173 @@
+from collections import namedtuple
+
+import numpy as np
+
+
+# Match kinds, best first
+EXACT = "exact"
+PREFIX = "prefix"
+WORD_PREFIX = "word_prefix"
+SUBSTRING = "substring"
+FUZZY = "fuzzy"
+
+_RANK = {EXACT: 0, PREFIX: 1, WORD_PREFIX: 2, SUBSTRING: 3, FUZZY: 4}
+
+SearchHit = namedtuple("SearchHit", ["row", "match", "edits"])
+
+
+def normalize_title(title):
+    """Case- and whitespace-insensitive form of a title used for lookups."""
+    return " ".join(str(title).casefold().split())
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def short_grams(text):
+    """Returns the set of one- and two-character substrings of a string."""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def substring_edit_distance(pattern, text, max_edits):
+    """
+    Smallest edit distance between pattern and any substring of text.
+    Gives up early once every alignment needs more than max_edits.
+    Args:
+        pattern (str): Query
+        text (str): Title to match against
+        max_edits (int): Largest distance of interest
+    Returns:
+        int: Edit distance, or max_edits + 1 if it is larger
+    """
+    previous = [0] * (len(text) + 1)
+    for i, p in enumerate(pattern, 1):
+        current = [i] + [0] * len(text)
+        for j, t in enumerate(text, 1):
+            current[j] = min(
+                previous[j - 1] + (p != t),
+                previous[j] + 1,
+                current[j - 1] + 1,
+            )
+        if min(current) > max_edits:
+            return max_edits + 1
+        previous = current
+    return min(previous)
+
+
+class TitleSearchIndex:
+    def __init__(self, titles):
+        """
+        Character-trigram inverted index over movie titles, plus
+        postings of every one- and two-character substring for queries
+        too short for trigrams. Built once, then answers substring,
+        prefix and fuzzy queries without lowercasing or scanning the
+        catalog per call.
+        Args:
+            titles (list): Movie titles, in row order
+        """
+        self._normalized = [normalize_title(t) for t in titles]
+
+        postings = {}
+        for row, title in enumerate(self._normalized):
+            for gram in trigrams(title) | short_grams(title):
+                postings.setdefault(gram, []).append(row)
+        self._postings = {
+            gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()
+        }
+
+    def __len__(self):
+        return len(self._normalized)
+
+    def search(self, query, limit=10, fuzzy=True, max_edits=None):
+        """
+        Finds titles matching a query, best matches first.
+        Exact matches rank above title prefixes, word prefixes,
+        substrings and finally typo-tolerant fuzzy matches, which are
+        only looked for when the other kinds leave slots free (with
+        limit None, when there are none).
+        Args:
+            query (str): Search query
+            limit (int or None): Maximum number of hits, None for all
+            fuzzy (bool): Fill remaining slots with fuzzy matches
+            max_edits (int or None): Typos tolerated, defaults by query length
+        Returns:
+            list: SearchHit(row, match, edits) tuples
+        """
+        query = normalize_title(query)
+        if not query:
+            return []
+
+        hits = [
+            SearchHit(row, self._classify(query, row), 0)
+            for row in self._substring_candidates(query)
+        ]
+        hits.sort(key=lambda h: (_RANK[h.match], len(self._normalized[h.row]), h.row))
+
+        short = not hits if limit is None else len(hits) < limit
+        if fuzzy and len(query) >= 3 and short:
+            if max_edits is None:
+                max_edits = 1 if len(query) < 8 else 2
+            found = {h.row for h in hits}
+            slots = 10 if limit is None else limit - len(hits)
+            hits.extend(self._fuzzy(query, max_edits, found, slots))
+
+        return hits if limit is None else hits[:limit]
+
+    def _classify(self, query, row):
+        title = self._normalized[row]
+        if title == query:
+            return EXACT
+        if title.startswith(query):
+            return PREFIX
+        if (" " + title).find(" " + query) != -1:
+            return WORD_PREFIX
+        return SUBSTRING
+
+    def _substring_candidates(self, query):
+        if len(query) < 3:
+            # Too short for trigrams; the posting list is the answer
+            return self._postings.get(query, np.empty(0, dtype=np.int32)).tolist()
+
+        # Rows holding every trigram of the query, rarest trigram first
+        grams = sorted(trigrams(query), key=lambda g: len(self._postings.get(g, ())))
+        rows = self._postings.get(grams[0])
+        if rows is None:
+            return []
+        for gram in grams[1:]:
+            rows = np.intersect1d(rows, self._postings.get(gram, ()), assume_unique=True)
+            if rows.size == 0:
+                return []
+
+        # Trigrams can appear out of order, so confirm the substring
+        return [int(row) for row in rows if query in self._normalized[row]]
+
+    def _fuzzy(self, query, max_edits, exclude, slots):
+        grams = trigrams(query)
+        postings = [self._postings[g] for g in grams if g in self._postings]
+        if not postings or slots <= 0:
+            return []
+
+        # Each edit breaks at most three trigrams of the query; shared
+        # trigrams are counted over the postings, not the whole catalog
+        rows, counts = np.unique(np.concatenate(postings), return_counts=True)
+        needed = max(1, len(grams) - 3 * max_edits)
+        keep = counts >= needed
+        rows, counts = rows[keep], counts[keep]
+
+        # Verify only the candidates sharing the most trigrams
+        order = np.lexsort((rows, -counts))
+        candidates = rows[order[:max(slots * 2, 10)]]
+
+        hits = []
+        for row in candidates:
+            row = int(row)
+            if row in exclude:
+                continue
+            edits = substring_edit_distance(query, self._normalized[row], max_edits)
+            if edits <= max_edits:
+                hits.append(SearchHit(row, FUZZY, edits))
+
+        hits.sort(key=lambda h: (h.edits, len(self._normalized[h.row]), h.row))
+        return hits[:slots]
@@ -1,10 +1,240 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+import os
+
+import numpy as np
+import scipy.sparse as sp
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from src.ml.ann import build_neighbor_index
+from src.ml.neighbors import NeighborIndex, top_k_rows
+
+# Inputs shared by every tile of a process pool, sent once per worker
+_worker_shared = ()
+
+
+def _init_worker(shared):
+    global _worker_shared
+    _worker_shared = shared
+
+
+def _run_in_worker(task, args):
+    return task(*_worker_shared, *args)
+
+
+def _neighbor_block(vectors, vectors_t, start, end, k):
+    # Top-K of rows start:end against all rows of unit vectors
+    block = vectors[start:end] @ vectors_t
+    if sp.issparse(block):
+        block = block.toarray()
+
+    # A movie is never its own neighbor
+    rows = np.arange(end - start)
+    block[rows, rows + start] = -np.inf
+    return top_k_rows(block, np.arange(vectors.shape[0]), k)
+
+
+def _similarity_block(vectors, vectors_t, start, end, out_path=None):
+    # Full similarity rows start:end; written straight into the .npy
+    # file when a worker process can't share the output array
+    block = vectors[start:end] @ vectors_t
+    if sp.issparse(block):
+        block = block.toarray()
+    block = np.asarray(block, dtype=np.float32)
+    if out_path is None:
+        return block
+    out = np.load(out_path, mmap_mode="r+")
+    out[start:end] = block
+    out.flush()
+    return None
+
+
+def _tiled_neighbor_rows(vectors, inverse_norms, start, end, k, col_block):
+    # Running top-K of rows start:end, merged one candidate tile at a time
+    n = vectors.shape[0]
+    rows = _unit_rows(vectors, inverse_norms, start, end)
+    best_scores = np.empty((end - start, 0), dtype=np.float32)
+    best_indices = np.empty((end - start, 0), dtype=np.int64)
+
+    for col_start in range(0, n, col_block):
+        col_end = min(col_start + col_block, n)
+        cols = _unit_rows(vectors, inverse_norms, col_start, col_end).T.tocsc()
+        block = (rows @ cols).toarray()
+
+        # A movie is never its own neighbor
+        lo, hi = max(start, col_start), min(end, col_end)
+        if lo < hi:
+            diagonal = np.arange(lo, hi)
+            block[diagonal - start, diagonal - col_start] = -np.inf
+
+        best_indices, best_scores = top_k_rows(
+            np.hstack([best_scores, block]),
+            np.hstack([best_indices, np.broadcast_to(np.arange(col_start, col_end), block.shape)]),
+            k
+        )
+    return best_indices, best_scores
+
+
+def _unit_rows(vectors, inverse_norms, start, end):
+    block = sp.csr_matrix(vectors[start:end], dtype=np.float32)
+    return sp.diags(inverse_norms[start:end]) @ block
+
 
 class SimilarityEngine:
-    def __init__(self):
-        pass
+    def __init__(self, backend=None, n_jobs=1, executor="thread"):
+        """
+        Args:
+            backend (ExactIndex, IVFIndex or None): Index used by
+                compute_neighbors; None scores all pairs exactly
+            n_jobs (int): Row blocks scored at once, -1 for all cores
+            executor (str): "thread", or "process" to score outside the
+                GIL; each worker process receives one copy of the vectors
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}', use 'thread' or 'process'.")
+        self.backend = backend
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self.executor = executor
+
+    def _map_blocks(self, task, shared, args_list):
+        """
+        Yields task(*shared, *args) for every args, in order, across the pool.
+        """
+        if self.n_jobs == 1 or len(args_list) <= 1:
+            for args in args_list:
+                yield task(*shared, *args)
+            return
+
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(self.n_jobs, initializer=_init_worker, initargs=(shared,))
+            submit = lambda args: pool.submit(_run_in_worker, task, args)
+        else:
+            pool = ThreadPoolExecutor(self.n_jobs, thread_name_prefix="similarity")
+            submit = lambda args: pool.submit(task, *shared, *args)
 
-    def compute_similarity(self, vectors):
+        # At most two blocks per worker in flight, so finished results
+        # don't pile up in memory ahead of the consumer
+        with pool:
+            args_iter = iter(args_list)
+            pending = deque(submit(args) for args in islice(args_iter, 2 * self.n_jobs))
+            while pending:
+                result = pending.popleft().result()
+                for args in islice(args_iter, 1):
+                    pending.append(submit(args))
+                yield result
+
+    def compute_similarity(self, vectors, dense_output=True, out=None, block_size=1024):
+        """
+        Computes the pairwise cosine similarity between all vectors.
+        With an output array or n_jobs > 1, rows are scored block by
+        block across the pool and written into out, so a memory-mapped
+        out keeps the N x N matrix on disk rather than in RAM.
+        Args:
+            vectors (np.ndarray or scipy.sparse matrix): Movie vectors
+            dense_output (bool): Return a dense array even for sparse input
+            out (np.ndarray or None): (N, N) float32 output, e.g. from
+                np.lib.format.open_memmap; required with a process pool
+            block_size (int): Rows scored per block
+        Returns:
+            np.ndarray or scipy.sparse.csr_matrix: Similarity matrix
+        """
         # Convert to float32 to save memory (Render free tier has 512MB limit)
+        # astype keeps sparse input sparse, so nothing is densified here
         vectors = vectors.astype('float32')
-        return cosine_similarity(vectors)
+        if out is None and (self.n_jobs == 1 or not dense_output):
+            similarity = cosine_similarity(vectors, dense_output=dense_output)
+            if sp.issparse(similarity):
+                return similarity.tocsr()
+            return similarity
+
+        n = vectors.shape[0]
+        out_path = None
+        if self.executor == "process" and self.n_jobs > 1:
+            out_path = getattr(out, "filename", None)
+            if out_path is None:
+                raise ValueError("A process pool writes into a memory-mapped .npy output; pass out.")
+        if out is None:
+            out = np.empty((n, n), dtype=np.float32)
+
+        vectors = normalize(vectors)
+        vectors_t = vectors.T.tocsc() if sp.issparse(vectors) else vectors.T
+        args_list = [(start, min(start + block_size, n), out_path) for start in range(0, n, block_size)]
+        results = self._map_blocks(_similarity_block, (vectors, vectors_t), args_list)
+        for (start, end, _), block in zip(args_list, results):
+            if block is not None:
+                out[start:end] = block
+        return out
+
+    def compute_neighbors(self, vectors, k=50, block_size=256):
+        """
+        Computes the top-K most similar movies of every movie.
+        Rows are scored block by block, so peak memory is
+        block_size x N instead of the full N x N matrix. With an
+        approximate backend each row only scores its candidates.
+        Args:
+            vectors (np.ndarray or scipy.sparse matrix): Movie vectors
+            k (int): Neighbors kept per movie
+            block_size (int): Rows scored per block
+        Returns:
+            NeighborIndex: int32 neighbor rows and float32 scores
+        """
+        if self.backend is not None:
+            return build_neighbor_index(self.backend.fit(vectors), k=k, block_size=block_size)
+
+        # Unit rows turn the dot product into cosine similarity
+        vectors = normalize(vectors.astype('float32'))
+        n = vectors.shape[0]
+        k = max(min(k, n - 1), 0)
+
+        indices = np.empty((n, k), dtype=np.int32)
+        scores = np.empty((n, k), dtype=np.float32)
+        vectors_t = vectors.T.tocsc() if sp.issparse(vectors) else vectors.T
+
+        args_list = [(start, min(start + block_size, n), k) for start in range(0, n, block_size)]
+        results = self._map_blocks(_neighbor_block, (vectors, vectors_t), args_list)
+        for (start, end, _), (best_indices, best_scores) in zip(args_list, results):
+            indices[start:end] = best_indices
+            scores[start:end] = best_scores
+
+        return NeighborIndex(indices, scores)
+
+    def compute_neighbors_tiled(self, vectors, indices_out, scores_out, row_block=4096, col_block=4096):
+        """
+        Computes the top-K neighbors tile by tile into preallocated,
+        typically memory-mapped, output arrays.
+        Row blocks are spread across the pool; each worker holds one
+        row_block x col_block tile of scores at a time and vectors are
+        normalized per block, so the input can be a memory-mapped CSR
+        matrix larger than RAM (with threads, which share it).
+        Ties at the K-th place may resolve differently from compute_neighbors.
+        Args:
+            vectors (scipy.sparse.csr_matrix): Movie vectors
+            indices_out (np.ndarray): (N, K) int32 output for neighbor rows
+            scores_out (np.ndarray): (N, K) float32 output for their scores
+            row_block (int): Query rows per tile
+            col_block (int): Candidate rows per tile
+        """
+        n = vectors.shape[0]
+        k = indices_out.shape[1]
+        if k == 0:
+            return
+
+        inverse_norms = self._inverse_norms(vectors, row_block)
+
+        # Row blocks are independent; each returns only its (rows, K) result
+        args_list = [(start, min(start + row_block, n), k, col_block) for start in range(0, n, row_block)]
+        results = self._map_blocks(_tiled_neighbor_rows, (vectors, inverse_norms), args_list)
+        for (start, end, _, _), (best_indices, best_scores) in zip(args_list, results):
+            indices_out[start:end] = best_indices
+            scores_out[start:end] = best_scores
+
+    def _inverse_norms(self, vectors, block_size):
+        inverse_norms = np.zeros(vectors.shape[0], dtype=np.float32)
+        for start in range(0, vectors.shape[0], block_size):
+            block = sp.csr_matrix(vectors[start:start + block_size], dtype=np.float32)
+            norms = np.sqrt(np.asarray(block.multiply(block).sum(axis=1)).ravel())
+            nonzero = norms > 0
+            inverse_norms[start:start + block_size][nonzero] = 1.0 / norms[nonzero]
+        return inverse_norms
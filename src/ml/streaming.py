@@ -0,0 +1,213 @@
+from collections import Counter
+import json
+import math
+import os
+import shutil
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from src.data_ingestion.data_loader import CREDIT_CSV_COLUMNS, MOVIE_CSV_COLUMNS, csv_dtypes, iter_data_chunks
+from src.feature_engineering.feature_builder import FeatureBuilder
+from src.ml.similarity import SimilarityEngine
+from src.ml.vectorizer import DEFAULT_HASH_FEATURES, TextVectorizer
+from src.utils.artifacts import MOVIE_COLUMNS, write_manifest
+
+# Parsed list columns spilled between passes, JSON-encoded
+LIST_COLUMNS = ['genres', 'keywords', 'cast', 'director']
+
+
+class StreamingBuilder:
+    def __init__(self, memory_budget_mb=256, top_k=50, max_features=5000, work_dir=None,
+                 hashing=False, n_features=DEFAULT_HASH_FEATURES, n_jobs=1):
+        """
+        Builds the artifact set in bounded memory, for catalogs too large
+        to hold raw frames, vectors or scores in RAM at once.
+        Args:
+            memory_budget_mb (int): Approximate peak memory to stay within
+            top_k (int): Neighbors kept per movie
+            max_features (int): Vocabulary size of the bag of words
+            work_dir (str or None): Scratch space for spill files
+            hashing (bool): Hash terms instead of counting them in a
+                separate pass to pick a vocabulary
+            n_features (int): Columns of the hashing vectorizer
+            n_jobs (int): Threads scoring neighbor tiles, -1 for all cores;
+                every thread holds its own tile, so the tile shrinks to match
+        """
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.top_k = top_k
+        self.max_features = max_features
+        self.work_dir = work_dir
+        self.hashing = hashing
+        self.n_features = n_features
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self.builder = FeatureBuilder()
+
+    def build(self, movies_path, credits_path, persistence):
+        """
+        Runs the streaming build and saves the artifacts.
+        Movies are written grouped by id partition rather than in CSV
+        order; ids, not rows, identify movies across builds.
+        Args:
+            movies_path (str): TMDB movies CSV
+            credits_path (str): TMDB credits CSV
+            persistence (ModelPersistence): Target artifact directory
+        Returns:
+            str: Version of the saved model
+        """
+        # A quarter of the budget each for parsed chunks, one joined
+        # partition, score tiles, and everything else
+        share = self.memory_budget // 4
+        scratch = tempfile.mkdtemp(dir=self.work_dir, prefix="stream-build-")
+        try:
+            raw_bytes = os.path.getsize(movies_path) + os.path.getsize(credits_path)
+            partitions = max(1, math.ceil(raw_bytes / share))
+
+            print(f"Spilling parsed rows into {partitions} partitions...")
+            self._spill_credits(credits_path, scratch, partitions, share)
+            self._spill_movies(movies_path, scratch, partitions, share)
+
+            print("Joining partitions and counting terms...")
+            self._join_partitions(scratch, partitions)
+            vectorizer = self._vectorizer(scratch, partitions)
+
+            print("Vectorizing...")
+            n_movies = self._write_vectors(scratch, partitions, vectorizer, persistence, share)
+
+            print(f"Computing top-{self.top_k} neighbors for {n_movies} movies in tiles...")
+            self._write_neighbors(persistence, n_movies, share)
+
+            persistence.save(vectorizer, "vectorizer.pkl")
+            return write_manifest(persistence, n_movies)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _spill_credits(self, path, scratch, partitions, share):
+        for chunk in iter_data_chunks(path, CREDIT_CSV_COLUMNS, share):
+            spilled = pd.DataFrame({
+                'id': chunk['movie_id'],
+                'cast': [json.dumps(self.builder.collapse(self.builder.convert3(v))) for v in chunk['cast']],
+                'director': [json.dumps(self.builder.collapse(self.builder.fetch_director(v))) for v in chunk['crew']],
+            })
+            self._append_partitions(spilled, scratch, "credits", partitions)
+
+    def _spill_movies(self, path, scratch, partitions, share):
+        for chunk in iter_data_chunks(path, MOVIE_CSV_COLUMNS, share):
+            chunk = chunk.copy()
+            for column in ('genres', 'keywords'):
+                chunk[column] = [json.dumps(self.builder.collapse(self.builder.convert(v))) for v in chunk[column]]
+            self._append_partitions(chunk, scratch, "movies", partitions)
+
+    def _append_partitions(self, df, scratch, prefix, partitions):
+        # Hash-partition on id so each movie's rows meet in one partition
+        for partition, part in df.groupby(df['id'] % partitions):
+            path = os.path.join(scratch, f"{prefix}-{partition}.csv")
+            part.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+    def _read_partition(self, scratch, prefix, partition):
+        path = os.path.join(scratch, f"{prefix}-{partition}.csv")
+        if not os.path.exists(path):
+            return None
+        return pd.read_csv(path, keep_default_na=False, na_values=[''], dtype=csv_dtypes(MOVIE_CSV_COLUMNS))
+
+    def _join_partitions(self, scratch, partitions):
+        # Only a learned vocabulary needs the term counts
+        analyzer = None if self.hashing else CountVectorizer(stop_words='english').build_analyzer()
+        os.makedirs(os.path.join(scratch, "joined"), exist_ok=True)
+        for partition in range(partitions):
+            movies = self._read_partition(scratch, "movies", partition)
+            credits = self._read_partition(scratch, "credits", partition)
+            joined_path = os.path.join(scratch, "joined", f"{partition}.csv")
+            if movies is None or credits is None:
+                continue
+
+            df = movies.merge(credits, on='id')
+            lists = {c: [json.loads(v) for v in df[c]] for c in LIST_COLUMNS}
+            # Same soup layout as FeatureBuilder.build_features
+            df['soup'] = [
+                ' '.join(k) + ' ' + ' '.join(c) + ' ' + ' '.join(d) + ' ' + ' '.join(g)
+                for k, c, d, g in zip(lists['keywords'], lists['cast'], lists['director'], lists['genres'])
+            ]
+            if analyzer is not None:
+                term_counts = Counter()
+                for soup in df['soup']:
+                    term_counts.update(analyzer(soup))
+                self._spill_term_counts(term_counts, scratch, partitions)
+            df.to_csv(joined_path, index=False)
+
+    def _spill_term_counts(self, term_counts, scratch, partitions):
+        # Hash-partition on the term so each term's counts meet in one
+        # bucket; the corpus vocabulary is never held in memory at once
+        counts = pd.DataFrame({'term': list(term_counts), 'count': list(term_counts.values())})
+        buckets = [zlib.crc32(term.encode()) % partitions for term in counts['term']]
+        for bucket, part in counts.groupby(buckets):
+            path = os.path.join(scratch, f"terms-{bucket}.csv")
+            part.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+    def _top_terms(self, scratch, partitions):
+        # Same criterion as CountVectorizer(max_features): the most frequent
+        # terms over the corpus; buckets hold disjoint terms, so merging
+        # each bucket's totals into the running top list is exact
+        top = []
+        for bucket in range(partitions):
+            path = os.path.join(scratch, f"terms-{bucket}.csv")
+            if not os.path.exists(path):
+                continue
+            counts = pd.read_csv(path, keep_default_na=False, dtype={'term': str, 'count': np.int64})
+            totals = counts.groupby('term')['count'].sum()
+            top = sorted(top + list(totals.items()), key=lambda tc: (-tc[1], tc[0]))[:self.max_features]
+        return [term for term, _ in top]
+
+    def _vectorizer(self, scratch, partitions):
+        if self.hashing:
+            return TextVectorizer(sparse=True, hashing=True, n_features=self.n_features)
+        # Indexed alphabetically, like a fitted CountVectorizer
+        terms = self._top_terms(scratch, partitions)
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        return TextVectorizer(max_features=self.max_features, sparse=True, vocabulary=vocabulary)
+
+    def _write_vectors(self, scratch, partitions, vectorizer, persistence, share):
+        n_features = vectorizer.n_features
+        dtypes = csv_dtypes(MOVIE_CSV_COLUMNS)
+        vectors = persistence.sparse_writer("vectors", n_features)
+        movies = persistence.frame_writer("movies", MOVIE_COLUMNS)
+        for partition in range(partitions):
+            path = os.path.join(scratch, "joined", f"{partition}.csv")
+            if not os.path.exists(path):
+                continue
+            chunks = pd.read_csv(
+                path, keep_default_na=False, na_values=[''], dtype=dtypes, chunksize=max(1, share // 4096)
+            )
+            for chunk in chunks:
+                vectors.append(vectorizer.transform(chunk['soup'].fillna('')))
+                for column in LIST_COLUMNS:
+                    chunk[column] = [json.loads(v) for v in chunk[column]]
+                movies.append(chunk)
+        vectors.close()
+        movies.close()
+        return vectors.n_rows
+
+    def _write_neighbors(self, persistence, n_movies, share):
+        k = max(min(self.top_k, n_movies - 1), 0)
+        path = os.path.join(persistence.artifact_dir, "neighbors")
+        os.makedirs(path, exist_ok=True)
+        indices = np.lib.format.open_memmap(
+            os.path.join(path, "indices.npy"), mode="w+", dtype=np.int32, shape=(n_movies, k)
+        )
+        scores = np.lib.format.open_memmap(
+            os.path.join(path, "scores.npy"), mode="w+", dtype=np.float32, shape=(n_movies, k)
+        )
+
+        # A tile holds a few float32/int64 copies of block x block scores,
+        # one tile per thread; threads share the memory-mapped vectors
+        block = max(64, int(math.sqrt(share / 32 / self.n_jobs)))
+        SimilarityEngine(n_jobs=self.n_jobs).compute_neighbors_tiled(
+            persistence.load_sparse("vectors"), indices, scores, row_block=block, col_block=block
+        )
+        indices.flush()
+        scores.flush()
+        del indices, scores
+        print(f"Saved: {path}")
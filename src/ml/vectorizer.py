@@ -1,18 +1,93 @@
-from sklearn.feature_extraction.text import CountVectorizer
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+
+# Columns of the hashing mode; large enough that distinct terms of a
+# 500k-movie catalog rarely collide
+DEFAULT_HASH_FEATURES = 2 ** 18
+
 
 class TextVectorizer:
-    def __init__(self, max_features=5000):
-        self.vectorizer = CountVectorizer(
-            max_features=max_features,
-            stop_words='english'
-        )
+    def __init__(self, max_features=5000, sparse=False, vocabulary=None, hashing=False,
+                 n_features=DEFAULT_HASH_FEATURES):
+        """
+        Args:
+            max_features (int): Vocabulary size of the bag of words
+            sparse (bool): Keep the output as a CSR matrix instead of densifying it
+            vocabulary (dict or None): Fixed term -> column mapping, skips fitting
+            hashing (bool): Hash terms to columns instead of learning a
+                vocabulary; there is no fit step and nothing to store, so
+                chunks can be vectorized independently
+            n_features (int): Number of columns in the hashing mode
+        """
+        self.hashing = hashing
+        if hashing:
+            # Plain term counts, like CountVectorizer, so scores stay comparable
+            self.vectorizer = HashingVectorizer(
+                n_features=n_features,
+                stop_words='english',
+                alternate_sign=False,
+                norm=None,
+                dtype=np.int64
+            )
+        else:
+            self.vectorizer = CountVectorizer(
+                max_features=None if vocabulary is not None else max_features,
+                stop_words='english',
+                vocabulary=vocabulary
+            )
+        self.sparse = sparse
 
-    def fit_transform(self, texts):
+    @property
+    def n_features(self):
+        """Number of output columns, once fitted."""
+        if getattr(self, "hashing", False):
+            return self.vectorizer.n_features
+        vocabulary = getattr(self.vectorizer, "vocabulary_", None) or self.vectorizer.vocabulary
+        return len(vocabulary)
+
+    def fit_transform(self, texts, n_jobs=1):
         """
         Fits the vectorizer and transforms text into vectors.
         Args:
             texts (pd.Series or list): Text data
+            n_jobs (int): Worker processes for the hashing mode, -1 for
+                all cores; fitting a vocabulary is a single pass
         Returns:
-            np.ndarray: Vectorized representation
+            np.ndarray or scipy.sparse.csr_matrix: Vectorized representation
         """
-        return self.vectorizer.fit_transform(texts).toarray()
+        if getattr(self, "hashing", False):
+            return self.transform(texts, n_jobs=n_jobs)
+        return self._format(self.vectorizer.fit_transform(texts))
+
+    def transform(self, texts, n_jobs=1):
+        """
+        Transforms text into vectors using the fitted vocabulary.
+        Args:
+            texts (pd.Series or list): Text data
+            n_jobs (int): Worker processes to split the texts across, -1 for all cores
+        Returns:
+            np.ndarray or scipy.sparse.csr_matrix: Vectorized representation
+        """
+        texts = list(texts)
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(texts))
+        if n_jobs <= 1:
+            return self._format(self.vectorizer.transform(texts))
+
+        # Texts are independent, so each worker vectorizes a contiguous slice
+        bounds = [len(texts) * i // n_jobs for i in range(n_jobs + 1)]
+        chunks = [texts[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(self.vectorizer.transform, chunks))
+        return self._format(sp.vstack(parts, format='csr'))
+
+    def _format(self, vectors):
+        # Older pickled vectorizers predate the sparse flag
+        if getattr(self, "sparse", False):
+            return sp.csr_matrix(vectors)
+        return vectors.toarray()
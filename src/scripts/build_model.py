@@ -1,27 +1,105 @@
+import argparse
+import functools
 import os
+
+import numpy as np
+import shutil
 import sys
+import tempfile
 
 # Ensure src modules are found
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
-from src.data_ingestion.data_loader import load_data
+from src.data_ingestion.data_loader import load_merged_data, merged_data_key, raw_data_paths
 from src.feature_engineering.feature_builder import FeatureBuilder
-from src.ml.vectorizer import TextVectorizer
+from src.ml.vectorizer import DEFAULT_HASH_FEATURES, TextVectorizer
+from src.ml.ann import IVFIndex, recall_report
+from src.ml.neighbors import NeighborIndex
 from src.ml.similarity import SimilarityEngine
+from src.ml.streaming import StreamingBuilder
 from src.utils.model_persistence import ModelPersistence
+from src.utils.artifacts import (
+    ArtifactError, load_manifest, replace_artifact_dir, save_model, verify_manifest
+)
+from src.utils.profiler import BuildProfiler, profile_stage
+from src.utils.stage_cache import STAGE_CACHE_KEEP, StageCache, stage_key
+
+# Vocabulary size of the bag of words
+VECTORIZER_FEATURES = 5000
 
-def build():
+def build(top_k=50, legacy_similarity=False, n_jobs=1, use_cache=True, backend="exact",
+          n_lists=None, n_probe=8, report_recall=False, profiler=None, raw_dir=None,
+          artifact_dir="artifacts", cache_dir=None, vectorizer="count",
+          hash_features=DEFAULT_HASH_FEATURES, similarity_executor="thread",
+          cache_keep=STAGE_CACHE_KEEP, clear_cache=False):
+    """
+    Builds and saves all model artifacts.
+    Every stage output is cached under a hash of its inputs and
+    parameters, so only stages downstream of a change are recomputed,
+    and an artifact set already built from the same keys is kept as is.
+    Args:
+        top_k (int): Neighbors kept per movie in the neighbor index
+        legacy_similarity (bool): Also save the dense N x N similarity.npy
+        n_jobs (int): Workers for feature building, hashing and similarity, -1 for all cores
+        use_cache (bool): Reuse cached stage outputs in data/cache
+        backend (str): "exact" all-pairs scoring or approximate "ivf"
+        n_lists (int or None): IVF clusters, defaults to sqrt(N)
+        n_probe (int): IVF clusters scanned per movie
+        report_recall (bool): Print the IVF recall@10 against exact search
+        profiler (BuildProfiler or None): Records time and memory per stage
+        raw_dir (str or None): Directory of the raw CSVs, defaults to data/raw
+        artifact_dir (str): Where the artifacts are written
+        cache_dir (str or None): Stage cache location, defaults to data/cache
+        vectorizer (str): "count" learns a vocabulary, "hashing" hashes
+            terms and vectorizes in n_jobs processes
+        hash_features (int): Columns of the hashing vectorizer
+        similarity_executor (str): "thread" or "process" pool for exact scoring
+        cache_keep (int): Most recently used entries kept per cached stage
+        clear_cache (bool): Delete every cached stage output first
+    Raises:
+        RuntimeError: If the raw data can't be read
+    """
     print("🔨 Starting model build process...")
-    
-    # 1. Load data
-    movies, credits = load_data()
-    if movies is None:
-        print("❌ Error loading data")
-        sys.exit(1)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "cache")
+    stage_cache_dir = os.path.join(cache_dir, "stages")
+    if clear_cache:
+        StageCache(stage_cache_dir).clear()
+
+    # 0. Content addresses of every stage, known before running any
+    try:
+        data_key = merged_data_key(cache_dir=cache_dir, raw_dir=raw_dir)
+    except OSError as e:
+        raise RuntimeError(f"Failed to load movie data: {e}")
+    stages = {"data": data_key}
+    stages["features"] = stage_key("features", {}, stages["data"])
+    vectorize_params = (
+        {"mode": "hashing", "n_features": hash_features} if vectorizer == "hashing"
+        else {"mode": "count", "max_features": VECTORIZER_FEATURES}
+    )
+    stages["vectorize"] = stage_key("vectorize", vectorize_params, stages["features"])
+    neighbor_params = {"k": top_k, "backend": backend}
+    if backend == "ivf":
+        # Clustering parameters only change IVF builds
+        neighbor_params.update(n_lists=n_lists, n_probe=n_probe)
+    stages["neighbors"] = stage_key("neighbors", neighbor_params, stages["vectorize"])
+
+    persistence = ModelPersistence(artifact_dir)
+    if use_cache and not legacy_similarity and _is_current(persistence, stages):
+        print("✅ Artifacts are up to date, nothing to build.")
+        if profiler is not None:
+            profiler.record_artifacts(persistence.artifact_dir)
+        return
+    cache = StageCache(stage_cache_dir, keep=cache_keep) if use_cache else None
 
-    # 2. Merge
+    # 1-2. Load and merge data (cached after the first run)
     print("Pre-processing data...")
-    df = movies.merge(credits, left_on="id", right_on="movie_id")
+    df = load_merged_data(
+        use_cache=use_cache, cache_dir=cache_dir, raw_dir=raw_dir, profiler=profiler, cache_keep=cache_keep
+    )
+    if df is None:
+        print("❌ Error loading data")
+        raise RuntimeError("Failed to load movie data")
     
     # Using full dataset (5000 movies) as per user request
     print(f"Dataset size: {len(df)} movies.")
@@ -29,28 +107,240 @@ def build():
     # 3. Feature Engineering
     print("Building features...")
     builder = FeatureBuilder()
-    processed_df = builder.build_features(df)
+    processed_df = _run_stage(
+        cache, profiler, "features", stages["features"],
+        functools.partial(builder.build_features, df, n_jobs=n_jobs),
+        lambda p, frame: p.save_frame(frame, "frame"),
+        lambda p: p.load_frame("frame"),
+        n_jobs=n_jobs
+    )
+    del df
 
     # 4. Vectorization
     print("Vectorizing...")
-    vectorizer = TextVectorizer()
-    vectors = vectorizer.fit_transform(processed_df['soup'])
+    def vectorize():
+        text_vectorizer = TextVectorizer(
+            max_features=VECTORIZER_FEATURES, sparse=True,
+            hashing=vectorizer == "hashing", n_features=hash_features
+        )
+        return text_vectorizer, text_vectorizer.fit_transform(processed_df['soup'], n_jobs=n_jobs)
+
+    def save_vectors(p, output):
+        p.save(output[0], "vectorizer.pkl")
+        p.save_sparse(output[1], "vectors")
+
+    text_vectorizer, vectors = _run_stage(
+        cache, profiler, "vectorize", stages["vectorize"], vectorize, save_vectors,
+        lambda p: (p.load("vectorizer.pkl"), p.load_sparse("vectors", mmap=False)),
+        mode=vectorizer
+    )
+    if profiler is not None:
+        profiler.stages[-1]["details"].update(
+            movies=vectors.shape[0], features=vectors.shape[1], nnz=int(vectors.nnz)
+        )
 
     # 5. Similarity
-    print("Computing similarity...")
-    similarity_engine = SimilarityEngine()
-    similarity = similarity_engine.compute_similarity(vectors)
+    print(f"Computing top-{top_k} neighbors ({backend})...")
+    ann_index = IVFIndex(n_lists=n_lists, n_probe=n_probe) if backend == "ivf" else None
+    similarity_engine = SimilarityEngine(backend=ann_index, n_jobs=n_jobs, executor=similarity_executor)
+    def compute_neighbors():
+        index = similarity_engine.compute_neighbors(vectors, k=top_k)
+        # The IVF clusters are kept so queries at serving time can probe them
+        return index, ann_index.to_arrays() if ann_index is not None else None
 
-    # 6. Save
-    print("Saving artifacts...")
-    persistence = ModelPersistence()
-    persistence.save(processed_df, "movies.pkl")
-    persistence.save(similarity, "similarity.pkl")
-    # We might not strictly need the vectorizer for inference if we only lookup by ID
-    # but saving it is good practice if we allow new user input text later.
-    persistence.save(vectorizer, "vectorizer.pkl")
+    def save_neighbors(p, output):
+        p.save_arrays({"indices": output[0].indices, "scores": output[0].scores}, "neighbors")
+        if output[1] is not None:
+            p.save_arrays(output[1], "ivf")
+
+    def load_neighbors(p):
+        ivf = p.load_arrays("ivf", mmap=False) if p.exists("ivf") else None
+        return NeighborIndex(**p.load_arrays("neighbors", mmap=False)), ivf
+
+    neighbors, ivf = _run_stage(
+        cache, profiler, "neighbors", stages["neighbors"],
+        compute_neighbors, save_neighbors, load_neighbors,
+        backend=backend, k=top_k
+    )
 
+    if ann_index is not None and report_recall:
+        if ann_index.unit_vectors is None:
+            print("IVF recall report skipped: neighbors were reused from the stage cache.")
+        else:
+            report = recall_report(ann_index, k=10)
+            print(
+                f"IVF recall@10: {report['recall']:.3f} over {report['queries']} movies "
+                f"({report['approx_ms_per_query']:.2f} ms/query vs "
+                f"{report['exact_ms_per_query']:.2f} ms exact)"
+            )
+
+    # 6. Save into a fresh directory, swapped in once complete
+    parent_dir = os.path.dirname(os.path.abspath(artifact_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".build-")
+    tmp_persistence = ModelPersistence(tmp_dir)
+    try:
+        if legacy_similarity:
+            # Full N x N matrix, O(N^2) memory; only for older consumers
+            print("Computing legacy similarity matrix...")
+            with profile_stage(profiler, "similarity"):
+                # Rows go straight to disk; the N x N matrix is never held in RAM
+                n = vectors.shape[0]
+                similarity = np.lib.format.open_memmap(
+                    os.path.join(tmp_dir, "similarity.npy"), mode="w+", dtype=np.float32, shape=(n, n)
+                )
+                similarity_engine.compute_similarity(vectors, out=similarity)
+                similarity.flush()
+                del similarity
+
+        print("Saving artifacts...")
+        with profile_stage(profiler, "save"):
+            # Vectors and vectorizer serve free-text and multi-seed queries;
+            # the manifest is written last
+            save_model(tmp_persistence, processed_df, neighbors, vectors, text_vectorizer, stages=stages, ivf=ivf)
+        replace_artifact_dir(tmp_dir, persistence.artifact_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if profiler is not None:
+        profiler.record_artifacts(persistence.artifact_dir)
+
+    print("✅ Build complete.")
+
+def _run_stage(cache, profiler, name, key, compute, save, load, **details):
+    # Runs one stage, or loads its output from the stage cache
+    if cache is None:
+        with profile_stage(profiler, name, cache="off", **details):
+            return compute()
+    with profile_stage(profiler, name, **details) as record:
+        output, hit = cache.get_or_compute(name, key, compute, save, load)
+        if record is not None:
+            record["cache"] = "hit" if hit else "miss"
+    if hit:
+        print(f"  reused cached {name} ({key})")
+    return output
+
+def _is_current(persistence, stages):
+    # The existing set was built from the same stage keys and is intact
+    manifest = load_manifest(persistence)
+    if manifest is None or manifest.get("stages") != stages:
+        return False
+    try:
+        verify_manifest(persistence, checksums=False)
+    except ArtifactError:
+        return False
+    return not persistence.exists("similarity.npy")
+
+def build_streaming(top_k=50, memory_budget_mb=256, work_dir=None, profiler=None,
+                    vectorizer="count", hash_features=DEFAULT_HASH_FEATURES, n_jobs=1):
+    """
+    Builds the artifacts in bounded memory, streaming the raw CSVs
+    through disk instead of loading the merged dataset.
+    Args:
+        top_k (int): Neighbors kept per movie in the neighbor index
+        memory_budget_mb (int): Approximate peak memory of the build
+        work_dir (str or None): Scratch space for spill files
+        profiler (BuildProfiler or None): Records time and memory of the build
+        vectorizer (str): "count" or "hashing", which skips the term-counting pass
+        hash_features (int): Columns of the hashing vectorizer
+        n_jobs (int): Threads scoring neighbor tiles, -1 for all cores
+    """
+    print(f"🔨 Starting streaming build ({memory_budget_mb} MB budget)...")
+    movies_path, credits_path = raw_data_paths()
+    builder = StreamingBuilder(
+        memory_budget_mb=memory_budget_mb, top_k=top_k, work_dir=work_dir,
+        hashing=vectorizer == "hashing", n_features=hash_features, n_jobs=n_jobs
+    )
+    persistence = ModelPersistence()
+    # Written next to the current set and swapped in once complete
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(persistence.artifact_dir)), prefix=".build-")
+    try:
+        with profile_stage(profiler, "streaming_build", memory_budget_mb=memory_budget_mb):
+            builder.build(movies_path, credits_path, ModelPersistence(tmp_dir))
+        replace_artifact_dir(tmp_dir, persistence.artifact_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if profiler is not None:
+        profiler.record_artifacts(persistence.artifact_dir)
     print("✅ Build complete.")
 
 if __name__ == "__main__":
-    build()
+    parser = argparse.ArgumentParser(description="Build movie recommender artifacts")
+    parser.add_argument("--top-k", type=int, default=50,
+                        help="Neighbors kept per movie")
+    parser.add_argument("--legacy-similarity", action="store_true",
+                        help="Also save the dense similarity.npy matrix")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Workers for feature building, hashing and similarity (-1 for all cores)")
+    parser.add_argument("--similarity-executor", choices=["thread", "process"], default="thread",
+                        help="Pool scoring similarity blocks; processes avoid the GIL but copy the vectors")
+    parser.add_argument("--vectorizer", choices=["count", "hashing"], default="count",
+                        help="Learn a vocabulary (count) or hash terms to columns (hashing, no fit step)")
+    parser.add_argument("--hash-features", type=int, default=DEFAULT_HASH_FEATURES,
+                        help="Columns of the hashing vectorizer")
+    parser.add_argument("--no-cache", "--no-data-cache", dest="no_cache", action="store_true",
+                        help="Recompute every stage instead of reusing cached stage outputs")
+    parser.add_argument("--cache-keep", type=int, default=STAGE_CACHE_KEEP,
+                        help="Most recently used entries kept per cached stage")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="Delete every cached stage output before building")
+    parser.add_argument("--backend", choices=["exact", "ivf"], default="exact",
+                        help="Neighbor search: exact all-pairs or approximate IVF")
+    parser.add_argument("--n-lists", type=int, default=None,
+                        help="IVF clusters (default sqrt of the catalog size)")
+    parser.add_argument("--n-probe", type=int, default=8,
+                        help="IVF clusters scanned per movie; higher trades speed for recall")
+    parser.add_argument("--recall-report", action="store_true",
+                        help="Print the IVF recall@10 against exact search")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Build in bounded memory, spilling intermediate data to disk")
+    parser.add_argument("--memory-budget", type=int, default=256,
+                        help="Approximate peak memory in MB for --streaming")
+    parser.add_argument("--work-dir", default=None,
+                        help="Scratch directory for --streaming spill files")
+    parser.add_argument("--profile-report", default=None,
+                        help="Write per-stage time, CPU, peak memory and artifact sizes to this JSON file")
+    parser.add_argument("--cprofile-dir", default=None,
+                        help="Also dump a cProfile file per stage into this directory")
+    parser.add_argument("--memory-limit", type=int, default=512,
+                        help="Memory limit in MB the profiled peak RSS is checked against")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile_report or args.cprofile_dir:
+        profiler = BuildProfiler(profile_dir=args.cprofile_dir, memory_limit_mb=args.memory_limit)
+
+    if args.streaming:
+        build_streaming(
+            top_k=args.top_k,
+            memory_budget_mb=args.memory_budget,
+            work_dir=args.work_dir,
+            profiler=profiler,
+            vectorizer=args.vectorizer,
+            hash_features=args.hash_features,
+            n_jobs=args.jobs
+        )
+    else:
+        build(
+            top_k=args.top_k,
+            legacy_similarity=args.legacy_similarity,
+            n_jobs=args.jobs,
+            use_cache=not args.no_cache,
+            backend=args.backend,
+            n_lists=args.n_lists,
+            n_probe=args.n_probe,
+            report_recall=args.recall_report,
+            profiler=profiler,
+            vectorizer=args.vectorizer,
+            hash_features=args.hash_features,
+            similarity_executor=args.similarity_executor,
+            cache_keep=args.cache_keep,
+            clear_cache=args.clear_cache
+        )
+
+    if profiler is not None:
+        print(profiler.summary())
+        if args.profile_report:
+            profiler.write(args.profile_report)
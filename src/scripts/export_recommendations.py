@@ -0,0 +1,175 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Ensure src modules are found
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.ml.recommender import Recommender
+from src.utils.artifacts import load_model
+from src.utils.model_persistence import ModelPersistence
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet")
+
+# One row per (movie, neighbor) pair in the flat formats
+FLAT_COLUMNS = ["movie_id", "title", "rank", "recommended_id", "recommended_title", "score"]
+
+
+class JsonlWriter:
+    """One line per movie, its recommendations nested best first."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, ids, titles, neighbor_ids, neighbor_titles, scores):
+        for i in range(len(ids)):
+            self.file.write(json.dumps({
+                "movie_id": int(ids[i]),
+                "title": titles[i],
+                "recommendations": [
+                    {"movie_id": int(movie_id), "title": title, "score": round(float(score), 6)}
+                    for movie_id, title, score in zip(neighbor_ids[i], neighbor_titles[i], scores[i])
+                ],
+            }) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    """One row per recommendation, ranked from 1."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(FLAT_COLUMNS)
+
+    def write(self, ids, titles, neighbor_ids, neighbor_titles, scores):
+        ranks = np.arange(1, neighbor_ids.shape[1] + 1)
+        for i in range(len(ids)):
+            self.writer.writerows(zip(
+                [int(ids[i])] * len(ranks), [titles[i]] * len(ranks), ranks.tolist(),
+                neighbor_ids[i].tolist(), neighbor_titles[i],
+                np.round(scores[i].astype(np.float64), 6).tolist()
+            ))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Same rows as the CSV, one row group per batch."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow; install it or export to jsonl or csv.")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("movie_id", pa.int64()), ("title", pa.string()), ("rank", pa.int32()),
+            ("recommended_id", pa.int64()), ("recommended_title", pa.string()), ("score", pa.float32()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, ids, titles, neighbor_ids, neighbor_titles, scores):
+        k = neighbor_ids.shape[1]
+        columns = [
+            np.repeat(np.asarray(ids, dtype=np.int64), k),
+            np.repeat(np.asarray(titles, dtype=object), k),
+            np.tile(np.arange(1, k + 1, dtype=np.int32), len(ids)),
+            neighbor_ids.astype(np.int64).ravel(),
+            [title for row in neighbor_titles for title in row],
+            scores.astype(np.float32).ravel(),
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+def export_format(path, fmt=None):
+    """
+    Resolves the export format, from the file extension if not given.
+    Raises:
+        ValueError: If the format is unknown
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', use one of {list(EXPORT_FORMATS)}.")
+    return fmt
+
+
+def export(output_path, top_k=10, fmt=None, batch_size=1024, artifact_dir="artifacts"):
+    """
+    Writes the top_k recommendations of every movie in the catalog.
+    Movies are ranked a block of batch_size rows at a time and each block
+    is written out before the next, so memory stays bounded by the block
+    rather than the catalog.
+    Args:
+        output_path (str): File to write, replaced only once complete
+        top_k (int): Recommendations per movie
+        fmt (str or None): "jsonl", "csv" or "parquet", defaults to the
+            extension of output_path
+        batch_size (int): Movies ranked per block
+        artifact_dir (str): Artifact set to export
+    Returns:
+        int: Number of movies exported
+    """
+    fmt = export_format(output_path, fmt)
+    print(f"📦 Exporting top-{top_k} recommendations to {output_path} ({fmt})...")
+
+    # 1. Load the model the way the API does
+    artifacts = load_model(ModelPersistence(artifact_dir), verify="size")
+    recommender = Recommender(
+        artifacts.movies, artifacts.similarity, artifacts.vectors, version=artifacts.version
+    )
+    ids = recommender.df['id'].to_numpy()
+    titles = recommender.df['title'].to_numpy(dtype=object)
+    n_movies = len(ids)
+
+    # 2. Rank and write block by block
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = os.path.join(out_dir, f".{os.path.basename(output_path)}.tmp")
+    writer = WRITERS[fmt](tmp_path)
+    start = time.perf_counter()
+    try:
+        for block_start in range(0, n_movies, batch_size):
+            rows = np.arange(block_start, min(block_start + batch_size, n_movies))
+            neighbors, scores = recommender.top_neighbors(rows, top_k)
+            writer.write(ids[rows], titles[rows], ids[neighbors], titles[neighbors].tolist(), scores)
+
+            done = rows[-1] + 1
+            elapsed = time.perf_counter() - start
+            print(f"  {done}/{n_movies} movies ({done / elapsed if elapsed else 0:.0f}/s)")
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    writer.close()
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ Exported {n_movies} movies (version {artifacts.version}) in {time.perf_counter() - start:.1f}s.")
+    return n_movies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the recommendations of every movie")
+    parser.add_argument("output", help="File to write, e.g. exports/similar.jsonl")
+    parser.add_argument("--top-k", type=int, default=10, help="Recommendations per movie")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None,
+                        help="Output format, defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Movies ranked per block")
+    parser.add_argument("--artifact-dir", default="artifacts", help="Artifact set to export")
+    args = parser.parse_args()
+
+    export(args.output, args.top_k, args.format, args.batch_size, args.artifact_dir)
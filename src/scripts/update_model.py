@@ -0,0 +1,69 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+# Ensure src modules are found
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.ml.incremental import update_model
+from src.utils.model_persistence import ModelPersistence
+from src.utils.artifacts import load_model, replace_artifact_dir, save_model
+
+def update(movies_path, credits_path, artifact_dir="artifacts", output_dir=None):
+    """
+    Ingests new or changed movies into an existing artifact set.
+    Args:
+        movies_path (str): CSV of movies in the TMDB movies format
+        credits_path (str): CSV of their credits in the TMDB credits format
+        artifact_dir (str): Artifact set to update
+        output_dir (str or None): Where to write the new version, defaults to artifact_dir
+    """
+    print("🔄 Starting incremental update...")
+    output_dir = output_dir or artifact_dir
+
+    # 1. Load the current model, including vectors and vocabulary
+    artifacts = load_model(ModelPersistence(artifact_dir), with_vectorizer=True)
+    print(f"Current model: {len(artifacts.movies)} movies (version {artifacts.version}).")
+
+    # 2. Load and merge the incoming rows
+    movies = pd.read_csv(movies_path)
+    credits = pd.read_csv(credits_path)
+    df = movies.merge(credits, left_on="id", right_on="movie_id")
+    print(f"Ingesting {len(df)} movies...")
+
+    # 3. Patch vectors and neighbor lists
+    updated_movies, neighbors, vectors, stats = update_model(artifacts, df)
+    print(
+        f"Added {stats['added']}, replaced {stats['replaced']}, "
+        f"rescored {stats['rescored_rows']} and patched {stats['patched_rows']} neighbor lists."
+    )
+
+    # 4. Write the new version next to the target, then swap it in
+    parent_dir = os.path.dirname(os.path.abspath(output_dir))
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".update-")
+    try:
+        version = save_model(
+            ModelPersistence(tmp_dir), updated_movies, neighbors, vectors,
+            artifacts.vectorizer, parent=artifacts.version
+        )
+        replace_artifact_dir(tmp_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    print(f"✅ Update complete: {stats['movies']} movies, version {version}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add or update movies without a full rebuild")
+    parser.add_argument("--movies", required=True, help="CSV of new or changed movies")
+    parser.add_argument("--credits", required=True, help="CSV of their credits")
+    parser.add_argument("--artifact-dir", default="artifacts", help="Artifact set to update")
+    parser.add_argument("--output-dir", default=None,
+                        help="Write the new version here instead of replacing --artifact-dir")
+    args = parser.parse_args()
+
+    update(args.movies, args.credits, args.artifact_dir, args.output_dir)
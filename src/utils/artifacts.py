@@ -0,0 +1,288 @@
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from src.ml.ann import IVFIndex
+from src.ml.neighbors import NeighborIndex
+
+# Movie metadata kept in the artifact set; the raw JSON columns and the
+# soup are only needed at build time
+MOVIE_COLUMNS = [
+    'id', 'title', 'genres', 'keywords', 'cast', 'director',
+    'release_date', 'original_language', 'vote_average', 'vote_count', 'popularity',
+]
+
+# Bump when the artifact layout changes in a way older readers can't load
+MANIFEST_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+class ArtifactError(RuntimeError):
+    """Raised for artifact sets that are incomplete, corrupt or incompatible."""
+
+
+class ModelArtifacts:
+    def __init__(self, movies, similarity, vectors=None, vectorizer=None, version=None,
+                 search_index=None):
+        """
+        Everything the recommender needs at serving time.
+        Args:
+            movies (pd.DataFrame): Movie metadata, one row per movie
+            similarity (NeighborIndex or np.ndarray): Neighbors or legacy matrix
+            vectors (scipy.sparse.csr_matrix or None): Movie vectors
+            vectorizer (TextVectorizer or None): Fitted vectorizer
+            version (str or None): Artifact version, None for legacy sets
+            search_index (IVFIndex or None): Index for query vectors, set
+                when the neighbors were built with the IVF backend
+        """
+        self.movies = movies
+        self.similarity = similarity
+        self.vectors = vectors
+        self.vectorizer = vectorizer
+        self.version = version
+        self.search_index = search_index
+
+
+def new_version():
+    """Returns a fresh, sortable artifact version string."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def save_model(persistence, movies, neighbors, vectors=None, vectorizer=None, parent=None, stages=None,
+               ivf=None):
+    """
+    Saves a model in the memory-mappable artifact format.
+    Args:
+        persistence (ModelPersistence): Target artifact directory
+        movies (pd.DataFrame): Processed movie frame
+        neighbors (NeighborIndex): Top-K neighbor index
+        vectors (scipy.sparse matrix or None): Movie vectors
+        vectorizer (TextVectorizer or None): Fitted vectorizer
+        parent (str or None): Version this model was derived from
+        stages (dict or None): Stage cache keys the model was built from
+        ivf (dict or None): IVFIndex.to_arrays of an index fitted on vectors
+    Returns:
+        str: Version of the saved model
+    """
+    persistence.save_frame(movies, "movies", columns=MOVIE_COLUMNS)
+    persistence.save_arrays(
+        {"indices": neighbors.indices, "scores": neighbors.scores}, "neighbors"
+    )
+    if vectors is not None:
+        persistence.save_sparse(vectors, "vectors")
+    if vectorizer is not None:
+        persistence.save(vectorizer, "vectorizer.pkl")
+    if ivf is not None and vectors is not None:
+        persistence.save_arrays(ivf, "ivf")
+        # Unit rows the index scores candidates with, memory-mapped at
+        # load rather than normalized into a heap copy
+        persistence.save_sparse(normalize(sp.csr_matrix(vectors, dtype=np.float32)), "ivf_vectors")
+
+    return write_manifest(persistence, len(movies), parent, stages)
+
+
+def write_manifest(persistence, n_movies, parent=None, stages=None):
+    """
+    Stamps a complete artifact directory with a fresh version and the
+    size and SHA-256 of every file. Written last and atomically, so a
+    set without a manifest was never finished.
+    Args:
+        persistence (ModelPersistence): Artifact directory
+        n_movies (int): Movies in the set
+        parent (str or None): Version this model was derived from
+        stages (dict or None): Stage name -> cache key the set was built from
+    Returns:
+        str: The new version
+    """
+    version = new_version()
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "parent": parent,
+        "movies": n_movies,
+        "stages": stages or {},
+        "files": {
+            name: {"size": os.path.getsize(path), "sha256": _sha256(path)}
+            for name, path in _artifact_files(persistence.artifact_dir)
+        },
+    }
+    path = os.path.join(persistence.artifact_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return version
+
+
+def load_manifest(persistence):
+    """
+    Returns the manifest of an artifact set, None if it has none.
+    """
+    path = os.path.join(persistence.artifact_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def verify_manifest(persistence, checksums=True):
+    """
+    Checks that an artifact set is complete and loadable by this code.
+    Args:
+        persistence (ModelPersistence): Artifact directory
+        checksums (bool): Also hash every file, not just compare sizes
+    Returns:
+        dict: The manifest
+    Raises:
+        ArtifactError: If the manifest is missing or from a newer format,
+            or a file is missing, truncated or modified
+    """
+    manifest = load_manifest(persistence)
+    if manifest is None:
+        raise ArtifactError(f"{persistence.artifact_dir} has no {MANIFEST_NAME}; the build did not finish")
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise ArtifactError(
+            f"Artifact format {manifest.get('format')} is not supported (expected {MANIFEST_FORMAT}); rebuild the model"
+        )
+
+    for name, expected in manifest["files"].items():
+        path = os.path.join(persistence.artifact_dir, name)
+        if not os.path.exists(path):
+            raise ArtifactError(f"Artifact file {name} is missing")
+        if os.path.getsize(path) != expected["size"]:
+            raise ArtifactError(f"Artifact file {name} has the wrong size")
+        if checksums and _sha256(path) != expected["sha256"]:
+            raise ArtifactError(f"Artifact file {name} does not match its checksum")
+    return manifest
+
+
+def _artifact_files(artifact_dir):
+    for root, _, files in os.walk(artifact_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, artifact_dir).replace(os.sep, "/")
+            if name not in (MANIFEST_NAME, f"{MANIFEST_NAME}.tmp"):
+                yield name, path
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_version(persistence):
+    """
+    Returns the version of an artifact set, None if it predates versioning.
+    """
+    manifest = load_manifest(persistence)
+    return manifest["version"] if manifest is not None else None
+
+
+def replace_artifact_dir(source_dir, target_dir):
+    """
+    Moves a freshly written artifact set into place.
+    Processes that already memory-mapped the old files keep reading them;
+    the old directory is only unlinked after the swap. If the new set
+    can't be moved in, the old one is put back.
+    """
+    previous_dir = None
+    if os.path.exists(target_dir):
+        previous_dir = f"{target_dir.rstrip(os.sep)}.prev"
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        os.rename(target_dir, previous_dir)
+    try:
+        os.rename(source_dir, target_dir)
+    except BaseException:
+        if previous_dir is not None:
+            os.rename(previous_dir, target_dir)
+        raise
+    if previous_dir is not None:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+
+def has_model(persistence):
+    """
+    Checks whether an artifact set exists. It may still be incomplete;
+    load_model verifies it.
+    """
+    has_movies = persistence.exists("movies") or persistence.exists("movies.pkl")
+    has_similarity = any(
+        persistence.exists(name)
+        for name in ("neighbors", "neighbors.pkl", "similarity.npy", "similarity.pkl")
+    )
+    return has_movies and has_similarity
+
+
+def load_model(persistence, with_vectorizer=False, verify="checksum", with_search_index=False):
+    """
+    Loads a model, preferring the memory-mapped format and falling
+    back to the pickled artifacts of older builds.
+    Memory-mapped sets must carry a manifest and match it; only the
+    original pickled layout, which predates manifests, loads without one.
+    Args:
+        persistence (ModelPersistence): Source artifact directory
+        with_vectorizer (bool): Also unpickle the fitted vectorizer
+        verify (str): "checksum" to hash every file, "size" to only
+            compare sizes, "none" to skip the manifest check
+        with_search_index (bool): Also restore the IVF index of sets
+            built with the IVF backend, for query vectors
+    Returns:
+        ModelArtifacts: Loaded artifacts
+    Raises:
+        ArtifactError: If the set is incomplete, corrupt or incompatible
+    """
+    if verify != "none":
+        pickled = persistence.exists("movies.pkl") and not (
+            persistence.exists("movies") or persistence.exists("neighbors")
+        )
+        if load_manifest(persistence) is not None or not pickled:
+            verify_manifest(persistence, checksums=verify == "checksum")
+
+    if persistence.exists("movies"):
+        movies = persistence.load_frame("movies")
+    else:
+        movies = persistence.load("movies.pkl")
+
+    vectors = None
+    if persistence.exists("vectors"):
+        vectors = persistence.load_sparse("vectors")
+    elif persistence.exists("vectors.npz"):
+        vectors = persistence.load_sparse("vectors.npz")
+
+    vectorizer = None
+    if with_vectorizer and persistence.exists("vectorizer.pkl"):
+        vectorizer = persistence.load("vectorizer.pkl")
+
+    search_index = None
+    if with_search_index and persistence.exists("ivf") and persistence.exists("ivf_vectors"):
+        search_index = IVFIndex.from_arrays(
+            persistence.load_arrays("ivf", mmap=True), persistence.load_sparse("ivf_vectors")
+        )
+
+    return ModelArtifacts(
+        movies, load_similarity(persistence), vectors, vectorizer, load_version(persistence),
+        search_index=search_index
+    )
+
+
+def load_similarity(persistence):
+    """
+    Loads the top-K neighbor index, falling back to the legacy
+    dense similarity matrix for artifact sets built before it.
+    """
+    if persistence.exists("neighbors"):
+        arrays = persistence.load_arrays("neighbors", mmap=True)
+        return NeighborIndex(arrays["indices"], arrays["scores"])
+    if persistence.exists("neighbors.pkl"):
+        return persistence.load("neighbors.pkl")
+    if persistence.exists("similarity.npy"):
+        return persistence.load_array("similarity.npy", mmap=True)
+    return persistence.load("similarity.pkl")
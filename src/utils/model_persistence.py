@@ -1,6 +1,11 @@
+import json
 import pickle
 import os
 
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
 class ModelPersistence:
     def __init__(self, artifact_dir="artifacts"):
         self.artifact_dir = artifact_dir
@@ -22,3 +27,285 @@ class ModelPersistence:
         path = os.path.join(self.artifact_dir, filename)
         with open(path, "rb") as f:
             return pickle.load(f)
+
+    def save_arrays(self, arrays, name):
+        """
+        Saves named numpy arrays as raw .npy files in a directory.
+        Args:
+            arrays (dict): Array name -> np.ndarray
+            name (str): Directory inside the artifact dir
+        """
+        path = os.path.join(self.artifact_dir, name)
+        os.makedirs(path, exist_ok=True)
+        for key, array in arrays.items():
+            np.save(os.path.join(path, f"{key}.npy"), np.ascontiguousarray(array))
+        print(f"Saved: {path}")
+
+    def load_arrays(self, name, mmap=True):
+        """
+        Loads the arrays saved with save_arrays.
+        With mmap the file pages are mapped read-only instead of copied,
+        so every worker process shares one page-cache copy.
+        Args:
+            name (str): Directory inside the artifact dir
+            mmap (bool): Memory-map instead of reading into the heap
+        Returns:
+            dict: Array name -> np.ndarray (np.memmap when mmap is set)
+        """
+        path = os.path.join(self.artifact_dir, name)
+        mmap_mode = "r" if mmap else None
+        return {
+            filename[:-len(".npy")]: np.load(os.path.join(path, filename), mmap_mode=mmap_mode)
+            for filename in sorted(os.listdir(path))
+            if filename.endswith(".npy")
+        }
+
+    def save_sparse(self, matrix, name):
+        """
+        Saves a scipy sparse matrix as its raw CSR arrays.
+        Only the non-zero entries are written, so size tracks nnz.
+        """
+        matrix = sp.csr_matrix(matrix)
+        self.save_arrays({
+            "data": matrix.data,
+            "indices": matrix.indices,
+            "indptr": matrix.indptr,
+            "shape": np.asarray(matrix.shape, dtype=np.int64),
+        }, name)
+
+    def load_sparse(self, name, mmap=True):
+        """
+        Loads a sparse matrix saved with save_sparse as CSR.
+        Legacy .npz files are read with scipy instead.
+        """
+        if name.endswith(".npz"):
+            return sp.load_npz(os.path.join(self.artifact_dir, name)).tocsr()
+
+        arrays = self.load_arrays(name, mmap=mmap)
+        shape = tuple(int(n) for n in arrays["shape"])
+        return sp.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=shape,
+            copy=False
+        )
+
+    def save_frame(self, df, name, columns=None):
+        """
+        Saves a DataFrame column by column without pickle.
+        Numeric columns are stored as .npy arrays; text and list columns
+        as one UTF-8 buffer plus offsets (list values JSON-encoded).
+        Args:
+            df (pd.DataFrame): Frame to save
+            name (str): Directory inside the artifact dir
+            columns (list or None): Columns to keep, None for all
+        """
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+
+        arrays = {}
+        schema = []
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                kind = "array"
+                arrays[str(i)] = series.to_numpy()
+            else:
+                values = series.tolist()
+                kind = "str" if all(isinstance(v, str) for v in values) else "json"
+                if kind == "json":
+                    values = [json.dumps(v) for v in values]
+                data, offsets = _encode_strings(values)
+                arrays[f"{i}.data"] = data
+                arrays[f"{i}.offsets"] = offsets
+            schema.append({"name": column, "kind": kind})
+
+        self.save_arrays(arrays, name)
+        with open(os.path.join(self.artifact_dir, name, "schema.json"), "w") as f:
+            json.dump({"rows": len(df), "columns": schema}, f)
+
+    def load_frame(self, name):
+        """
+        Loads a DataFrame saved with save_frame.
+        """
+        with open(os.path.join(self.artifact_dir, name, "schema.json")) as f:
+            schema = json.load(f)
+        arrays = self.load_arrays(name, mmap=True)
+
+        data = {}
+        for i, column in enumerate(schema["columns"]):
+            if column["kind"] == "array":
+                data[column["name"]] = np.asarray(arrays[str(i)])
+                continue
+            values = _decode_strings(arrays[f"{i}.data"], arrays[f"{i}.offsets"])
+            if column["kind"] == "json":
+                values = [json.loads(v) for v in values]
+            data[column["name"]] = values
+
+        return pd.DataFrame(data, index=pd.RangeIndex(schema["rows"]))
+
+    def save_array(self, array, filename):
+        """
+        Saves a single numpy array as a raw .npy file.
+        """
+        path = os.path.join(self.artifact_dir, filename)
+        np.save(path, np.ascontiguousarray(array))
+        print(f"Saved: {path}")
+
+    def load_array(self, filename, mmap=True):
+        """
+        Loads a single .npy array, memory-mapped by default.
+        """
+        path = os.path.join(self.artifact_dir, filename)
+        return np.load(path, mmap_mode="r" if mmap else None)
+
+    def frame_writer(self, name, columns=None):
+        """
+        Returns a FrameWriter that streams DataFrame chunks to disk in
+        the save_frame layout, for frames that don't fit in memory.
+        """
+        return FrameWriter(os.path.join(self.artifact_dir, name), columns)
+
+    def sparse_writer(self, name, n_cols, dtype=np.int64):
+        """
+        Returns a SparseWriter that streams CSR row blocks to disk in
+        the save_sparse layout.
+        """
+        return SparseWriter(os.path.join(self.artifact_dir, name), n_cols, dtype)
+
+    def exists(self, filename):
+        """
+        Checks whether an artifact is present in the artifact directory.
+        """
+        return os.path.exists(os.path.join(self.artifact_dir, filename))
+
+
+def _encode_strings(values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    np.cumsum(lengths, out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_strings(data, offsets):
+    raw = data.tobytes()
+    offsets = offsets.tolist()
+    return [raw[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+class ArrayAppender:
+    def __init__(self, path, dtype):
+        """
+        Appends 1-D chunks to a .npy file whose length isn't known upfront.
+        Chunks go to a raw .part file that close() turns into the .npy.
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._file = open(path + ".part", "wb")
+
+    def append(self, array):
+        array = np.ascontiguousarray(array, dtype=self.dtype)
+        array.tofile(self._file)
+        self.length += array.size
+
+    def close(self, shape=None):
+        self._file.close()
+        shape = shape or (self.length,)
+        out = np.lib.format.open_memmap(self.path, mode="w+", dtype=self.dtype, shape=shape)
+        if self.length:
+            raw = np.memmap(self.path + ".part", dtype=self.dtype, mode="r", shape=(self.length,))
+            flat = out.reshape(-1)
+            # Copy through the page cache in bounded steps
+            step = 1 << 22
+            for start in range(0, self.length, step):
+                flat[start:start + step] = raw[start:start + step]
+            del raw
+        out.flush()
+        del out
+        os.remove(self.path + ".part")
+
+
+class SparseWriter:
+    def __init__(self, path, n_cols, dtype=np.int64):
+        """
+        Streams CSR row blocks into the save_sparse layout.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.n_cols = n_cols
+        self.n_rows = 0
+        self.nnz = 0
+        self._data = ArrayAppender(os.path.join(path, "data.npy"), dtype)
+        self._indices = ArrayAppender(os.path.join(path, "indices.npy"), np.int32)
+        self._indptr = ArrayAppender(os.path.join(path, "indptr.npy"), np.int64)
+        self._indptr.append([0])
+
+    def append(self, matrix):
+        matrix = sp.csr_matrix(matrix)
+        self._data.append(matrix.data)
+        self._indices.append(matrix.indices)
+        self._indptr.append(matrix.indptr[1:] + self.nnz)
+        self.n_rows += matrix.shape[0]
+        self.nnz += matrix.nnz
+
+    def close(self):
+        self._data.close()
+        self._indices.close()
+        self._indptr.close()
+        np.save(os.path.join(self.path, "shape.npy"), np.asarray([self.n_rows, self.n_cols], dtype=np.int64))
+        print(f"Saved: {self.path}")
+
+
+class FrameWriter:
+    def __init__(self, path, columns=None):
+        """
+        Streams DataFrame chunks into the save_frame layout.
+        Unlike save_frame, every non-numeric column is stored JSON-encoded,
+        since a later chunk may hold values the first one didn't.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._schema = None
+        self._writers = {}
+
+    def append(self, df):
+        if self.columns is not None:
+            df = df[[c for c in self.columns if c in df.columns]]
+        if self._schema is None:
+            self._start(df)
+
+        for i, column in enumerate(self._schema):
+            series = df[column["name"]]
+            if column["kind"] == "array":
+                self._writers[str(i)].append(series.to_numpy())
+                continue
+            data, offsets = _encode_strings([json.dumps(v) for v in series.tolist()])
+            data_writer = self._writers[f"{i}.data"]
+            self._writers[f"{i}.offsets"].append(offsets[1:] + data_writer.length)
+            data_writer.append(data)
+        self.rows += len(df)
+
+    def _start(self, df):
+        self._schema = []
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                dtype = series.to_numpy().dtype
+                self._writers[str(i)] = ArrayAppender(os.path.join(self.path, f"{i}.npy"), dtype)
+                self._schema.append({"name": column, "kind": "array"})
+            else:
+                self._writers[f"{i}.data"] = ArrayAppender(os.path.join(self.path, f"{i}.data.npy"), np.uint8)
+                offsets = ArrayAppender(os.path.join(self.path, f"{i}.offsets.npy"), np.int64)
+                offsets.append([0])
+                self._writers[f"{i}.offsets"] = offsets
+                self._schema.append({"name": column, "kind": "json"})
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        with open(os.path.join(self.path, "schema.json"), "w") as f:
+            json.dump({"rows": self.rows, "columns": self._schema or []}, f)
+        print(f"Saved: {self.path}")
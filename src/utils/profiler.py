@@ -0,0 +1,162 @@
+from contextlib import contextmanager, nullcontext
+import cProfile
+import json
+import os
+import threading
+import time
+
+from src.utils.metrics import resident_memory_bytes
+
+
+def profile_stage(profiler, name, **details):
+    """
+    profiler.stage(name) when profiling, a no-op context otherwise, so
+    instrumented code doesn't need to branch on it.
+    """
+    return profiler.stage(name, **details) if profiler is not None else nullcontext()
+
+
+class _PeakSampler:
+    def __init__(self, interval):
+        # Polls RSS in the background; /proc reads are cheap enough
+        # that a few milliseconds between samples costs nothing
+        self.interval = interval
+        self.peak = resident_memory_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, resident_memory_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, resident_memory_bytes())
+        return False
+
+
+class BuildProfiler:
+    def __init__(self, profile_dir=None, memory_limit_mb=None, sample_interval=0.005):
+        """
+        Records wall time, CPU time and memory of each build stage.
+        Args:
+            profile_dir (str or None): Write a cProfile dump per stage here
+            memory_limit_mb (int or None): Limit the peak RSS is checked against
+            sample_interval (float): Seconds between RSS samples
+        """
+        self.profile_dir = profile_dir
+        self.memory_limit_mb = memory_limit_mb
+        self.sample_interval = sample_interval
+        self.stages = []
+        self.artifacts = {}
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name, **details):
+        """
+        Context manager measuring one stage.
+        CPU time includes worker processes that finished within the
+        stage; their memory is not part of the RSS figures.
+        Args:
+            name (str): Stage name, also the cProfile dump file name
+            **details: Extra JSON-serializable fields for the report
+        """
+        record = {"name": name, "details": details}
+        profile = cProfile.Profile() if self.profile_dir else None
+        rss_start = resident_memory_bytes()
+        times_start = os.times()
+        wall_start = time.perf_counter()
+
+        with _PeakSampler(self.sample_interval) as sampler:
+            if profile is not None:
+                profile.enable()
+            try:
+                yield record["details"]
+            finally:
+                if profile is not None:
+                    profile.disable()
+
+        wall = time.perf_counter() - wall_start
+        times_end = os.times()
+        cpu = sum(
+            getattr(times_end, field) - getattr(times_start, field)
+            for field in ("user", "system", "children_user", "children_system")
+        )
+        record.update(
+            wall_seconds=wall,
+            cpu_seconds=cpu,
+            rss_start_bytes=rss_start,
+            rss_end_bytes=resident_memory_bytes(),
+            peak_rss_bytes=sampler.peak,
+        )
+        if profile is not None:
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            profile.dump_stats(path)
+            record["profile"] = path
+        self.stages.append(record)
+
+    def record_artifacts(self, artifact_dir):
+        """
+        Records the on-disk size of every top-level artifact.
+        """
+        for name in sorted(os.listdir(artifact_dir)):
+            path = os.path.join(artifact_dir, name)
+            if os.path.isdir(path):
+                size = sum(
+                    os.path.getsize(os.path.join(root, f))
+                    for root, _, files in os.walk(path) for f in files
+                )
+            else:
+                size = os.path.getsize(path)
+            self.artifacts[name] = size
+
+    def report(self):
+        """
+        Returns:
+            dict: Per-stage measurements, artifact sizes and totals
+        """
+        peak = max((s["peak_rss_bytes"] for s in self.stages), default=0)
+        report = {
+            "stages": self.stages,
+            "total_wall_seconds": sum(s["wall_seconds"] for s in self.stages),
+            "total_cpu_seconds": sum(s["cpu_seconds"] for s in self.stages),
+            "peak_rss_bytes": peak,
+            "artifacts": self.artifacts,
+            "artifact_bytes": sum(self.artifacts.values()),
+        }
+        if self.memory_limit_mb is not None:
+            report["memory_limit_bytes"] = self.memory_limit_mb * 1024 * 1024
+            report["within_memory_limit"] = peak <= report["memory_limit_bytes"]
+        return report
+
+    def write(self, path):
+        """
+        Saves the report as JSON.
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Saved: {path}")
+
+    def summary(self):
+        """
+        Returns:
+            str: Human-readable table of the stages
+        """
+        lines = [f"{'stage':<14}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"]
+        for s in self.stages:
+            lines.append(
+                f"{s['name']:<14}{s['wall_seconds']:>10.2f}{s['cpu_seconds']:>10.2f}"
+                f"{s['peak_rss_bytes'] / 2**20:>10.1f}"
+            )
+        report = self.report()
+        lines.append(f"artifacts: {report['artifact_bytes'] / 2**20:.1f} MB")
+        if "within_memory_limit" in report:
+            verdict = "within" if report["within_memory_limit"] else "OVER"
+            lines.append(f"peak RSS {report['peak_rss_bytes'] / 2**20:.1f} MB, {verdict} the {self.memory_limit_mb} MB limit")
+        return "\n".join(lines)
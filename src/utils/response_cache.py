@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+class ResponseCache:
+    def __init__(self, max_entries=10000, max_bytes=32 * 1024 * 1024, ttl=3600):
+        """
+        In-process LRU cache of resolved API responses.
+        Entries are evicted least recently used first once either bound
+        is exceeded, and expire ttl seconds after they were stored.
+        Every entry belongs to one model version; binding a new version
+        drops them all.
+        Args:
+            max_entries (int): Maximum number of cached responses
+            max_bytes (int): Maximum total JSON size of cached responses
+            ttl (float or None): Seconds an entry stays valid, None for no expiry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def bind(self, version):
+        """
+        Ties the cache to a model version, dropping every entry if it changed.
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.bytes = 0
+
+    def get(self, key):
+        """
+        Returns the cached response for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Caches a JSON-serializable response. Responses larger than the
+        whole byte budget are not cached.
+        """
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached response for key, computing and caching it on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters, hit rate and current size of the cache
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
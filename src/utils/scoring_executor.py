@@ -0,0 +1,241 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+
+class ExecutorOverloaded(RuntimeError):
+    """Raised when too many computations are already queued or running."""
+
+
+class ExecutorUnavailable(RuntimeError):
+    """Raised when the workers can't score right now, e.g. their model failed to load."""
+
+
+# Attempts of a worker's initializer to load the model, and the pause
+# between them; an artifact swap in progress is over within one
+WORKER_LOAD_ATTEMPTS = 3
+WORKER_LOAD_RETRY_SECONDS = 0.2
+
+# Seconds the workers replaced by restart_workers keep taking work tagged
+# for them, so requests begun on the old model finish on it
+RETIRED_POOL_SECONDS = 30
+
+# Model of a process-pool worker, loaded by its initializer
+_worker_model = None
+_worker_loader = None
+
+
+def _init_worker(loader):
+    global _worker_loader
+    _worker_loader = loader
+    # An exception here would mark the whole pool broken; a worker
+    # that can't load keeps retrying on its next tasks instead
+    for attempt in range(WORKER_LOAD_ATTEMPTS):
+        try:
+            _load_worker_model()
+            return
+        except Exception as e:
+            print(f"⚠ Scoring worker {os.getpid()} could not load its model: {e}")
+            if attempt + 1 < WORKER_LOAD_ATTEMPTS:
+                time.sleep(WORKER_LOAD_RETRY_SECONDS)
+
+
+def _load_worker_model():
+    global _worker_model
+    _worker_model = _worker_loader()
+
+
+def _worker_ready():
+    return _worker_model is not None
+
+
+def _run_in_worker(task, args):
+    if _worker_model is None:
+        try:
+            _load_worker_model()
+        except Exception as e:
+            raise ExecutorUnavailable(f"Scoring worker could not load its model: {e}") from None
+    return task(_worker_model, *args)
+
+
+class ScoringExecutor:
+    def __init__(self, kind="thread", max_workers=None, max_pending=None, loader=None):
+        """
+        Bounded pool for the CPU-bound part of API requests.
+        Identical concurrent requests share one computation, and once
+        max_pending distinct computations are queued or running, new ones
+        are rejected instead of queueing without bound.
+        Args:
+            kind (str): "thread", or "process" to score outside the GIL
+            max_workers (int or None): Pool size, defaults to the CPU count
+            max_pending (int or None): Distinct computations allowed in
+                flight, defaults to 8 per worker
+            loader (callable or None): Module-level function returning the
+                model, called once in each worker process ("process" only)
+        """
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 8 * self.max_workers
+        self.loader = loader
+        # Guards submissions against a concurrent restart_workers
+        self._pool_lock = threading.Lock()
+        # Tag of the current process workers, and (tag, pool) of the
+        # workers they replaced while those still take tagged work
+        self._tag = None
+        self._retired = None
+        if kind == "thread":
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="scoring")
+        elif kind == "process":
+            if loader is None:
+                raise ValueError("A process pool needs a loader for the worker model.")
+            self._pool = self._process_pool()
+        else:
+            raise ValueError(f"Unknown executor kind '{kind}', use 'thread' or 'process'.")
+
+        # Key -> future of the running computation; only touched from
+        # the event loop, so no lock is needed
+        self._inflight = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def _process_pool(self):
+        return ProcessPoolExecutor(
+            self.max_workers, initializer=_init_worker, initargs=(self.loader,)
+        )
+
+    def restart_workers(self, tag=None):
+        """
+        Starts fresh worker processes, which load the model anew; used
+        after a model reload. Every new worker has loaded its model
+        before any work is sent to it. Work tagged for the old workers
+        keeps going to them for RETIRED_POOL_SECONDS, then they exit once
+        their queue is done. Thread pools score the model they are
+        passed and need no restart.
+        Args:
+            tag (hashable or None): Tag of the work meant for the new
+                workers, e.g. the version of the model they load
+        """
+        if self.kind != "process":
+            return
+        pool = self._process_pool()
+        # One task per worker spawns them all and waits for their loads
+        wait([pool.submit(_worker_ready) for _ in range(self.max_workers)])
+
+        with self._pool_lock:
+            previous, self._retired = self._retired, (self._tag, self._pool)
+            retired_pool, self._pool, self._tag = self._pool, pool, tag
+        if previous is not None:
+            previous[1].shutdown(wait=False)
+        timer = threading.Timer(RETIRED_POOL_SECONDS, self._drop_retired, args=(retired_pool,))
+        timer.daemon = True
+        timer.start()
+
+    def _drop_retired(self, pool):
+        with self._pool_lock:
+            if self._retired is None or self._retired[1] is not pool:
+                return
+            self._retired = None
+        pool.shutdown(wait=False)
+
+    @property
+    def pending(self):
+        return len(self._inflight)
+
+    async def run(self, key, task, model, *args, tag=None):
+        """
+        Runs task(model, *args) in the pool, or joins the identical
+        computation already in flight under key.
+        In a process pool each worker passes its own copy of the model.
+        Args:
+            key (hashable): Identity of the computation
+            task (callable): Module-level function taking the model first
+            model (object): Model passed to task in the thread pool
+            *args: Further task arguments
+            tag (hashable or None): Sends the work to the retired process
+                workers if it carries their tag, see restart_workers
+        Returns:
+            object: What task returned
+        Raises:
+            ExecutorOverloaded: If max_pending computations are in flight
+            ExecutorUnavailable: If the worker processes died or can't
+                load their model
+        """
+        # Pool the computation went to; None when joining another's
+        pool = None
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorOverloaded(
+                    f"{len(self._inflight)} computations already in flight"
+                )
+            loop = asyncio.get_running_loop()
+            with self._pool_lock:
+                pool = self._pool
+                if self._retired is not None and tag is not None and tag == self._retired[0] != self._tag:
+                    pool = self._retired[1]
+                try:
+                    if self.kind == "process":
+                        future = loop.run_in_executor(pool, _run_in_worker, task, args)
+                    else:
+                        future = loop.run_in_executor(pool, task, model, *args)
+                except BrokenProcessPool:
+                    future = None
+            if future is None:
+                self._replace_broken(pool)
+                raise ExecutorUnavailable("Scoring workers died; they are being restarted")
+            self.submitted += 1
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+
+        # A cancelled caller must not cancel the computation others share
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            self._replace_broken(pool)
+            raise ExecutorUnavailable("Scoring workers died; they are being restarted")
+
+    def _replace_broken(self, pool):
+        # A worker died; the pool accepts no more work, so it is replaced
+        # once, whichever request noticed first
+        with self._pool_lock:
+            if self._retired is not None and self._retired[1] is pool:
+                self._retired = None
+            elif self._pool is pool:
+                print("⚠ Scoring workers died, starting new ones.")
+                self._pool = self._process_pool()
+            else:
+                return
+        pool.shutdown(wait=False)
+
+    def _finish(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def stats(self):
+        """
+        Returns:
+            dict: Pool configuration and submission counters
+        """
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._pool_lock:
+            retired, self._retired = self._retired, None
+        if retired is not None:
+            retired[1].shutdown(wait=False, cancel_futures=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
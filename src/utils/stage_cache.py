@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from src.utils.model_persistence import ModelPersistence
+
+# Bump a stage's version when its code changes what it produces, so
+# entries written by the old code are no longer reused
+STAGE_VERSIONS = {
+    "features": 1,
+    "vectorize": 1,
+    "neighbors": 2,
+}
+
+# Entries kept per stage; older ones are deleted as new ones are written
+STAGE_CACHE_KEEP = 3
+
+
+def stage_key(stage, params, *inputs):
+    """
+    Content address of a stage output.
+    Args:
+        stage (str): Stage name, one of STAGE_VERSIONS
+        params (dict): JSON-serializable parameters of the stage
+        *inputs (str): Keys of the stage outputs it consumes
+    Returns:
+        str: Hex key, equal only for the same code, inputs and parameters
+    """
+    payload = json.dumps({
+        "stage": stage,
+        "version": STAGE_VERSIONS[stage],
+        "params": params,
+        "inputs": list(inputs),
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StageCache:
+    def __init__(self, cache_dir, keep=STAGE_CACHE_KEEP):
+        """
+        Build stage outputs stored on disk under their content address,
+        one directory per stage and key. Only the keep most recently
+        used entries of each stage are kept.
+        Args:
+            cache_dir (str): Root of the cache, e.g. data/cache/stages
+            keep (int): Entries kept per stage
+        """
+        self.cache_dir = cache_dir
+        self.keep = max(int(keep), 1)
+
+    def path(self, stage, key):
+        return os.path.join(self.cache_dir, stage, key)
+
+    def get(self, stage, key, load):
+        """
+        Loads a cached stage output.
+        Args:
+            stage (str): Stage name
+            key (str): Key from stage_key
+            load (callable): Reads the output from a ModelPersistence
+        Returns:
+            object: The output, or None on a miss
+        """
+        entry_dir = self.path(stage, key)
+        if not os.path.exists(os.path.join(entry_dir, "complete")):
+            return None
+        # Marks the entry as recently used for prune
+        os.utime(entry_dir)
+        return load(ModelPersistence(entry_dir))
+
+    def put(self, stage, key, save):
+        """
+        Stores a stage output. The entry is written to a temporary
+        directory and renamed, so readers never see half an entry.
+        Args:
+            stage (str): Stage name
+            key (str): Key from stage_key
+            save (callable): Writes the output into a ModelPersistence
+        """
+        stage_dir = os.path.join(self.cache_dir, stage)
+        os.makedirs(stage_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=stage_dir, prefix=".tmp-")
+        try:
+            save(ModelPersistence(tmp_dir))
+            open(os.path.join(tmp_dir, "complete"), "w").close()
+            entry_dir = self.path(stage, key)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError as e:
+            print(f"⚠ Could not cache stage {stage}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.prune(stage)
+
+    def prune(self, stage):
+        """
+        Deletes all but the keep most recently used entries of a stage.
+        """
+        stage_dir = os.path.join(self.cache_dir, stage)
+        try:
+            keys = [key for key in os.listdir(stage_dir) if not key.startswith(".")]
+            keys.sort(key=lambda key: os.path.getmtime(self.path(stage, key)), reverse=True)
+        except OSError:
+            return
+        for key in keys[self.keep:]:
+            shutil.rmtree(self.path(stage, key), ignore_errors=True)
+
+    def clear(self):
+        """
+        Deletes every cached stage output.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_or_compute(self, stage, key, compute, save, load):
+        """
+        Returns the cached output of a stage, computing and storing it
+        on a miss.
+        Returns:
+            tuple: (output, hit)
+        """
+        output = self.get(stage, key, load)
+        if output is not None:
+            return output, True
+        output = compute()
+        self.put(stage, key, lambda persistence: save(persistence, output))
+        return output, False
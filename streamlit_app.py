@@ -36,7 +36,9 @@ if search_clicked or st.session_state.auto_run:
                 )
                 data = response.json()
 
-                if "error" in data:
+                if response.status_code == 503:
+                    st.warning("The recommender is still starting up, please try again in a few seconds.")
+                elif "error" in data:
                     st.error(data["error"])
                     if "suggestions" in data and data["suggestions"]:
                         st.info("Did you mean one of these? Click to search:")
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from src.ml.neighbors import NeighborIndex
+from src.ml.vectorizer import TextVectorizer
+from src.utils.model_persistence import ModelPersistence
+from src.utils.artifacts import save_model
+
+# Two movies share a title, to exercise ambiguous lookups
+TITLES = ("Batman Begins", "The Dark Knight", "The Host", "The Host")
+
+def make_artifacts(artifact_dir, titles=TITLES):
+    """
+    Saves a four-movie artifact set with ids 1-4, two stored neighbors
+    per movie, vectors and a vectorizer.
+    Returns:
+        str: Version of the saved set
+    """
+    movies = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "title": list(titles),
+        "genres": [["Action"], ["Action", "Crime"], ["Horror"], ["Horror", "Drama"]],
+        "original_language": ["en", "en", "ko", "en"],
+    })
+    neighbors = NeighborIndex(
+        [[1, 2], [0, 3], [3, 0], [2, 1]],
+        [[0.9, 0.1], [0.9, 0.2], [0.5, 0.1], [0.5, 0.2]]
+    )
+    vectorizer = TextVectorizer(sparse=True)
+    vectors = vectorizer.fit_transform(["gotham ChristianBale", "gotham joker ChristianBale", "korea monster", "korea monster"])
+    return save_model(ModelPersistence(artifact_dir), movies, neighbors, vectors, vectorizer)
@@ -0,0 +1,93 @@
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ml.ann import ExactIndex, IVFIndex, recall_report
+from src.ml.recommender import Recommender
+from src.ml.similarity import SimilarityEngine
+from src.ml.vectorizer import TextVectorizer
+from src.utils.artifacts import load_model, save_model
+from src.utils.model_persistence import ModelPersistence
+
+WORDS = ["hero", "space", "love", "war", "robot", "alien", "crime", "heist", "magic", "spy",
+         "ghost", "pirate", "zombie", "dragon", "ninja", "cowboy"]
+
+def make_vectors(n, seed):
+    rng = np.random.default_rng(seed)
+    soups = [" ".join(rng.choice(WORDS, size=5, replace=False)) for _ in range(n)]
+    return TextVectorizer(sparse=True).fit_transform(soups)
+
+def test_exact_index_matches_engine():
+    vectors = make_vectors(80, seed=0)
+    expected = SimilarityEngine().compute_neighbors(vectors, k=5)
+    exact = SimilarityEngine(backend=ExactIndex()).compute_neighbors(vectors, k=5)
+
+    assert (exact.indices == expected.indices).all()
+    assert np.allclose(exact.scores, expected.scores, atol=1e-6)
+    print("SUCCESS: Exact backend matches the all-pairs engine")
+
+def test_ivf_probing_every_list_is_exact():
+    vectors = make_vectors(80, seed=1)
+    expected = SimilarityEngine().compute_neighbors(vectors, k=5)
+    ivf = IVFIndex(n_lists=6, n_probe=6)
+    approx = SimilarityEngine(backend=ivf).compute_neighbors(vectors, k=5)
+
+    assert np.allclose(approx.scores, expected.scores, atol=1e-6)
+    assert recall_report(ivf, k=5, sample=40)["recall"] == 1.0
+    print("SUCCESS: IVF probing every list matches exact search")
+
+def test_ivf_recall_and_recommender():
+    vectors = make_vectors(300, seed=2)
+    ivf = IVFIndex(n_lists=16, n_probe=4).fit(vectors)
+
+    report = recall_report(ivf, k=10, sample=100)
+    assert report["queries"] == 100
+    assert 0.5 < report["recall"] <= 1.0
+
+    # Every query gets k neighbors even if its closest lists are small
+    indices, scores = ivf.query(vectors[:3], 10, exclude=[0, 1, 2])
+    assert indices.shape == (3, 10) and np.isfinite(scores).all()
+    assert 0 not in indices[0]
+
+    df = pd.DataFrame({"title": [f"Movie {i}" for i in range(300)]})
+    recommender = Recommender(df, ivf)
+    recommendations = recommender.recommend("Movie 0", top_n=5)
+    assert len(recommendations) == 5 and "Movie 0" not in recommendations
+    print("SUCCESS: IVF index reports recall and serves recommendations")
+
+def test_saved_ivf_serves_queries():
+    vectors = make_vectors(200, seed=3)
+    ivf = IVFIndex(n_lists=8, n_probe=8)
+    neighbors = SimilarityEngine(backend=ivf).compute_neighbors(vectors, k=5)
+    df = pd.DataFrame({"id": np.arange(200), "title": [f"Movie {i}" for i in range(200)]})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_model(ModelPersistence(tmp), df, neighbors, vectors, ivf=ivf.to_arrays())
+        artifacts = load_model(ModelPersistence(tmp), with_search_index=True)
+        assert load_model(ModelPersistence(tmp)).search_index is None
+
+        restored = artifacts.search_index
+        assert isinstance(restored, IVFIndex) and restored.n_probe == 8
+        assert (restored.list_rows == ivf.list_rows).all()
+        # Saved unit rows are memory-mapped, not normalized into a copy
+        assert not restored.unit_vectors.data.flags.writeable
+
+        # Probing every list, the restored index ranks like brute force
+        indexed = Recommender(
+            artifacts.movies, artifacts.similarity, artifacts.vectors, search_index=restored
+        )
+        brute = Recommender(artifacts.movies, artifacts.similarity, artifacts.vectors)
+        for seeds in ([0], [5, 17]):
+            assert indexed.recommend_for_query(seeds=seeds, top_n=5) == brute.recommend_for_query(seeds=seeds, top_n=5)
+    print("SUCCESS: A saved IVF index is restored and probed at query time")
+
+if __name__ == "__main__":
+    test_exact_index_matches_engine()
+    test_ivf_probing_every_list_is_exact()
+    test_ivf_recall_and_recommender()
+    test_saved_ivf_serves_queries()
@@ -0,0 +1,265 @@
+import sys
+import os
+import importlib
+import tempfile
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from artifact_factory import make_artifacts
+
+def start_api(artifact_dir, **env):
+    os.environ["ARTIFACT_DIR"] = artifact_dir
+    for name in ("ADMIN_TOKEN", "ARTIFACT_WATCH_SECONDS", "SCORING_EXECUTOR", "SCORING_WORKERS"):
+        os.environ.pop(name, None)
+    os.environ.update(env)
+    import api.main
+    return importlib.reload(api.main)
+
+def wait_until_ready(client, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get("/readyz").status_code == 200:
+            return
+        time.sleep(0.05)
+    raise AssertionError("API never became ready")
+
+def test_not_ready_returns_503():
+    with tempfile.TemporaryDirectory() as tmp:
+        main = start_api(tmp)
+
+        # Without entering the lifespan nothing loads the model
+        client = TestClient(main.app)
+        assert client.get("/healthz").status_code == 200
+        assert client.get("/readyz").status_code == 503
+
+        response = client.get("/recommend", params={"movie": "Batman Begins"})
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+    print("SUCCESS: Requests before readiness fail fast")
+
+@contextmanager
+def serving():
+    # A ready API over the shared four-movie artifact set
+    with tempfile.TemporaryDirectory() as tmp:
+        make_artifacts(tmp)
+        main = start_api(tmp)
+        with TestClient(main.app) as client:
+            wait_until_ready(client)
+            yield client
+
+def test_background_load():
+    with serving() as client:
+        version = client.get("/readyz").json()["model_version"]
+        data = client.get("/recommend", params={"movie": "batman begins", "top_n": 1}).json()
+        assert data == {
+            "input_movie": "Batman Begins",
+            "recommendations": ["The Dark Knight"],
+            "model_version": version
+        }
+    print("SUCCESS: Model loads in the background and serves requests")
+
+def test_response_cache():
+    with serving() as client:
+        client.get("/recommend", params={"movie": "batman begins", "top_n": 1})
+        # Repeated queries are answered from the response cache
+        client.get("/recommend", params={"movie": "Batman  Begins", "top_n": 1})
+        stats = client.get("/cache/stats").json()
+        assert stats["hits"] == 1 and stats["entries"] == 1
+
+        # Cached misses don't echo the spelling of whoever asked first
+        first = client.get("/recommend", params={"movie": "NOPE  Movie", "top_n": 1}).json()
+        second = client.get("/recommend", params={"movie": "nope movie", "top_n": 1}).json()
+        assert first["error"] == second["error"] == "Movie 'nope movie' not found"
+    print("SUCCESS: Repeated queries are served from the response cache")
+
+def test_metrics_endpoint():
+    with serving() as client:
+        client.get("/recommend", params={"movie": "Batman Begins", "top_n": 1})
+        client.get("/recommend", params={"movie": "Batman Begins", "top_n": 1})
+        metrics = client.get("/metrics").text
+        assert 'http_request_duration_seconds_count{endpoint="/recommend"}' in metrics
+        assert 'recommender_stage_seconds_count{stage="score"}' in metrics
+        assert "process_resident_memory_bytes" in metrics
+        assert "# TYPE response_cache_events_total counter" in metrics
+        assert 'response_cache_events_total{event="hits"} 1' in metrics
+    print("SUCCESS: /metrics reports latencies, memory and cache counters")
+
+def test_ambiguous_titles():
+    with serving() as client:
+        data = client.get("/recommend", params={"movie": "The Host", "top_n": 1}).json()
+        assert data["movie_ids"] == [3, 4]
+
+        data = client.get("/movies/4/recommend", params={"top_n": 1}).json()
+        assert data["recommendations"] == ["The Host"]
+    print("SUCCESS: Shared titles ask for an id, which resolves them")
+
+def test_recommend_filters():
+    with serving() as client:
+        params = {"movie": "Batman Begins", "top_n": 1, "genre": ["horror", "Western"]}
+        data = client.get("/recommend", params=params).json()
+        assert data["recommendations"] == ["The Host"]
+        assert data["filters"] == {"genres": ["Western", "horror"]}
+
+        data = client.get("/movies/1/recommend", params={"language": "ko"}).json()
+        assert data["recommendations"] == ["The Host"]
+
+        # Unfiltered requests can't ask for more than the two stored neighbors
+        assert client.get("/movies/1/recommend", params={"top_n": 3}).status_code == 422
+        assert client.post("/recommend/batch", json={"movies": [1], "top_n": 3}).status_code == 422
+    print("SUCCESS: Recommendations are filtered by genre and language")
+
+def test_search_endpoint():
+    with serving() as client:
+        data = client.get("/search", params={"q": "dark knigt"}).json()
+        assert data["results"][0]["title"] == "The Dark Knight"
+    print("SUCCESS: /search tolerates typos")
+
+def test_batch_recommend():
+    with serving() as client:
+        data = client.post("/recommend/batch", json={"movies": ["Batman Begins", 4, "Nope"], "top_n": 1}).json()
+        results = data["results"]
+        assert results[0]["recommendations"] == ["The Dark Knight"]
+        assert results[1]["recommendations"] == ["The Host"]
+        assert "error" in results[2]
+    print("SUCCESS: Batches mix titles and ids and fail per movie")
+
+def test_query_recommend():
+    with serving() as client:
+        data = client.post("/recommend/query", json={"text": "Christian Bale, joker", "top_n": 1}).json()
+        assert data["recommendations"] == ["The Dark Knight"]
+        data = client.post("/recommend/query", json={"movies": [1], "top_n": 1}).json()
+        assert data["recommendations"] == ["The Dark Knight"]
+        data = client.post("/recommend/query", json={"movies": ["The Host"]}).json()
+        assert data["movie_ids"] == [3, 4]
+    print("SUCCESS: Free-text and seed queries are recommended for")
+
+def wait_for_version(client, old_version, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        version = client.get("/readyz").json()["model_version"]
+        if version != old_version:
+            return version
+        time.sleep(0.05)
+    raise AssertionError("Model was never reloaded")
+
+def test_hot_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_version = make_artifacts(tmp)
+        main = start_api(tmp, ADMIN_TOKEN="secret")
+
+        with TestClient(main.app) as client:
+            wait_until_ready(client)
+            data = client.get("/movies/1/recommend", params={"top_n": 1}).json()
+            assert data["recommendations"] == ["The Dark Knight"]
+            assert data["model_version"] == old_version
+
+            assert client.post("/admin/reload").status_code == 403
+            assert client.post("/admin/reload", headers={"X-Admin-Token": "nope"}).status_code == 403
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+            assert response.json()["status"] == "unchanged"
+
+            new_version = make_artifacts(tmp, ("Batman Begins", "Dark Knight Returns", "The Host", "Okja"))
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+            assert response.status_code == 202
+            assert wait_for_version(client, old_version) == new_version
+
+            # The cached answer of the old version is not served
+            data = client.get("/movies/1/recommend", params={"top_n": 1}).json()
+            assert data["recommendations"] == ["Dark Knight Returns"]
+            assert data["model_version"] == new_version
+    print("SUCCESS: A new artifact version is swapped in without a restart")
+
+def test_artifact_watcher():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_version = make_artifacts(tmp)
+        main = start_api(tmp, ARTIFACT_WATCH_SECONDS="0.05")
+
+        with TestClient(main.app) as client:
+            wait_until_ready(client)
+            new_version = make_artifacts(tmp, ("Batman Begins", "Dark Knight Returns", "The Host", "Okja"))
+            assert wait_for_version(client, old_version) == new_version
+            data = client.get("/recommend", params={"movie": "Okja", "top_n": 1}).json()
+            assert data["input_movie"] == "Okja"
+    print("SUCCESS: The watcher reloads when the artifacts change")
+
+def stage_count(client, stage):
+    prefix = f'recommender_stage_seconds_count{{stage="{stage}"}} '
+    lines = [line for line in client.get("/metrics").text.splitlines() if line.startswith(prefix)]
+    return int(lines[0][len(prefix):]) if lines else 0
+
+def test_worker_version_mismatch_is_not_served():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_version = make_artifacts(tmp)
+        main = start_api(tmp, SCORING_EXECUTOR="process", SCORING_WORKERS="1")
+
+        with TestClient(main.app) as client:
+            wait_until_ready(client)
+            scored = stage_count(client, "score")
+            data = client.get("/movies/1/recommend", params={"top_n": 1}).json()
+            assert data["recommendations"] == ["The Dark Knight"]
+            # Stage timings recorded in the worker reach the API's /metrics
+            assert stage_count(client, "score") == scored + 1
+
+            # Built out of band, then the worker dies and its replacement
+            # loads the new set before the API does
+            new_version = make_artifacts(tmp, ("Batman Begins", "Dark Knight Returns", "The Host", "Okja"))
+            for process in list(main.scoring_executor._pool._processes.values()):
+                process.kill()
+                process.join()
+            assert client.get("/movies/1/recommend", params={"top_n": 2}).status_code == 503
+            assert client.get("/movies/1/recommend", params={"top_n": 2, "language": "en"}).status_code == 503
+
+            # The mismatch triggers a reload to the version the workers hold
+            assert wait_for_version(client, old_version) == new_version
+            data = client.get("/movies/1/recommend", params={"top_n": 1}).json()
+            assert data == {
+                "input_movie_id": 1,
+                "recommendations": ["Dark Knight Returns"],
+                "model_version": new_version
+            }
+    print("SUCCESS: Results of another model version are neither served nor cached")
+
+def test_process_reload_serves_throughout():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_version = make_artifacts(tmp)
+        main = start_api(tmp, ADMIN_TOKEN="secret", SCORING_EXECUTOR="process", SCORING_WORKERS="2")
+
+        with TestClient(main.app) as client:
+            wait_until_ready(client)
+            new_version = make_artifacts(tmp, ("Batman Begins", "Dark Knight Returns", "The Host", "Okja"))
+            assert client.post("/admin/reload", headers={"X-Admin-Token": "secret"}).status_code == 202
+
+            # Distinct queries so every request is scored, before, during
+            # and after the swap
+            statuses, versions = [], set()
+            deadline = time.time() + 10
+            i = 0
+            while time.time() < deadline and (new_version not in versions or i < 50):
+                response = client.get("/search", params={"q": f"batman {i}"})
+                statuses.append(response.status_code)
+                versions.add(response.json().get("model_version"))
+                i += 1
+            assert set(statuses) == {200}
+            assert new_version in versions
+            assert client.get("/readyz").json()["model_version"] == new_version
+            assert old_version != new_version
+    print("SUCCESS: Requests are served throughout a process-mode reload")
+
+if __name__ == "__main__":
+    test_not_ready_returns_503()
+    test_background_load()
+    test_response_cache()
+    test_metrics_endpoint()
+    test_ambiguous_titles()
+    test_recommend_filters()
+    test_search_endpoint()
+    test_batch_recommend()
+    test_query_recommend()
+    test_hot_reload()
+    test_artifact_watcher()
+    test_worker_version_mismatch_is_not_served()
+    test_process_reload_serves_throughout()
@@ -0,0 +1,41 @@
+import sys
+import os
+import tempfile
+# Add src to python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.generate_catalog import generate_catalog
+from benchmarks.run_benchmarks import latency_stats
+from src.data_ingestion.data_loader import load_merged_data
+from src.feature_engineering.feature_builder import FeatureBuilder
+
+def test_generated_catalog_loads():
+    with tempfile.TemporaryDirectory() as raw_dir:
+        generate_catalog(300, raw_dir, seed=1)
+        df = load_merged_data(use_cache=False, raw_dir=raw_dir)
+        assert len(df) == 300
+        assert df['id'].is_unique
+
+        features = FeatureBuilder().build_features(df)
+        assert len(features) == 300
+        assert features['soup'].str.len().gt(0).mean() > 0.9
+
+        # Same seed, same catalog
+        with tempfile.TemporaryDirectory() as again:
+            generate_catalog(300, again, seed=1)
+            for name in os.listdir(raw_dir):
+                with open(os.path.join(raw_dir, name)) as a, open(os.path.join(again, name)) as b:
+                    assert a.read() == b.read()
+    print("SUCCESS: Generated catalog loads, builds features and is reproducible")
+
+def test_latency_stats():
+    stats = latency_stats([0.001] * 99 + [0.1])
+    assert stats["calls"] == 100
+    assert abs(stats["p50_ms"] - 1.0) < 1e-9
+    assert stats["p99_ms"] > 1.0
+    assert latency_stats([]) == {"calls": 0}
+    print("SUCCESS: Latency stats report percentiles in ms")
+
+if __name__ == "__main__":
+    test_generated_catalog_loads()
+    test_latency_stats()
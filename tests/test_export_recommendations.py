@@ -0,0 +1,45 @@
+import sys
+import os
+import csv
+import json
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from artifact_factory import make_artifacts
+from src.scripts.export_recommendations import export
+
+def test_export_formats():
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = os.path.join(tmp, "artifacts")
+        make_artifacts(artifact_dir)
+
+        # Blocks smaller than the catalog still cover every movie once
+        jsonl_path = os.path.join(tmp, "similar.jsonl")
+        assert export(jsonl_path, top_k=1, batch_size=3, artifact_dir=artifact_dir) == 4
+        with open(jsonl_path) as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["movie_id"] for line in lines] == [1, 2, 3, 4]
+        assert lines[2]["recommendations"] == [{"movie_id": 4, "title": "The Host", "score": 0.5}]
+
+        csv_path = os.path.join(tmp, "similar.csv")
+        export(csv_path, top_k=2, artifact_dir=artifact_dir)
+        with open(csv_path) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 8
+        assert rows[0] == {
+            "movie_id": "1", "title": "Batman Begins", "rank": "1",
+            "recommended_id": "2", "recommended_title": "The Dark Knight", "score": "0.9"
+        }
+        assert [r["recommended_id"] for r in rows if r["movie_id"] == "2"] == ["1", "4"]
+
+        try:
+            export(os.path.join(tmp, "similar.txt"), artifact_dir=artifact_dir)
+            assert False, "unknown formats must be rejected"
+        except ValueError:
+            pass
+        assert sorted(os.listdir(tmp)) == ["artifacts", "similar.csv", "similar.jsonl"]
+    print("SUCCESS: Recommendations export to JSONL and CSV")
+
+if __name__ == "__main__":
+    test_export_formats()
@@ -0,0 +1,71 @@
+import sys
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.feature_engineering.feature_builder import FeatureBuilder
+from src.ml.incremental import update_model
+from src.ml.vectorizer import TextVectorizer
+from src.ml.similarity import SimilarityEngine
+from src.utils.artifacts import MOVIE_COLUMNS, ModelArtifacts
+
+WORDS = ["hero", "space", "love", "war", "robot", "alien", "crime", "heist", "magic", "spy"]
+
+def raw_movie(movie_id, words):
+    names = lambda values: json.dumps([{"name": v} for v in values])
+    return {
+        "id": movie_id,
+        "title_x": f"Movie {movie_id}",
+        "title_y": f"Movie {movie_id}",
+        "genres": names(words[:1]),
+        "keywords": names(words[1:]),
+        "cast": names([]),
+        "crew": names([]),
+        "vote_count": movie_id * 10,
+    }
+
+def make_catalog(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame([
+        raw_movie(i, list(rng.choice(WORDS, size=4, replace=False))) for i in range(n)
+    ])
+
+def build(raw_df, vectorizer=None, k=5):
+    processed_df = FeatureBuilder().build_features(raw_df)
+    if vectorizer is None:
+        vectorizer = TextVectorizer(sparse=True)
+        vectors = vectorizer.fit_transform(processed_df['soup'])
+    else:
+        vectors = vectorizer.transform(processed_df['soup'])
+    neighbors = SimilarityEngine().compute_neighbors(vectors, k=k)
+    movies = processed_df[[c for c in MOVIE_COLUMNS if c in processed_df.columns]]
+    return ModelArtifacts(movies, neighbors, vectors, vectorizer)
+
+def test_incremental_matches_rebuild():
+    catalog = make_catalog(40, seed=0)
+    artifacts = build(catalog)
+
+    # Two new movies and two changed ones
+    changes = make_catalog(44, seed=1).iloc[[3, 17, 40, 43]]
+    movies, neighbors, vectors, stats = update_model(artifacts, changes)
+    assert stats["added"] == 2 and stats["replaced"] == 2
+
+    # Changed movies keep their row, new ones are appended
+    final = catalog.set_index("id")
+    final.update(changes.set_index("id"))
+    final = pd.concat([final, changes.set_index("id").loc[[40, 43]]]).reset_index()
+    expected = build(final, vectorizer=artifacts.vectorizer)
+
+    assert movies["id"].tolist() == final["id"].tolist()
+    assert movies["vote_count"].tolist() == final["vote_count"].tolist()
+    assert (vectors != expected.vectors).nnz == 0
+    assert np.allclose(neighbors.scores, expected.similarity.scores, atol=1e-6)
+    assert (neighbors.indices == expected.similarity.indices).all()
+    print("SUCCESS: Incremental update matches a full rescoring")
+
+if __name__ == "__main__":
+    test_incremental_matches_rebuild()
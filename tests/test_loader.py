@@ -1,9 +1,10 @@
 import sys
 import os
+import tempfile
 # Add src to python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data_ingestion.data_loader import load_data
+from src.data_ingestion.data_loader import load_data, load_merged_data
 
 def test_loading():
     print("Attempting to load data...")
@@ -17,5 +18,58 @@ def test_loading():
     else:
         print("FAILURE: Data returned as None.")
 
+def write_raw(raw_dir, title):
+    with open(os.path.join(raw_dir, "tmdb_5000_movies.csv"), "w") as f:
+        f.write("id,title,genres,keywords,release_date,original_language,vote_average,vote_count,popularity,budget\n")
+        f.write(f'19995,{title},"[{{""id"": 28, ""name"": ""Action""}}]",[],2009-12-10,en,7.2,11800,150.4,237000000\n')
+    with open(os.path.join(raw_dir, "tmdb_5000_credits.csv"), "w") as f:
+        f.write("movie_id,title,cast,crew\n")
+        f.write(f"19995,{title},[],[]\n")
+
+def test_merged_cache():
+    with tempfile.TemporaryDirectory() as raw_dir, tempfile.TemporaryDirectory() as cache_dir:
+        write_raw(raw_dir, "Avatar")
+
+        df = load_merged_data(raw_dir=raw_dir, cache_dir=cache_dir)
+        entries = [e for e in os.listdir(cache_dir) if not e.endswith(".json")]
+        assert len(entries) == 1
+
+        # Pruned to the selected columns, with typed numeric columns
+        assert "budget" not in df.columns
+        assert df["vote_count"].dtype == "int64"
+        assert df["title_x"].tolist() == ["Avatar"]
+
+        cached = load_merged_data(raw_dir=raw_dir, cache_dir=cache_dir)
+        assert cached.astype(object).equals(df.astype(object))
+
+        # Changed content means a new cache key
+        write_raw(raw_dir, "Avatar 2")
+        df = load_merged_data(raw_dir=raw_dir, cache_dir=cache_dir)
+        assert df["title_x"].tolist() == ["Avatar 2"]
+        entries = [e for e in os.listdir(cache_dir) if not e.endswith(".json")]
+        assert len(entries) == 2
+
+        subset = load_merged_data(movie_columns=["id", "title"], credit_columns=["movie_id", "cast"],
+                                  raw_dir=raw_dir, cache_dir=cache_dir)
+        assert subset.columns.tolist() == ["id", "title", "movie_id", "cast"]
+    print("SUCCESS: Merged dataset is cached and invalidated on change")
+
+def test_merged_cache_is_pruned():
+    with tempfile.TemporaryDirectory() as raw_dir, tempfile.TemporaryDirectory() as cache_dir:
+        os.makedirs(os.path.join(cache_dir, "stages"))
+        for title in ("Avatar", "Avatar 2", "Avatar 3"):
+            write_raw(raw_dir, title)
+            df = load_merged_data(raw_dir=raw_dir, cache_dir=cache_dir, cache_keep=1)
+            assert df["title_x"].tolist() == [title]
+
+        # One merged frame, the stage cache and the fingerprint index, no temp files
+        entries = os.listdir(cache_dir)
+        assert len(entries) == 3 and {"stages", "fingerprints.json"} <= set(entries)
+        assert not any(e.startswith(".") for e in entries)
+        assert load_merged_data(raw_dir=raw_dir, cache_dir=cache_dir)["title_x"].tolist() == ["Avatar 3"]
+    print("SUCCESS: Old merged frames are pruned from the data cache")
+
 if __name__ == "__main__":
     test_loading()
+    test_merged_cache()
+    test_merged_cache_is_pruned()
@@ -0,0 +1,47 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.metrics import MetricsRegistry, resident_memory_bytes
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", labels=("stage",), buckets=(0.1, 1.0))
+    requests = registry.counter("requests_total", "Requests", labels=("endpoint",))
+
+    latency.observe(0.05, stage="score")
+    latency.observe(0.5, stage="score")
+    latency.observe(5.0, stage="score")
+    requests.inc(endpoint='/say "hi"')
+    requests.inc(endpoint='/say "hi"')
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    # Buckets are cumulative and +Inf equals the count
+    assert 'latency_seconds_bucket{stage="score",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="score",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="score",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="score"} 3' in lines
+    assert 'requests_total{endpoint="/say \\"hi\\""} 2' in lines
+
+    # Totals kept elsewhere are exported as counters
+    hits = registry.counter("cache_hits_total", "Hits")
+    hits.sync(7)
+    assert "# TYPE cache_hits_total counter" in registry.render().splitlines()
+    assert "cache_hits_total 7" in registry.render().splitlines()
+
+    # Captured observations can be replayed in another registry
+    with latency.capture() as observations:
+        latency.observe(0.2, stage="resolve")
+    assert observations == [(0.2, {"stage": "resolve"})]
+    latency.observe(0.3, stage="resolve")
+    assert len(observations) == 1
+
+    # Registering again returns the same metric
+    assert registry.counter("requests_total", "Requests", labels=("endpoint",)) is requests
+    assert resident_memory_bytes() > 0
+    print("SUCCESS: Metrics render in the Prometheus text format")
+
+if __name__ == "__main__":
+    test_prometheus_rendering()
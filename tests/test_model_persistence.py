@@ -0,0 +1,134 @@
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ml.neighbors import NeighborIndex
+from src.utils.model_persistence import ModelPersistence
+from src.utils.artifacts import (
+    ArtifactError, load_manifest, load_model, replace_artifact_dir, save_model
+)
+
+def make_movies():
+    return pd.DataFrame({
+        "id": [19995, 285, 206647],
+        "title": ["Avatar", "Pirates of the Caribbean", "Spectre"],
+        "genres": [["Action", "Adventure"], [], ["Crime"]],
+        "release_date": ["2009-12-10", None, "2015-10-26"],
+        "vote_count": [11800, 4500, 4466],
+        "vote_average": [7.2, 6.9, 6.3],
+        "soup": ["a b", "c d", "e f"],
+    })
+
+def test_frame_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        persistence = ModelPersistence(tmp)
+        movies = make_movies()
+        persistence.save_frame(movies, "movies")
+        loaded = persistence.load_frame("movies")
+
+        assert loaded.columns.tolist() == movies.columns.tolist()
+        assert loaded["id"].tolist() == movies["id"].tolist()
+        assert loaded["title"].tolist() == movies["title"].tolist()
+        assert loaded["genres"].tolist() == movies["genres"].tolist()
+        assert loaded["release_date"].tolist() == movies["release_date"].tolist()
+        assert np.allclose(loaded["vote_average"], movies["vote_average"])
+    print("SUCCESS: Columnar frame round trip")
+
+def test_arrays_are_memory_mapped():
+    with tempfile.TemporaryDirectory() as tmp:
+        persistence = ModelPersistence(tmp)
+        vectors = sp.random(20, 50, density=0.1, format="csr", dtype=np.float32, random_state=0)
+        persistence.save_sparse(vectors, "vectors")
+        persistence.save_arrays({"indices": np.arange(6, dtype=np.int32).reshape(3, 2)}, "neighbors")
+
+        loaded = persistence.load_sparse("vectors")
+        assert (loaded != vectors).nnz == 0
+
+        arrays = persistence.load_arrays("neighbors")
+        assert isinstance(arrays["indices"], np.memmap)
+        assert not arrays["indices"].flags.writeable
+    print("SUCCESS: Arrays load memory-mapped")
+
+def test_model_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        persistence = ModelPersistence(tmp)
+        movies = make_movies()
+        neighbors = NeighborIndex([[1, 2], [0, 2], [1, 0]], [[0.5, 0.1], [0.5, 0.3], [0.3, 0.1]])
+        save_model(persistence, movies, neighbors)
+
+        # Build-only columns are not part of the artifact set
+        assert not any(name.endswith(".pkl") for name in os.listdir(tmp))
+        artifacts = load_model(persistence)
+        assert "soup" not in artifacts.movies.columns
+        assert artifacts.similarity.indices.tolist() == neighbors.indices.tolist()
+        assert artifacts.vectors is None
+    print("SUCCESS: Model artifacts round trip without pickle")
+
+def test_manifest_refuses_bad_sets():
+    with tempfile.TemporaryDirectory() as tmp:
+        persistence = ModelPersistence(tmp)
+        neighbors = NeighborIndex([[1, 2], [0, 2], [1, 0]], [[0.5, 0.1], [0.5, 0.3], [0.3, 0.1]])
+        version = save_model(persistence, make_movies(), neighbors, stages={"features": "abc"})
+
+        manifest = load_manifest(persistence)
+        assert manifest["version"] == version
+        assert manifest["stages"] == {"features": "abc"}
+        assert "neighbors/indices.npy" in manifest["files"]
+        assert load_model(persistence).version == version
+
+        def refused(**kwargs):
+            try:
+                load_model(persistence, **kwargs)
+            except ArtifactError:
+                return True
+            return False
+
+        # Same size, different bytes: only the checksum notices
+        path = os.path.join(tmp, "neighbors", "scores.npy")
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\x01")
+        assert refused()
+        assert not refused(verify="size")
+
+        # Partially written: a file is missing
+        os.remove(path)
+        assert refused(verify="size")
+
+        # Interrupted before the manifest was written
+        os.remove(os.path.join(tmp, "manifest.json"))
+        assert refused()
+
+        # A stray version.json doesn't make a set legacy
+        with open(os.path.join(tmp, "version.json"), "w") as f:
+            f.write('{"version": "old"}')
+        assert refused()
+    print("SUCCESS: Incomplete or modified artifact sets are refused")
+
+def test_failed_swap_keeps_current_set():
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, "artifacts")
+        version = save_model(ModelPersistence(target), make_movies(), NeighborIndex([[1], [0], [1]], [[0.5], [0.5], [0.2]]))
+
+        # The new set can't be moved in: the current one is put back
+        try:
+            replace_artifact_dir(os.path.join(tmp, "missing"), target)
+            assert False, "a missing source must fail"
+        except OSError:
+            pass
+        assert sorted(os.listdir(tmp)) == ["artifacts"]
+        assert load_model(ModelPersistence(target)).version == version
+    print("SUCCESS: A failed swap leaves the current artifact set in place")
+
+if __name__ == "__main__":
+    test_frame_roundtrip()
+    test_arrays_are_memory_mapped()
+    test_model_roundtrip()
+    test_manifest_refuses_bad_sets()
+    test_failed_swap_keeps_current_set()
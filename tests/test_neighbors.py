@@ -0,0 +1,49 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ml.neighbors import top_k
+from src.ml.vectorizer import TextVectorizer
+from src.ml.similarity import SimilarityEngine
+
+TEXTS = [
+    "batman gotham joker nolan",
+    "batman gotham bane nolan",
+    "superman metropolis snyder",
+    "romance paris love",
+    "romance london love",
+    "space alien ship",
+]
+
+def test_top_k_ties():
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9], dtype=np.float32)
+    best = top_k(scores, 3)
+
+    # Equal scores resolve to the lower index
+    assert best.tolist() == [1, 4, 0]
+    print("SUCCESS: top_k is deterministic on ties")
+
+def test_compute_neighbors():
+    vectors = TextVectorizer(sparse=True).fit_transform(TEXTS)
+    engine = SimilarityEngine()
+    similarity = engine.compute_similarity(vectors)
+    neighbors = engine.compute_neighbors(vectors, k=3, block_size=4)
+
+    assert neighbors.indices.shape == (len(TEXTS), 3)
+    assert neighbors.indices.dtype == np.int32
+    assert neighbors.scores.dtype == np.float32
+
+    for row in range(len(TEXTS)):
+        assert row not in neighbors.indices[row]
+        expected = np.sort(np.delete(similarity[row], row))[::-1][:3]
+        assert np.allclose(neighbors.scores[row], expected, atol=1e-6)
+
+    assert neighbors.indices[0][0] == 1
+    print("SUCCESS: Neighbor index matches the full similarity matrix")
+
+if __name__ == "__main__":
+    test_top_k_ties()
+    test_compute_neighbors()
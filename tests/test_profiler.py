@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.profiler import BuildProfiler, profile_stage
+
+def test_stage_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = BuildProfiler(profile_dir=os.path.join(tmp, "prof"), memory_limit_mb=100000)
+
+        with profiler.stage("allocate", rows=1000) as details:
+            block = np.ones((1000, 1000))
+            details["sum"] = float(block.sum())
+        with profile_stage(None, "skipped"):
+            pass
+
+        artifact_dir = os.path.join(tmp, "artifacts")
+        os.makedirs(os.path.join(artifact_dir, "neighbors"))
+        np.save(os.path.join(artifact_dir, "neighbors", "scores.npy"), np.zeros(10))
+        profiler.record_artifacts(artifact_dir)
+
+        path = os.path.join(tmp, "report.json")
+        profiler.write(path)
+        with open(path) as f:
+            report = json.load(f)
+
+        stage = report["stages"][0]
+        assert [s["name"] for s in report["stages"]] == ["allocate"]
+        assert stage["details"] == {"rows": 1000, "sum": 1e6}
+        assert stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0
+        assert stage["peak_rss_bytes"] >= stage["rss_start_bytes"]
+        assert os.path.exists(stage["profile"])
+        assert report["artifacts"]["neighbors"] > 10 * 8
+        assert report["within_memory_limit"]
+    print("SUCCESS: Profiler reports time, memory and artifact sizes per stage")
+
+if __name__ == "__main__":
+    test_stage_report()
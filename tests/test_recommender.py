@@ -1,23 +1,24 @@
 import sys
 import os
 
+import numpy as np
+import pandas as pd
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data_ingestion.data_loader import load_data
+from src.data_ingestion.data_loader import load_merged_data
 from src.feature_engineering.feature_builder import FeatureBuilder
 from src.ml.vectorizer import TextVectorizer
 from src.ml.similarity import SimilarityEngine
-from src.ml.recommender import Recommender
+from src.ml.recommender import AmbiguousTitleError, Recommender
 
 def test_recommender():
     print("Loading data...")
-    movies, credits = load_data()
-    if movies is None:
+    df = load_merged_data()
+    if df is None:
         print("Dataset load failed")
         return
 
-    df = movies.merge(credits, left_on='id', right_on='movie_id')
-
     print("Building features...")
     builder = FeatureBuilder()
     processed_df = builder.build_features(df)
@@ -49,5 +50,186 @@ def test_recommender():
     except ValueError as e:
         print(f"FAILURE: {e}")
 
+def test_recommend_ranking():
+    df = pd.DataFrame({"title": ["Twin", "Query", "Close", "Far", "Tie"]})
+    similarity = np.array([
+        [1.0, 1.0, 0.2, 0.1, 0.2],
+        [1.0, 1.0, 0.8, 0.1, 0.8],
+        [0.2, 0.8, 1.0, 0.1, 0.3],
+        [0.1, 0.1, 0.1, 1.0, 0.1],
+        [0.2, 0.8, 0.3, 0.1, 1.0],
+    ], dtype=np.float32)
+    recommender = Recommender(df, similarity)
+
+    # The query is excluded even though "Twin" ties with it at 1.0,
+    # and equal scores keep catalog order
+    assert recommender.recommend("Query", 3) == ["Twin", "Close", "Tie"]
+    assert recommender.recommend("Query", 10) == ["Twin", "Close", "Tie", "Far"]
+    assert recommender.recommend("Query", 0) == []
+    print("SUCCESS: Ranking excludes the query and is deterministic")
+
+def test_title_and_id_lookup():
+    df = pd.DataFrame({
+        "id": [10, 20, 30, 40],
+        "title": ["The Host", "Alien", "The Host", "Aliens"],
+    })
+    similarity = np.array([
+        [1.0, 0.1, 0.3, 0.2],
+        [0.1, 1.0, 0.2, 0.9],
+        [0.3, 0.2, 1.0, 0.4],
+        [0.2, 0.9, 0.4, 1.0],
+    ], dtype=np.float32)
+    recommender = Recommender(df, similarity)
+
+    # Lookup ignores case and surrounding whitespace
+    assert recommender.recommend("  alien ", 1) == ["Aliens"]
+
+    try:
+        recommender.recommend("The Host")
+        assert False, "duplicate title should be ambiguous"
+    except AmbiguousTitleError as e:
+        assert e.movie_ids == [10, 30]
+
+    assert recommender.recommend_by_id(30, 2) == ["Aliens", "The Host"]
+    print("SUCCESS: Titles and ids resolve through the lookup index")
+
+def test_recommend_many():
+    df = pd.DataFrame({
+        "id": [10, 20, 30, 40],
+        "title": ["The Host", "Alien", "The Host", "Aliens"],
+    })
+    similarity = np.array([
+        [1.0, 0.1, 0.3, 0.2],
+        [0.1, 1.0, 0.2, 0.9],
+        [0.3, 0.2, 1.0, 0.4],
+        [0.2, 0.9, 0.4, 1.0],
+    ], dtype=np.float32)
+    recommender = Recommender(df, similarity)
+    results = recommender.recommend_many(["alien", 30, "The Host", "Nope", 99], top_n=2)
+
+    # Batched ranking matches the one-at-a-time calls
+    assert results[0] == {"query": "alien", "recommendations": recommender.recommend("alien", 2)}
+    assert results[1]["recommendations"] == recommender.recommend_by_id(30, 2)
+    assert results[2]["movie_ids"] == [10, 30]
+    assert "error" in results[3] and "error" in results[4]
+
+    neighbors = SimilarityEngine().compute_neighbors(similarity, k=3)
+    indexed = Recommender(df, neighbors).recommend_many([20, 40], top_n=1)
+    assert [r["recommendations"] for r in indexed] == [["Aliens"], ["Alien"]]
+    print("SUCCESS: Batch recommendations resolve and rank every query")
+
+def test_recommend_for_query():
+    df = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "title": ["Inception", "Interstellar", "Notting Hill", "The Prestige"],
+        "soup": [
+            "dream heist ChristopherNolan LeonardoDiCaprio ScienceFiction",
+            "space timetravel ChristopherNolan MatthewMcConaughey ScienceFiction",
+            "london bookshop RogerMichell HughGrant Romance",
+            "magic rivalry ChristopherNolan HughJackman Drama",
+        ],
+    })
+    vectorizer = TextVectorizer(sparse=True)
+    vectors = vectorizer.fit_transform(df["soup"])
+    neighbors = SimilarityEngine().compute_neighbors(vectors, k=3)
+    recommender = Recommender(df, neighbors, vectors, vectorizer)
+
+    # Names are matched in their collapsed soup form
+    assert recommender.recommend_for_query("Hugh Grant, romance", top_n=1) == ["Notting Hill"]
+
+    # Seeds are excluded and their centroid drives the ranking
+    recs = recommender.recommend_for_query(seeds=["Inception", 2], top_n=2)
+    assert "Inception" not in recs and "Interstellar" not in recs
+    assert recs[0] == "The Prestige"
+
+    for text in ("", "unknownterm"):
+        try:
+            recommender.recommend_for_query(text)
+            assert False, "empty queries should be rejected"
+        except ValueError:
+            pass
+    print("SUCCESS: Free-text and seed queries score against the vectors")
+
+def test_filtered_recommend():
+    rng = np.random.default_rng(0)
+    n = 60
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "title": [f"Movie {i}" for i in range(n)],
+        "genres": [["Science Fiction"] if i % 10 == 0 else ["Drama", "Crime"] for i in range(n)],
+        "release_date": [None if i % 7 == 0 else f"{1950 + i}-01-01" for i in range(n)],
+        "vote_count": np.arange(n) * 10,
+        "original_language": ["fr" if i % 3 == 0 else "en" for i in range(n)],
+    })
+    vectors = np.abs(rng.normal(size=(n, 12))).astype(np.float32)
+    full = SimilarityEngine().compute_similarity(vectors)
+    # Only 3 stored neighbors, so rare filters need the fallback
+    neighbors = SimilarityEngine().compute_neighbors(vectors, k=3)
+    indexed = Recommender(df, neighbors, vectors)
+    dense = Recommender(df, full)
+
+    def expected(row, mask, top_n):
+        scores = np.where(mask, full[row], -np.inf)
+        scores[row] = -np.inf
+        order = np.lexsort((np.arange(n), -scores))
+        return [f"Movie {i}" for i in order[:min(top_n, int(mask.sum()) - int(mask[row]))]]
+
+    cases = [
+        ({"genres": "science fiction"}, np.arange(n) % 10 == 0),
+        ({"min_year": 1980, "max_year": 1995}, np.array([i % 7 != 0 and 30 <= i <= 45 for i in range(n)])),
+        ({"min_vote_count": 500, "language": "FR"}, np.array([i >= 50 and i % 3 == 0 for i in range(n)])),
+        ({"genres": ["Crime", "Western"]}, np.arange(n) % 10 != 0),
+        ({"language": "de"}, np.zeros(n, dtype=bool)),
+    ]
+    for filters, mask in cases:
+        for row in (0, 33):
+            want = expected(row, mask, 4)
+            assert indexed.recommend(f"Movie {row}", 4, filters) == want, filters
+            assert dense.recommend_by_id(row, 4, filters) == want, filters
+    assert indexed.recommend("Movie 1", 3) == expected(1, np.ones(n, dtype=bool), 3)
+
+    try:
+        indexed.recommend("Movie 1", filters={"decade": 1990})
+        assert False, "unknown filters should be rejected"
+    except ValueError:
+        pass
+    print("SUCCESS: Filtered recommendations match filtering the full ranking")
+
+def test_filtered_recommend_without_vectors():
+    df = pd.DataFrame({
+        "id": np.arange(6),
+        "title": [f"Movie {i}" for i in range(6)],
+        "original_language": ["en", "en", "fr", "en", "fr", "fr"],
+    })
+    vectors = np.abs(np.random.default_rng(1).normal(size=(6, 4))).astype(np.float32)
+    neighbors = SimilarityEngine().compute_neighbors(vectors, k=2)
+    recommender = Recommender(df, neighbors)
+
+    # Enough stored neighbors pass: answered from the index alone
+    passing = [i for i in neighbors.indices[0] if i in (1, 3)]
+    if passing:
+        assert recommender.recommend("Movie 0", len(passing), {"language": "en"}) == [f"Movie {i}" for i in passing]
+
+    # Too few pass: never silently truncated
+    try:
+        recommender.recommend("Movie 0", 3, {"language": "fr"})
+        assert False, "a short filtered result needs the vectors"
+    except ValueError as e:
+        assert "vectors" in str(e)
+
+    with_vectors = Recommender(df, neighbors, vectors)
+    assert len(with_vectors.recommend("Movie 0", 3, {"language": "fr"})) == 3
+
+    # A neighbor list covering the catalog is complete without vectors
+    complete = Recommender(df, SimilarityEngine().compute_neighbors(vectors, k=5))
+    assert len(complete.recommend("Movie 0", 3, {"language": "fr"})) == 3
+    print("SUCCESS: Filtered recommendations without vectors fail instead of truncating")
+
 if __name__ == "__main__":
     test_recommender()
+    test_recommend_ranking()
+    test_title_and_id_lookup()
+    test_recommend_many()
+    test_recommend_for_query()
+    test_filtered_recommend()
+    test_filtered_recommend_without_vectors()
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.response_cache import ResponseCache
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=None)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+
+    # "b" is now the least recently used
+    cache.put("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["hits"] == 3 and stats["misses"] == 1
+    print("SUCCESS: Least recently used entries are evicted first")
+
+def test_byte_bound_and_ttl():
+    cache = ResponseCache(max_bytes=40, ttl=None)
+    cache.put("a", ["x" * 10])
+    cache.put("b", ["y" * 10])
+    cache.put("c", ["z" * 10])
+    assert len(cache) == 2 and cache.bytes <= 40
+    cache.put("huge", ["w" * 100])
+    assert cache.get("huge") is None
+
+    cache = ResponseCache(ttl=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    print("SUCCESS: Byte budget and TTL bound the cache")
+
+def test_version_invalidation():
+    cache = ResponseCache()
+    cache.bind("v1")
+    calls = []
+    compute = lambda: calls.append(1) or {"recommendations": ["A"]}
+    cache.get_or_compute("q", compute)
+    cache.get_or_compute("q", compute)
+    assert len(calls) == 1
+
+    cache.bind("v1")
+    assert len(cache) == 1
+    cache.bind("v2")
+    assert len(cache) == 0 and cache.stats()["invalidations"] == 1
+    cache.get_or_compute("q", compute)
+    assert len(calls) == 2
+    print("SUCCESS: A new model version drops cached responses")
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_byte_bound_and_ttl()
+    test_version_invalidation()
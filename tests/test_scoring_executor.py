@@ -0,0 +1,142 @@
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import src.utils.scoring_executor as scoring_executor
+from src.utils.scoring_executor import ExecutorOverloaded, ExecutorUnavailable, ScoringExecutor
+
+def load_model():
+    if os.path.exists(os.environ.get("TEST_MODEL_BROKEN", "")):
+        raise OSError("artifacts mid-swap")
+    return {"scale": int(os.environ.get("TEST_MODEL_SCALE", 10))}
+
+def scale(model, value):
+    return model["scale"] * value
+
+def crash(model, value):
+    os._exit(1)
+
+def test_identical_requests_are_coalesced():
+    executor = ScoringExecutor(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def slow(model, value):
+        calls.append(value)
+        release.wait(5)
+        return model * value
+
+    async def burst():
+        waiters = [asyncio.ensure_future(executor.run(("q", 1), slow, 3, 1)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(burst()) == [3] * 5
+    assert calls == [1]
+    assert executor.stats()["coalesced"] == 4 and executor.pending == 0
+    executor.shutdown()
+    print("SUCCESS: Concurrent identical requests share one computation")
+
+def test_overload_is_rejected():
+    executor = ScoringExecutor(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def burst():
+        waiters = [
+            asyncio.ensure_future(executor.run(("q", i), lambda model, i: release.wait(5) and i, None, i))
+            for i in range(3)
+        ]
+        results = await asyncio.gather(waiters[2], return_exceptions=True)
+        release.set()
+        await asyncio.gather(*waiters[:2])
+        return results[0]
+
+    assert isinstance(asyncio.run(burst()), ExecutorOverloaded)
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
+    print("SUCCESS: Saturated executor rejects instead of queueing")
+
+def test_process_pool_uses_worker_model():
+    executor = ScoringExecutor(kind="process", max_workers=1, loader=load_model)
+
+    async def run():
+        return await executor.run(("scale", 4), scale, None, 4)
+
+    assert asyncio.run(run()) == 40
+    executor.shutdown()
+    print("SUCCESS: Process workers load their own model")
+
+def test_restart_workers_reloads_model():
+    os.environ.pop("TEST_MODEL_SCALE", None)
+    executor = ScoringExecutor(kind="process", max_workers=1, loader=load_model)
+
+    async def run():
+        return await executor.run(("scale", 4), scale, None, 4)
+
+    try:
+        assert asyncio.run(run()) == 40
+        os.environ["TEST_MODEL_SCALE"] = "100"
+        executor.restart_workers()
+        assert asyncio.run(run()) == 400
+    finally:
+        os.environ.pop("TEST_MODEL_SCALE", None)
+        executor.shutdown()
+    print("SUCCESS: Restarted workers load the new model")
+
+def test_failed_worker_load_is_retried():
+    scoring_executor.WORKER_LOAD_RETRY_SECONDS = 0
+    # Workers see the file, not the parent's environment after the fork
+    broken = tempfile.NamedTemporaryFile(delete=False)
+    broken.close()
+    os.environ["TEST_MODEL_BROKEN"] = broken.name
+    executor = ScoringExecutor(kind="process", max_workers=1, loader=load_model)
+
+    async def run(value):
+        return await executor.run(("scale", value), scale, None, value)
+
+    try:
+        # The pool survives a worker that could not load its model
+        try:
+            asyncio.run(run(4))
+            assert False, "a worker without a model must not score"
+        except ExecutorUnavailable:
+            pass
+        os.remove(broken.name)
+        assert asyncio.run(run(5)) == 50
+    finally:
+        os.environ.pop("TEST_MODEL_BROKEN", None)
+        if os.path.exists(broken.name):
+            os.remove(broken.name)
+        scoring_executor.WORKER_LOAD_RETRY_SECONDS = 0.2
+        executor.shutdown()
+    print("SUCCESS: Workers retry a failed model load instead of breaking the pool")
+
+def test_broken_pool_is_replaced():
+    executor = ScoringExecutor(kind="process", max_workers=1, loader=load_model)
+
+    async def run(task, value):
+        return await executor.run((task.__name__, value), task, None, value)
+
+    try:
+        try:
+            asyncio.run(run(crash, 1))
+            assert False, "a dead worker must be reported"
+        except ExecutorUnavailable:
+            pass
+        assert asyncio.run(run(scale, 4)) == 40
+    finally:
+        executor.shutdown()
+    print("SUCCESS: A pool whose worker died is replaced")
+
+if __name__ == "__main__":
+    test_identical_requests_are_coalesced()
+    test_overload_is_rejected()
+    test_process_pool_uses_worker_model()
+    test_restart_workers_reloads_model()
+    test_failed_worker_load_is_retried()
+    test_broken_pool_is_replaced()
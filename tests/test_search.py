@@ -0,0 +1,66 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ml.search import TitleSearchIndex, substring_edit_distance
+
+TITLES = [
+    "The Avengers",
+    "Avengers: Age of Ultron",
+    "Avatar",
+    "Spider-Man",
+    "Spider-Man 2",
+    "The Dark Knight",
+]
+
+def titles_of(index, hits):
+    return [TITLES[h.row] for h in hits]
+
+def test_ranked_search():
+    index = TitleSearchIndex(TITLES)
+
+    hits = index.search("avatar")
+    assert titles_of(index, hits)[0] == "Avatar"
+    assert hits[0].match == "exact"
+
+    hits = index.search("avenger", fuzzy=False)
+    assert titles_of(index, hits) == ["Avengers: Age of Ultron", "The Avengers"]
+    assert [h.match for h in hits] == ["prefix", "word_prefix"]
+
+    hits = index.search("dark", fuzzy=False)
+    assert titles_of(index, hits) == ["The Dark Knight"]
+
+    # Short queries are answered from their one- and two-character postings
+    assert titles_of(index, index.search("sp", fuzzy=False)) == ["Spider-Man", "Spider-Man 2"]
+    assert titles_of(index, index.search("2", fuzzy=False)) == ["Spider-Man 2"]
+
+    assert len(index.search("spider", limit=1)) == 1
+    assert index.search("   ") == []
+    print("SUCCESS: Substring and prefix search is ranked")
+
+def test_fuzzy_search():
+    index = TitleSearchIndex(TITLES)
+
+    hits = index.search("avengrs")
+    assert set(titles_of(index, hits)) == {"The Avengers", "Avengers: Age of Ultron"}
+    assert all(h.match == "fuzzy" and h.edits == 1 for h in hits)
+
+    assert titles_of(index, index.search("dark knigth"))[0] == "The Dark Knight"
+    assert titles_of(index, index.search("dark knigth", limit=None)) == ["The Dark Knight"]
+
+    # Without a limit, fuzzy matches are only looked for when nothing else matches
+    hits = index.search("avenger", limit=None)
+    assert [h.match for h in hits] == ["prefix", "word_prefix"]
+    assert index.search("zzzzzz") == []
+    print("SUCCESS: Typos are tolerated")
+
+def test_substring_edit_distance():
+    assert substring_edit_distance("knight", "the dark knight", 2) == 0
+    assert substring_edit_distance("knigt", "the dark knight", 2) == 1
+    assert substring_edit_distance("xxxxx", "avatar", 1) == 2
+
+if __name__ == "__main__":
+    test_ranked_search()
+    test_fuzzy_search()
+    test_substring_edit_distance()
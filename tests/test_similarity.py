@@ -1,22 +1,24 @@
 import sys
 import os
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data_ingestion.data_loader import load_data
+from src.data_ingestion.data_loader import load_merged_data
 from src.feature_engineering.feature_builder import FeatureBuilder
 from src.ml.vectorizer import TextVectorizer
 from src.ml.similarity import SimilarityEngine
 
 def test_similarity():
     print("Loading data...")
-    movies, credits = load_data()
-    if movies is None:
+    df = load_merged_data()
+    if df is None:
         print("Dataset load failed")
         return
 
-    df = movies.merge(credits, left_on='id', right_on='movie_id')
-
     print("Building features...")
     builder = FeatureBuilder()
     processed_df = builder.build_features(df)
@@ -33,5 +35,49 @@ def test_similarity():
     print("Similarity shape:", similarity.shape)
     print("Sample similarity scores:", similarity[0][:5])
 
+def test_sparse_similarity():
+    texts = ["action hero batman", "batman joker gotham", "romance paris love"]
+    vectors = TextVectorizer(sparse=True).fit_transform(texts)
+
+    engine = SimilarityEngine()
+    dense = engine.compute_similarity(vectors)
+    sparse = engine.compute_similarity(vectors, dense_output=False)
+
+    assert sp.issparse(sparse)
+    assert np.allclose(sparse.toarray(), dense)
+    assert np.allclose(np.diag(dense), 1.0)
+
+    print("SUCCESS: Sparse similarity matches dense output")
+
+def test_parallel_tiles_match_serial():
+    vectors = sp.random(300, 80, density=0.1, format='csr', random_state=3, dtype=np.float32)
+    serial = SimilarityEngine()
+    expected = serial.compute_neighbors(vectors, k=7, block_size=32)
+    full = serial.compute_similarity(vectors)
+
+    for executor in ("thread", "process"):
+        engine = SimilarityEngine(n_jobs=3, executor=executor)
+        neighbors = engine.compute_neighbors(vectors, k=7, block_size=32)
+        assert (neighbors.indices == expected.indices).all()
+        assert np.allclose(neighbors.scores, expected.scores, atol=1e-6)
+
+        indices = np.empty((300, 7), dtype=np.int32)
+        scores = np.empty((300, 7), dtype=np.float32)
+        engine.compute_neighbors_tiled(vectors, indices, scores, row_block=40, col_block=64)
+        assert np.allclose(scores, expected.scores, atol=1e-5)
+
+        # Full rows are streamed into a memory-mapped .npy
+        with tempfile.TemporaryDirectory() as tmp:
+            out = np.lib.format.open_memmap(
+                os.path.join(tmp, "similarity.npy"), mode="w+", dtype=np.float32, shape=(300, 300)
+            )
+            engine.compute_similarity(vectors, out=out, block_size=64)
+            out.flush()
+            assert np.allclose(np.load(os.path.join(tmp, "similarity.npy")), full, atol=1e-5)
+            del out
+    print("SUCCESS: Parallel tiled similarity matches the serial result")
+
 if __name__ == "__main__":
     test_similarity()
+    test_sparse_similarity()
+    test_parallel_tiles_match_serial()
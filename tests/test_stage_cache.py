@@ -0,0 +1,76 @@
+import sys
+import os
+import tempfile
+# Add src to python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.generate_catalog import generate_catalog
+from src.scripts.build_model import build
+from src.utils.artifacts import load_manifest, load_model
+from src.utils.model_persistence import ModelPersistence
+from src.utils.profiler import BuildProfiler
+from src.utils.stage_cache import StageCache, stage_key
+
+def cache_events(profiler):
+    return {s["name"]: s["details"].get("cache") for s in profiler.stages}
+
+def test_stage_keys():
+    key = stage_key("neighbors", {"k": 10}, "abc")
+    assert key == stage_key("neighbors", {"k": 10}, "abc")
+    assert key != stage_key("neighbors", {"k": 20}, "abc")
+    assert key != stage_key("neighbors", {"k": 10}, "abd")
+    print("SUCCESS: Stage keys change with parameters and inputs")
+
+def test_unchanged_stages_are_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = os.path.join(tmp, "raw")
+        artifact_dir = os.path.join(tmp, "artifacts")
+        cache_dir = os.path.join(tmp, "cache")
+        generate_catalog(120, raw_dir, seed=2)
+
+        def run(**kwargs):
+            profiler = BuildProfiler()
+            build(raw_dir=raw_dir, artifact_dir=artifact_dir, cache_dir=cache_dir, profiler=profiler, **kwargs)
+            return profiler
+
+        first = run(top_k=10)
+        assert cache_events(first)["neighbors"] == "miss"
+        version = load_manifest(ModelPersistence(artifact_dir))["version"]
+
+        # Nothing changed: the artifact set is kept as is
+        assert run(top_k=10).stages == []
+        assert load_manifest(ModelPersistence(artifact_dir))["version"] == version
+
+        # Only the neighbor stage depends on k
+        second = run(top_k=5)
+        events = cache_events(second)
+        assert events["features"] == "hit" and events["vectorize"] == "hit"
+        assert events["neighbors"] == "miss"
+        artifacts = load_model(ModelPersistence(artifact_dir))
+        assert artifacts.similarity.indices.shape == (120, 5)
+        assert artifacts.version != version
+    print("SUCCESS: Unchanged build stages are reused from the stage cache")
+
+def test_stage_cache_keeps_recent_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, "stages")
+        cache = StageCache(cache_dir, keep=2)
+        load = lambda p: p.load("out.pkl")
+        for i, key in enumerate(["a", "b"]):
+            cache.put("features", key, lambda p, i=i: p.save(i, "out.pkl"))
+            os.utime(cache.path("features", key), (i, i))
+
+        # Reading "a" makes "b" the least recently used
+        assert cache.get("features", "a", load) == 0
+        cache.put("features", "c", lambda p: p.save(2, "out.pkl"))
+        assert sorted(os.listdir(os.path.join(cache_dir, "features"))) == ["a", "c"]
+        assert cache.get("features", "b", load) is None
+
+        cache.clear()
+        assert not os.path.exists(cache_dir)
+    print("SUCCESS: The stage cache prunes its least recently used entries")
+
+if __name__ == "__main__":
+    test_stage_keys()
+    test_unchanged_stages_are_reused()
+    test_stage_cache_keeps_recent_entries()
@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.feature_engineering.feature_builder import FeatureBuilder
+from src.ml.similarity import SimilarityEngine
+from src.ml.streaming import StreamingBuilder
+from src.ml.vectorizer import TextVectorizer
+from src.utils.artifacts import load_model
+from src.utils.model_persistence import ModelPersistence
+
+WORDS = ["hero", "space", "love", "war", "robot", "alien", "crime", "heist", "magic", "spy"]
+
+def write_raw(raw_dir, n, seed):
+    rng = np.random.default_rng(seed)
+    names = lambda values: json.dumps([{"name": v} for v in values])
+    movies, credits = [], []
+    for i in range(n):
+        words = list(rng.choice(WORDS, size=4, replace=False))
+        movies.append({
+            "id": i, "title": f"Movie {i}", "genres": names(words[:1]),
+            "keywords": names(words[1:]), "release_date": "2001-01-01",
+            "original_language": "en", "vote_average": 5.5,
+            "vote_count": i * 10, "popularity": float(i),
+        })
+        credits.append({
+            "movie_id": i, "title": f"Movie {i}",
+            "cast": names([f"Actor {i % 7}"]),
+            "crew": json.dumps([{"job": "Director", "name": f"Director {i % 5}"}]),
+        })
+    movies_path = os.path.join(raw_dir, "movies.csv")
+    credits_path = os.path.join(raw_dir, "credits.csv")
+    pd.DataFrame(movies).to_csv(movies_path, index=False)
+    pd.DataFrame(credits).to_csv(credits_path, index=False)
+    return movies_path, credits_path
+
+def test_streaming_matches_in_memory_build():
+    with tempfile.TemporaryDirectory() as tmp:
+        movies_path, credits_path = write_raw(tmp, 60, seed=0)
+
+        # A tiny budget forces several partitions and tiles
+        persistence = ModelPersistence(os.path.join(tmp, "artifacts"))
+        StreamingBuilder(memory_budget_mb=0.01, top_k=5).build(movies_path, credits_path, persistence)
+        streamed = load_model(persistence, with_vectorizer=True)
+
+        df = pd.read_csv(movies_path).merge(pd.read_csv(credits_path), left_on="id", right_on="movie_id")
+        processed_df = FeatureBuilder().build_features(df)
+        vectors = TextVectorizer(sparse=True).fit_transform(processed_df['soup'])
+        expected = SimilarityEngine().compute_neighbors(vectors, k=5)
+
+        # Compare per movie id, since the streaming build groups rows by partition
+        ids = processed_df['id'].to_numpy()
+        streamed_ids = streamed.movies['id'].to_numpy()
+        assert sorted(streamed_ids.tolist()) == sorted(ids.tolist())
+        row_of_id = {movie_id: row for row, movie_id in enumerate(streamed_ids)}
+        for row, movie_id in enumerate(ids):
+            streamed_row = row_of_id[movie_id]
+            assert np.allclose(streamed.similarity.scores[streamed_row], expected.scores[row], atol=1e-6)
+            assert streamed.movies['genres'][streamed_row] == processed_df['genres'].iloc[row]
+        assert streamed.vectors.shape == vectors.shape
+    print("SUCCESS: Streaming build matches the in-memory build")
+
+def test_streaming_vocabulary_matches_max_features():
+    with tempfile.TemporaryDirectory() as tmp:
+        movies_path, credits_path = write_raw(tmp, 60, seed=1)
+
+        # Term counts are spilled per partition and merged bucket by bucket
+        persistence = ModelPersistence(os.path.join(tmp, "artifacts"))
+        StreamingBuilder(memory_budget_mb=0.01, top_k=5, max_features=8).build(movies_path, credits_path, persistence)
+        streamed = load_model(persistence, with_vectorizer=True)
+
+        df = pd.read_csv(movies_path).merge(pd.read_csv(credits_path), left_on="id", right_on="movie_id")
+        expected = TextVectorizer(max_features=8, sparse=True)
+        expected.fit_transform(FeatureBuilder().build_features(df)['soup'])
+        assert streamed.vectorizer.vectorizer.vocabulary == expected.vectorizer.vocabulary_
+    print("SUCCESS: Streaming vocabulary matches CountVectorizer(max_features)")
+
+if __name__ == "__main__":
+    test_streaming_matches_in_memory_build()
+    test_streaming_vocabulary_matches_max_features()
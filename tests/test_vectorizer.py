@@ -1,19 +1,20 @@
 import sys
 import os
+import pickle
+
+import scipy.sparse as sp
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.data_ingestion.data_loader import load_data
+from src.data_ingestion.data_loader import load_merged_data
 from src.feature_engineering.feature_builder import FeatureBuilder
 from src.ml.vectorizer import TextVectorizer
 
 def test_vectorizer():
-    movies, credits = load_data()
-    if movies is None:
+    df = load_merged_data()
+    if df is None:
         print("Failed to load data")
         return
-        
-    df = movies.merge(credits, left_on='id', right_on='movie_id')
 
     builder = FeatureBuilder()
     processed_df = builder.build_features(df)
@@ -25,5 +26,38 @@ def test_vectorizer():
     print("SUCCESS: Vectorization completed")
     print("Vector shape:", vectors.shape)
 
+def test_sparse_vectorizer():
+    texts = ["action hero batman", "batman joker gotham", "romance paris love"]
+
+    dense = TextVectorizer().fit_transform(texts)
+    sparse = TextVectorizer(sparse=True).fit_transform(texts)
+
+    assert sp.isspmatrix_csr(sparse)
+    assert (sparse.toarray() == dense).all()
+
+    print("SUCCESS: Sparse vectorization matches dense output")
+
+def test_hashing_vectorizer():
+    texts = ["action hero batman", "batman joker gotham", "romance paris love", "the batman"]
+
+    # No fit step: any slice vectorizes on its own, identically
+    vectorizer = TextVectorizer(sparse=True, hashing=True, n_features=2 ** 12)
+    whole = vectorizer.transform(texts)
+    parts = sp.vstack([vectorizer.transform(texts[:2]), vectorizer.transform(texts[2:])])
+    assert (whole != parts).nnz == 0
+    assert (vectorizer.fit_transform(texts, n_jobs=2) != whole).nnz == 0
+    assert whole.shape == (4, 2 ** 12) and vectorizer.n_features == 2 ** 12
+
+    # Term counts like the vocabulary mode, stop words dropped
+    counted = TextVectorizer(sparse=True).fit_transform(texts)
+    assert whole.sum(axis=1).tolist() == counted.sum(axis=1).tolist()
+    assert (whole[0].multiply(whole[3])).sum() == 1
+
+    # Nothing learned, so nothing sizeable to store
+    assert len(pickle.dumps(vectorizer)) < 2000
+    print("SUCCESS: Hashing vectorizer needs no fit and splits into independent chunks")
+
 if __name__ == "__main__":
     test_vectorizer()
+    test_sparse_vectorizer()
+    test_hashing_vectorizer()